@@ -15,4 +15,13 @@ class IsAdmin(BasePermission):
                 request.user and
                 request.user.is_authenticated and
                 request.user.is_staff
-        )
\ No newline at end of file
+        )
+
+
+class IsHR(BasePermission):
+    def has_permission(self, request, view):
+        return (
+                request.user and
+                request.user.is_authenticated and
+                request.user.role in ('hr', 'admin')
+        )
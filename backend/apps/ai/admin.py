@@ -0,0 +1,30 @@
+from django.contrib import admin
+from .models import AIUsage, AnalysisJob, AnalysisResult
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'vacancy', 'candidate', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('vacancy__title', 'candidate__email')
+    raw_id_fields = ('vacancy', 'candidate', 'requested_by')
+    readonly_fields = ('locked_by', 'locked_at', 'created_at', 'finished_at')
+
+
+@admin.register(AnalysisResult)
+class AnalysisResultAdmin(admin.ModelAdmin):
+    list_display = ('id', 'vacancy', 'candidate', 'score', 'model', 'updated_at')
+    list_filter = ('model',)
+    search_fields = ('vacancy__title', 'candidate__email')
+    raw_id_fields = ('vacancy', 'candidate')
+    readonly_fields = ('input_hash', 'created_at', 'updated_at')
+
+
+@admin.register(AIUsage)
+class AIUsageAdmin(admin.ModelAdmin):
+    list_display = ('vacancy', 'hr', 'calls', 'failed_calls', 'retries',
+                    'prompt_tokens', 'completion_tokens', 'cost', 'updated_at')
+    search_fields = ('vacancy__title', 'hr__email')
+    raw_id_fields = ('vacancy', 'hr')
+    readonly_fields = ('calls', 'failed_calls', 'retries', 'prompt_tokens',
+                       'completion_tokens', 'cost', 'duration', 'updated_at')
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class AiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.ai'
+    verbose_name = 'AI анализ'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .clients.instrumentation import add_hook
+        from .services.usage import get_call_metrics, get_usage_recorder
+
+        add_hook(get_call_metrics().record)
+        add_hook(get_usage_recorder().record)
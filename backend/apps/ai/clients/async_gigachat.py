@@ -0,0 +1,102 @@
+import asyncio
+import weakref
+
+import httpx
+from django.conf import settings
+
+from .base import BaseGigaChatClient
+from .instrumentation import instrument
+from .singleflight import get_singleflight
+
+
+# HTTP клиент и семафор живут по одному на event loop и общие для всех
+# экземпляров AsyncGigaChatClient, поэтому лимит параллельных запросов
+# действует на весь процесс (воркер ASGI или пакетную задачу)
+_loop_resources = weakref.WeakKeyDictionary()
+
+
+def _get_loop_resources() -> tuple:
+    loop = asyncio.get_running_loop()
+    resources = _loop_resources.get(loop)
+    if resources is None:
+        http = httpx.AsyncClient(
+            verify=False,
+            timeout=httpx.Timeout(
+                settings.GIGACHAT_READ_TIMEOUT,
+                connect=settings.GIGACHAT_CONNECT_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GIGACHAT_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.GIGACHAT_POOL_MAXSIZE,
+            ),
+        )
+        semaphore = asyncio.Semaphore(settings.GIGACHAT_MAX_CONCURRENCY)
+        resources = (http, semaphore)
+        _loop_resources[loop] = resources
+    return resources
+
+
+class AsyncGigaChatClient(BaseGigaChatClient):
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return _get_loop_resources()[0]
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        return _get_loop_resources()[1]
+
+    async def get_access_token(self) -> str:
+        return await self.tokens.aget_token(self._request_access_token)
+
+    async def _request_access_token(self) -> tuple:
+        with instrument('auth', self.MODEL) as call:
+            res = await self.http.post(
+                self.auth_url,
+                headers=self._auth_headers(),
+                auth=(self.client_id or '', self.secret or ''),
+                data=self._auth_payload(),
+            )
+            call.status = str(res.status_code)
+            res.raise_for_status()
+        return self._parse_token(res.json())
+
+    async def ask(self, prompt: str, timeout: float = None) -> str:
+        """
+        Одновременные вызовы с одинаковым промптом склеиваются в один запрос.
+        timeout дополнительно ограничивает GIGACHAT_READ_TIMEOUT.
+        """
+        return await get_singleflight().ado(
+            self._prompt_key(prompt),
+            lambda: self._ask(prompt, timeout),
+        )
+
+    async def _ask(self, prompt: str, timeout: float = None) -> str:
+        payload = self._chat_payload(prompt)
+
+        async with self.semaphore:
+            # Ожидание семафора в замер не входит — только сам вызов
+            with instrument('chat', self.MODEL) as call:
+                res = await self._post_chat(payload, timeout)
+                if res.status_code == 401:
+                    # Токен отозван раньше срока — получаем новый и повторяем один раз
+                    await self.tokens.ainvalidate()
+                    res = await self._post_chat(payload, timeout)
+                call.status = str(res.status_code)
+                res.raise_for_status()
+                data = res.json()
+                call.record_usage(data.get('usage'))
+
+        return self._parse_chat(data)
+
+    async def _post_chat(self, payload: dict, timeout: float = None):
+        read_timeout = settings.GIGACHAT_READ_TIMEOUT
+        if timeout:
+            read_timeout = min(read_timeout, timeout)
+
+        return await self.http.post(
+            self.chat_url,
+            json=payload,
+            headers=self._chat_headers(await self.get_access_token()),
+            timeout=httpx.Timeout(read_timeout, connect=settings.GIGACHAT_CONNECT_TIMEOUT),
+        )
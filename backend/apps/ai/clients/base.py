@@ -0,0 +1,75 @@
+import hashlib
+import json
+import uuid
+from django.conf import settings
+
+from .token_manager import get_token_manager, parse_expires_at
+
+
+class BaseGigaChatClient:
+    """
+    Общая часть синхронного и асинхронного клиентов GigaChat:
+    адреса, формат запросов и разбор ответов. Транспорт — в наследниках.
+    """
+    AUTH_URL = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
+    CHAT_URL = "https://gigachat.devices.sberbank.ru/api/v1/chat/completions"
+    MODEL = "GigaChat"
+
+    def __init__(self):
+        self.client_id = settings.GIGACHAT_CLIENT_ID
+        self.secret = settings.GIGACHAT_SECRET
+        self.auth_url = settings.GIGACHAT_AUTH_URL or self.AUTH_URL
+        self.chat_url = settings.GIGACHAT_CHAT_URL or self.CHAT_URL
+        self.tokens = get_token_manager(self.client_id)
+
+    def _auth_headers(self) -> dict:
+        return {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Accept': 'application/json',
+            'RqUID': str(uuid.uuid4()),
+        }
+
+    def _auth_payload(self) -> dict:
+        return {"scope": "GIGACHAT_API_PERS"}
+
+    def _chat_headers(self, token: str) -> dict:
+        return {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json',
+        }
+
+    def _chat_payload(self, prompt: str, stream: bool = False) -> dict:
+        payload = {
+            "model": self.MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _prompt_key(self, prompt: str) -> str:
+        return hashlib.sha256(f'{self.MODEL}:{prompt}'.encode()).hexdigest()
+
+    @staticmethod
+    def _parse_token(data: dict) -> tuple:
+        return data["access_token"], parse_expires_at(data.get("expires_at"))
+
+    @staticmethod
+    def _parse_chat(data: dict) -> str:
+        return data["choices"][0]["message"]["content"]
+
+    @staticmethod
+    def _iter_stream(lines):
+        """Чанки потокового ответа: строки SSE «data: {...}» до «data: [DONE]»."""
+        for line in lines:
+            if not line or not line.startswith('data:'):
+                continue
+            data = line[len('data:'):].strip()
+            if data == '[DONE]':
+                return
+            yield json.loads(data)
+
+    @staticmethod
+    def _parse_delta(data: dict) -> str:
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ''
@@ -1,55 +1,105 @@
-import uuid
-import requests
 from requests.auth import HTTPBasicAuth
-from django.conf import settings
 
+from .base import BaseGigaChatClient
+from .http import get_session, get_timeout
+from .instrumentation import instrument
+from .singleflight import get_singleflight
 
-class GigaChatClient:
-    AUTH_URL = "https://ngw.devices.sberbank.ru:9443/api/v2/oauth"
-    CHAT_URL = "https://gigachat.devices.sberbank.ru/api/v1/chat/completions"
 
-    def __init__(self):
-        self.client_id = settings.GIGACHAT_CLIENT_ID
-        self.secret = settings.GIGACHAT_SECRET
+class GigaChatClient(BaseGigaChatClient):
+
+    def __init__(self, session=None):
+        super().__init__()
+        self._session = session
+
+    @property
+    def session(self):
+        return self._session or get_session()
 
     def get_access_token(self) -> str:
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Accept': 'application/json',
-            'RqUID': str(uuid.uuid4()),
-        }
-
-        payload = {"scope": "GIGACHAT_API_PERS"}
-
-        res = requests.post(
-            url=self.AUTH_URL,
-            headers=headers,
-            auth=HTTPBasicAuth(self.client_id, self.secret),
-            data=payload,
-            verify=False,
+        return self.tokens.get_token(self._request_access_token)
+
+    def _request_access_token(self) -> tuple:
+        with instrument('auth', self.MODEL) as call:
+            res = self.session.post(
+                url=self.auth_url,
+                headers=self._auth_headers(),
+                auth=HTTPBasicAuth(self.client_id, self.secret),
+                data=self._auth_payload(),
+                verify=False,
+                timeout=get_timeout(),
+            )
+            call.status = str(res.status_code)
+            res.raise_for_status()
+        return self._parse_token(res.json())
+
+    def ask(self, prompt: str, timeout: float = None) -> str:
+        """
+        Одновременные вызовы с одинаковым промптом (в том числе из других
+        процессов) склеиваются в один запрос к GigaChat.
+        timeout дополнительно ограничивает GIGACHAT_READ_TIMEOUT.
+        """
+        return get_singleflight().do(
+            self._prompt_key(prompt),
+            lambda: self._ask(prompt, timeout),
         )
-        res.raise_for_status()
-        return res.json()["access_token"]
 
-    def ask(self, prompt: str) -> str:
-        token = self.get_access_token()
+    def _ask(self, prompt: str, timeout: float = None) -> str:
+        payload = self._chat_payload(prompt)
 
-        payload = {
-            "model": "GigaChat",
-            "messages": [{"role": "user", "content": prompt}],
-        }
+        with instrument('chat', self.MODEL) as call:
+            res = self._post_chat(payload, timeout)
+            if res.status_code == 401:
+                # Токен отозван раньше срока — получаем новый и повторяем один раз
+                self.tokens.invalidate()
+                res = self._post_chat(payload, timeout)
+            call.status = str(res.status_code)
+            res.raise_for_status()
+            data = res.json()
+            call.record_usage(data.get('usage'))
 
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json',
-        }
+        return self._parse_chat(data)
 
-        res = requests.post(
-            self.CHAT_URL,
+    def stream(self, prompt: str, timeout: float = None):
+        """
+        Потоковый ответ (stream=true): отдаёт куски текста по мере
+        генерации. Не склеивается с другими вызовами и не повторяется —
+        часть ответа уже могла уйти клиенту. timeout ограничивает паузу
+        между чанками.
+        """
+        payload = self._chat_payload(prompt, stream=True)
+
+        with instrument('chat', self.MODEL) as call:
+            res = self._post_chat(payload, timeout, stream=True)
+            if res.status_code == 401:
+                res.close()
+                self.tokens.invalidate()
+                res = self._post_chat(payload, timeout, stream=True)
+            call.status = str(res.status_code)
+            try:
+                res.raise_for_status()
+                # В text/event-stream нет charset, а requests по умолчанию
+                # декодирует text/* как ISO-8859-1
+                res.encoding = 'utf-8'
+                for data in self._iter_stream(res.iter_lines(chunk_size=None, decode_unicode=True)):
+                    if data.get('usage'):
+                        call.record_usage(data['usage'])
+                    delta = self._parse_delta(data)
+                    if delta:
+                        yield delta
+            finally:
+                res.close()
+
+    def _post_chat(self, payload: dict, timeout: float = None, stream: bool = False):
+        connect_timeout, read_timeout = get_timeout()
+        if timeout:
+            read_timeout = min(read_timeout, timeout)
+
+        return self.session.post(
+            self.chat_url,
             json=payload,
-            headers=headers,
+            headers=self._chat_headers(self.get_access_token()),
             verify=False,
+            timeout=(connect_timeout, read_timeout),
+            stream=stream,
         )
-        res.raise_for_status()
-
-        return res.json()["choices"][0]["message"]["content"]
@@ -0,0 +1,58 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+
+_adapter = None
+_adapter_pid = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_adapter() -> HTTPAdapter:
+    """
+    Пул keep-alive соединений, общий для всего процесса.
+    После fork (gunicorn --preload) пул создаётся заново, чтобы дочерние
+    процессы не делили сокеты родителя.
+    """
+    global _adapter, _adapter_pid
+
+    pid = os.getpid()
+    if _adapter is not None and _adapter_pid == pid:
+        return _adapter
+
+    with _adapter_lock:
+        if _adapter is None or _adapter_pid != pid:
+            _adapter = HTTPAdapter(
+                pool_connections=settings.GIGACHAT_POOL_CONNECTIONS,
+                pool_maxsize=settings.GIGACHAT_POOL_MAXSIZE,
+                # При исчерпании пула поток ждёт свободное соединение,
+                # а не открывает новое сверх лимита
+                pool_block=True,
+            )
+            _adapter_pid = pid
+        return _adapter
+
+
+def get_session() -> requests.Session:
+    """
+    Session на поток поверх общего адаптера: сами сессии не делятся между
+    потоками, а соединения переиспользуются всем процессом.
+    """
+    adapter = get_adapter()
+    session = getattr(_local, 'session', None)
+    if session is None or _local.adapter is not adapter:
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.verify = False
+        _local.session = session
+        _local.adapter = adapter
+    return session
+
+
+def get_timeout() -> tuple:
+    return settings.GIGACHAT_CONNECT_TIMEOUT, settings.GIGACHAT_READ_TIMEOUT
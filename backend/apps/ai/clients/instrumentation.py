@@ -0,0 +1,94 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Номер попытки внутри RetryPolicy и область учёта расхода (вакансия, HR).
+# contextvars, а не thread-local: у каждой asyncio задачи свой контекст
+current_attempt = contextvars.ContextVar('ai_current_attempt', default=1)
+current_scope = contextvars.ContextVar('ai_usage_scope', default=None)
+
+_hooks = []
+
+
+@dataclass
+class CallEvent:
+    """Один HTTP вызов GigaChat: operation — 'auth' или 'chat'."""
+    operation: str
+    model: str
+    attempt: int = 1
+    # (vacancy_id, hr_id), если вызов сделан в usage_scope
+    scope: Optional[tuple] = None
+    status: str = ''
+    duration: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status.startswith('2')
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def record_usage(self, usage: dict):
+        """Поле usage ответа chat/completions: prompt_tokens, completion_tokens."""
+        usage = usage or {}
+        self.prompt_tokens = int(usage.get('prompt_tokens') or 0)
+        self.completion_tokens = int(usage.get('completion_tokens') or 0)
+
+
+def add_hook(hook):
+    """hook(event: CallEvent) вызывается после каждого вызова GigaChat."""
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+@contextmanager
+def instrument(operation: str, model: str):
+    """
+    Замеряет вызов внутри блока и передаёт CallEvent хукам. Код внутри
+    блока проставляет event.status (HTTP статус) и токены; если блок
+    упал до ответа, статусом становится имя исключения.
+    """
+    event = CallEvent(
+        operation=operation,
+        model=model,
+        attempt=current_attempt.get(),
+        scope=current_scope.get(),
+    )
+    started = time.perf_counter()
+    try:
+        yield event
+    except Exception as exc:
+        if not event.status:
+            event.status = type(exc).__name__
+        raise
+    finally:
+        event.duration = time.perf_counter() - started
+        for hook in list(_hooks):
+            try:
+                hook(event)
+            except Exception:
+                # Сбой учёта не должен ронять сам анализ
+                logger.exception('AI instrumentation hook failed')
+
+
+@contextmanager
+def usage_scope(vacancy):
+    """Вызовы GigaChat внутри блока учитываются на вакансию и её HR."""
+    token = current_scope.set((vacancy.pk, vacancy.hr_id))
+    try:
+        yield
+    finally:
+        current_scope.reset(token)
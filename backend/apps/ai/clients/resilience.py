@@ -0,0 +1,211 @@
+import asyncio
+import inspect
+import random
+import threading
+import time
+
+import httpx
+import requests
+from django.conf import settings
+
+from ..exceptions import CircuitOpenError, DeadlineExceeded, InvalidAIResponse
+from .instrumentation import current_attempt
+
+
+def is_outage(exc: Exception) -> bool:
+    """Ошибки, говорящие о проблемах на стороне GigaChat: сеть, таймауты, 429 и 5xx."""
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout,
+                        httpx.TransportError)):
+        return True
+    if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)) and exc.response is not None:
+        return exc.response.status_code == 429 or exc.response.status_code >= 500
+    return False
+
+
+def is_retryable(exc: Exception) -> bool:
+    # Битый JSON — не авария, но повторный запрос обычно даёт нормальный ответ
+    return is_outage(exc) or isinstance(exc, InvalidAIResponse)
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи: после failure_threshold аварийных ошибок подряд вызовы
+    отклоняются сразу (CircuitOpenError) в течение reset_timeout секунд,
+    затем пропускается один пробный вызов. Успех замыкает цепь.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def before_call(self) -> bool:
+        """Пропускает вызов или отклоняет его; True — это пробный вызов."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN:
+                raise CircuitOpenError('GigaChat временно недоступен, запрос отклонён')
+            if state == self.HALF_OPEN:
+                # Пробный вызов один: остальные ждут его результата как при OPEN
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                return True
+        return False
+
+    def release_probe(self):
+        """
+        Пробный вызов не дошёл до GigaChat (лимит, отключение клиента):
+        следующий вызов снова станет пробным, не дожидаясь reset_timeout.
+        """
+        with self._lock:
+            if self._state == self.OPEN:
+                self._state = self.HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self, exc: Exception):
+        if not is_outage(exc):
+            # GigaChat ответил, пусть и неудачно (4xx, битый JSON) — он доступен
+            self.record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state != self.CLOSED or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Один размыкатель на процесс для всех вызовов GigaChat."""
+    global _breaker
+
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.AI_BREAKER_RESET_TIMEOUT,
+            )
+        return _breaker
+
+
+class RetryPolicy:
+    """
+    Повторы с ограниченной экспоненциальной задержкой в пределах общего
+    дедлайна вызова. Каждой попытке передаётся оставшееся до дедлайна время,
+    чтобы она могла ограничить им таймаут чтения.
+    """
+
+    def __init__(self, max_attempts: int = None, deadline: float = None,
+                 base_delay: float = None, max_delay: float = None,
+                 breaker: CircuitBreaker = None):
+        self.max_attempts = max_attempts or settings.AI_CALL_MAX_ATTEMPTS
+        self.deadline = deadline or settings.AI_CALL_DEADLINE
+        self.base_delay = base_delay if base_delay is not None else settings.AI_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.AI_RETRY_MAX_DELAY
+        self.breaker = breaker or get_circuit_breaker()
+
+    def call(self, func, before_attempt=None):
+        """func(remaining_seconds) вызывается до max_attempts раз."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = self._remaining(started)
+            # Сначала размыкатель: отклонённая попытка не должна тратить лимиты
+            probe = self.breaker.before_call()
+            if before_attempt:
+                try:
+                    before_attempt()
+                except BaseException:
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+
+            token = current_attempt.set(attempt)
+            try:
+                result = func(remaining)
+            except Exception as exc:
+                self.breaker.record_failure(exc)
+                delay = self._next_delay(exc, attempt, started)
+                time.sleep(delay)
+                continue
+            finally:
+                current_attempt.reset(token)
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, afunc, before_attempt=None):
+        """
+        Асинхронный вариант call: afunc(remaining_seconds) — корутина-функция,
+        before_attempt может вернуть awaitable (например, AIQuota.aacquire).
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = self._remaining(started)
+            probe = self.breaker.before_call()
+            if before_attempt:
+                try:
+                    waiting = before_attempt()
+                    if inspect.isawaitable(waiting):
+                        await waiting
+                except BaseException:
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+
+            token = current_attempt.set(attempt)
+            try:
+                result = await afunc(remaining)
+            except Exception as exc:
+                self.breaker.record_failure(exc)
+                delay = self._next_delay(exc, attempt, started)
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                current_attempt.reset(token)
+            self.breaker.record_success()
+            return result
+
+    def _remaining(self, started: float) -> float:
+        remaining = self.deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            raise DeadlineExceeded(f'Вызов GigaChat не уложился в {self.deadline} с')
+        return remaining
+
+    def _next_delay(self, exc: Exception, attempt: int, started: float) -> float:
+        """Задержка перед следующей попыткой; если повторять нельзя — пробрасывает exc."""
+        if attempt >= self.max_attempts or not is_retryable(exc):
+            raise exc
+
+        # Полный джиттер, чтобы воркеры не повторяли запросы синхронно
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if time.monotonic() - started + delay >= self.deadline:
+            raise DeadlineExceeded(
+                f'Вызов GigaChat не уложился в {self.deadline} с'
+            ) from exc
+        return delay
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+import uuid
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Склеивает одинаковые одновременные вызовы: пока выполняется вызов с
+    ключом key, остальные вызывающие с тем же ключом ждут его и получают
+    тот же результат (или ту же ошибку).
+
+    Внутри процесса ожидание идёт через threading.Event / asyncio.Future.
+    Между процессами — через кеш Django: лидер берёт блокировку cache.add,
+    кладёт результат в кеш на короткое время, а остальные опрашивают его.
+    Если лидер пропал или упал, не оставив результата, вызывающий
+    выполняет вызов сам.
+    """
+    KEY_PREFIX = 'ai:singleflight'
+
+    def __init__(self, lock_ttl: float = None, result_ttl: int = None,
+                 poll_interval: float = None):
+        self.lock_ttl = lock_ttl or settings.AI_SINGLEFLIGHT_LOCK_TTL
+        self.result_ttl = result_ttl or settings.AI_SINGLEFLIGHT_RESULT_TTL
+        self.poll_interval = poll_interval or settings.AI_SINGLEFLIGHT_POLL_INTERVAL
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = weakref.WeakKeyDictionary()
+
+    def do(self, key: str, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            if call.event.wait(self.lock_ttl):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # Лидер завис дольше допустимого — не ждём его дальше
+            return func()
+
+        try:
+            call.result = self._do_shared(key, func)
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def ado(self, key: str, afunc):
+        calls = self._loop_calls()
+        future = calls.get(key)
+        if future is not None:
+            # shield: отмена одного ожидающего не должна отменять общий вызов
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        calls[key] = future
+        try:
+            result = await self._ado_shared(key, afunc)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Исключение уже получит сам лидер; ожидающих может не быть
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            calls.pop(key, None)
+
+    def _do_shared(self, key: str, func):
+        lock_key, result_key = self._keys(key)
+        token = uuid.uuid4().hex
+
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            # Результат проверяется и до блокировки: лидер мог уже закончить
+            # и снять её, тогда повторный вызов не нужен
+            found = cache.get(result_key)
+            if found is not None:
+                return found['value']
+            if cache.add(lock_key, token, timeout=self.lock_ttl):
+                break
+            if time.monotonic() >= deadline:
+                return func()
+            time.sleep(self.poll_interval)
+
+        try:
+            result = func()
+            cache.set(result_key, {'value': result}, timeout=self.result_ttl)
+            return result
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    async def _ado_shared(self, key: str, afunc):
+        lock_key, result_key = self._keys(key)
+        token = uuid.uuid4().hex
+
+        deadline = time.monotonic() + self.lock_ttl
+        while True:
+            found = await cache.aget(result_key)
+            if found is not None:
+                return found['value']
+            if await cache.aadd(lock_key, token, timeout=self.lock_ttl):
+                break
+            if time.monotonic() >= deadline:
+                return await afunc()
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            result = await afunc()
+            await cache.aset(result_key, {'value': result}, timeout=self.result_ttl)
+            return result
+        finally:
+            if await cache.aget(lock_key) == token:
+                await cache.adelete(lock_key)
+
+    def _keys(self, key: str) -> tuple:
+        return f'{self.KEY_PREFIX}:lock:{key}', f'{self.KEY_PREFIX}:result:{key}'
+
+    def _loop_calls(self) -> dict:
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.get(loop)
+        if calls is None:
+            calls = {}
+            self._async_calls[loop] = calls
+        return calls
+
+
+_singleflight = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    global _singleflight
+
+    with _singleflight_lock:
+        if _singleflight is None:
+            _singleflight = SingleFlight()
+        return _singleflight
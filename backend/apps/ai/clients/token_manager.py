@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class GigaChatTokenManager:
+    """
+    Хранит OAuth токен GigaChat до истечения срока действия.
+    Токен лежит в памяти процесса и в кеше Django, поэтому все воркеры
+    используют один и тот же токен, а обновление выполняется один раз.
+    """
+    CACHE_KEY_PREFIX = 'ai:gigachat:token'
+
+    def __init__(self, client_id: str, refresh_margin: int = None):
+        self.cache_key = f'{self.CACHE_KEY_PREFIX}:{client_id}'
+        self.refresh_margin = (
+            refresh_margin
+            if refresh_margin is not None
+            else settings.GIGACHAT_TOKEN_REFRESH_MARGIN
+        )
+        self._lock = threading.Lock()
+        self._async_locks = weakref.WeakKeyDictionary()
+        self._token = None
+        self._expires_at = 0.0
+
+    def get_token(self, fetch) -> str:
+        """
+        Возвращает действующий токен.
+        fetch() вызывается только при отсутствии свежего токена и должен
+        вернуть пару (access_token, expires_at в секундах epoch).
+        """
+        token = self._local_token()
+        if token:
+            return token
+
+        with self._lock:
+            # Пока ждали блокировку, другой поток мог уже обновить токен
+            token = self._local_token()
+            if token:
+                return token
+
+            cached = cache.get(self.cache_key)
+            if cached and self._is_fresh(cached['expires_at']):
+                self._token, self._expires_at = cached['token'], cached['expires_at']
+                return self._token
+
+            token, expires_at = fetch()
+            self._store(token, expires_at)
+            return token
+
+    async def aget_token(self, afetch) -> str:
+        """Асинхронный вариант get_token: afetch — корутина-функция."""
+        token = self._local_token()
+        if token:
+            return token
+
+        async with self._async_lock():
+            token = self._local_token()
+            if token:
+                return token
+
+            cached = await cache.aget(self.cache_key)
+            if cached and self._is_fresh(cached['expires_at']):
+                self._token, self._expires_at = cached['token'], cached['expires_at']
+                return self._token
+
+            token, expires_at = await afetch()
+            timeout = self._remember(token, expires_at)
+            if timeout > 0:
+                await cache.aset(
+                    self.cache_key,
+                    {'token': token, 'expires_at': expires_at},
+                    timeout=timeout,
+                )
+            return token
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+            cache.delete(self.cache_key)
+
+    async def ainvalidate(self):
+        self._token = None
+        self._expires_at = 0.0
+        await cache.adelete(self.cache_key)
+
+    def _local_token(self):
+        if self._token and self._is_fresh(self._expires_at):
+            return self._token
+        return None
+
+    def _is_fresh(self, expires_at: float) -> bool:
+        return expires_at - self.refresh_margin > time.time()
+
+    def _async_lock(self) -> asyncio.Lock:
+        # asyncio.Lock привязан к event loop, поэтому храним по одному на loop
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._async_locks[loop] = lock
+        return lock
+
+    def _remember(self, token: str, expires_at: float) -> int:
+        self._token, self._expires_at = token, expires_at
+        return int(expires_at - self.refresh_margin - time.time())
+
+    def _store(self, token: str, expires_at: float):
+        timeout = self._remember(token, expires_at)
+        if timeout > 0:
+            cache.set(
+                self.cache_key,
+                {'token': token, 'expires_at': expires_at},
+                timeout=timeout,
+            )
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(client_id: str) -> GigaChatTokenManager:
+    """Один менеджер токенов на client_id в пределах процесса."""
+    with _managers_lock:
+        manager = _managers.get(client_id)
+        if manager is None:
+            manager = GigaChatTokenManager(client_id)
+            _managers[client_id] = manager
+        return manager
+
+
+def parse_expires_at(value) -> float:
+    """GigaChat возвращает expires_at в миллисекундах epoch."""
+    if not value:
+        # Токен GigaChat живёт 30 минут
+        return time.time() + 30 * 60
+    value = float(value)
+    if value > 10 ** 11:
+        value /= 1000
+    return value
@@ -0,0 +1,22 @@
+class AIServiceError(Exception):
+    """Базовая ошибка AI анализа."""
+
+
+class InvalidAIResponse(AIServiceError):
+    """Модель вернула ответ, который не удалось разобрать как ожидаемый JSON."""
+
+
+class CircuitOpenError(AIServiceError):
+    """GigaChat признан недоступным, вызовы временно отклоняются без запроса."""
+
+
+class DeadlineExceeded(AIServiceError):
+    """Не уложились в отведённое на вызов время с учётом повторов."""
+
+
+class QuotaExceeded(AIServiceError):
+    """Исчерпан лимит запросов HR или общий лимит к GigaChat."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from apps.ai.services.analyzer import VacancyAIAnalyzer
+from apps.ai.stub_server import GigaChatStubServer, add_stub_arguments
+from apps.vacancy.models import Vacancy
+
+MODES = ('sync', 'threaded', 'async', 'batched')
+
+
+class Timings:
+    """Длительности вызовов GigaChat, как их видит анализатор."""
+
+    def __init__(self):
+        self.values = []
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.values.append(time.perf_counter() - started)
+        return timed
+
+    def awrap(self, afunc):
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await afunc(*args, **kwargs)
+            finally:
+                self.values.append(time.perf_counter() - started)
+        return timed
+
+    def percentile(self, q: float) -> float:
+        if not self.values:
+            return 0.0
+        return float(np.percentile(self.values, q)) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк VacancyAIAnalyzer на локальной заглушке GigaChat: '
+        'последовательно, пулом потоков, асинхронно и пакетами'
+    )
+
+    def add_arguments(self, parser):
+        add_stub_arguments(parser)
+        parser.add_argument('--vacancy', type=int, default=None,
+                            help='ID вакансии (по умолчанию — последняя созданная)')
+        parser.add_argument('--candidates', type=int, default=200)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Потоков для threaded и batched (по умолчанию AI_BATCH_MAX_WORKERS)')
+        parser.add_argument('--pack-size', type=int, default=5,
+                            help='Кандидатов в одном запросе в режиме batched')
+        parser.add_argument('--rate-limit', type=float, default=0,
+                            help='Лимиты запросов в секунду на время бенчмарка (0 — без ограничения)')
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        vacancy = (
+            Vacancy.objects.prefetch_related('skills')
+            .filter(**({'pk': options['vacancy']} if options['vacancy'] else {}))
+            .order_by('-created_at')
+            .first()
+        )
+        if vacancy is None:
+            raise CommandError('Нет вакансии для бенчмарка: создайте её или укажите --vacancy')
+
+        # Каждому кандидату — свои ответы, чтобы не срабатывала склейка запросов
+        candidates = {
+            number: {
+                'experience': f'{number % 10} лет коммерческой разработки на Python и Django',
+                'about': f'Проект №{number}: REST API, PostgreSQL, Celery, Docker.',
+            }
+            for number in range(options['candidates'])
+        }
+
+        with GigaChatStubServer.from_options(options) as server, override_settings(
+            GIGACHAT_AUTH_URL=server.auth_url,
+            GIGACHAT_CHAT_URL=server.chat_url,
+            AI_BATCH_RATE_LIMIT=options['rate_limit'],
+            AI_HR_RATE_LIMIT=options['rate_limit'],
+            AI_GLOBAL_RATE_LIMIT=options['rate_limit'],
+            # Кеш результатов отключён: каждый режим должен реально ходить в GigaChat
+            CACHES={
+                **settings.CACHES,
+                'ai_results': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+            },
+        ):
+            self.stdout.write(
+                f'Вакансия: {vacancy.pk}, кандидатов: {len(candidates)}, '
+                f'задержка заглушки: {server.latency * 1000:.0f} мс, '
+                f'ошибки: {server.error_rate:.0%}, ответы: {server.shape}'
+            )
+            self.stdout.write(
+                f'{"режим":<10}{"запросов":>10}{"ошибок":>8}'
+                f'{"p50, мс":>10}{"p95, мс":>10}{"канд./с":>10}'
+            )
+            for mode in options['modes']:
+                analyzer = VacancyAIAnalyzer()
+                analyzer.prompts.vacancy_context(vacancy)
+                analyzer.client.get_access_token()
+
+                timings = Timings()
+                analyzer.client.ask = timings.wrap(analyzer.client.ask)
+                analyzer.async_client.ask = timings.awrap(analyzer.async_client.ask)
+
+                started = time.perf_counter()
+                errors = getattr(self, f'_run_{mode}')(analyzer, vacancy, candidates, options)
+                elapsed = time.perf_counter() - started
+
+                self.stdout.write(
+                    f'{mode:<10}{len(timings.values):>10}{errors:>8}'
+                    f'{timings.percentile(50):>10.1f}{timings.percentile(95):>10.1f}'
+                    f'{len(candidates) / elapsed:>10.1f}'
+                )
+
+    def _run_sync(self, analyzer, vacancy, candidates, options) -> int:
+        errors = 0
+        for answers in candidates.values():
+            try:
+                analyzer.analyze_candidate(vacancy, answers, use_cache=False)
+            except Exception:
+                errors += 1
+        return errors
+
+    def _run_threaded(self, analyzer, vacancy, candidates, options) -> int:
+        return self._run_many(analyzer, vacancy, candidates, options, pack_size=1)
+
+    def _run_batched(self, analyzer, vacancy, candidates, options) -> int:
+        return self._run_many(analyzer, vacancy, candidates, options, pack_size=options['pack_size'])
+
+    def _run_many(self, analyzer, vacancy, candidates, options, pack_size: int) -> int:
+        outcomes = analyzer.analyze_many(
+            vacancy,
+            candidates,
+            max_workers=options['workers'],
+            prescreen=False,
+            pack_size=pack_size,
+        )
+        return sum(not outcome.ok for outcome in outcomes)
+
+    def _run_async(self, analyzer, vacancy, candidates, options) -> int:
+        async def run():
+            results = await asyncio.gather(
+                *(
+                    analyzer.aanalyze_candidate(vacancy, answers, use_cache=False)
+                    for answers in candidates.values()
+                ),
+                return_exceptions=True,
+            )
+            return sum(isinstance(result, Exception) for result in results)
+
+        return asyncio.run(run())
@@ -0,0 +1,47 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from apps.ai.clients.gigachat import GigaChatClient
+from apps.ai.stub_server import GigaChatStubServer
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает пропускную способность GigaChatClient с пулом соединений и без него'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        threads = options['threads']
+
+        with GigaChatStubServer() as server, override_settings(
+            GIGACHAT_AUTH_URL=server.auth_url,
+            GIGACHAT_CHAT_URL=server.chat_url,
+        ):
+            # Без пула: каждый вызов идёт через requests.post с новым соединением
+            no_pool = self._run(lambda: GigaChatClient(session=requests), total, threads)
+            pooled = self._run(GigaChatClient, total, threads)
+
+        self.stdout.write(f'Запросов: {total}, потоков: {threads}')
+        self.stdout.write(f'Без пула:  {no_pool:8.1f} req/s')
+        self.stdout.write(f'С пулом:   {pooled:8.1f} req/s')
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: x{pooled / no_pool:.2f}'))
+
+    def _run(self, make_client, total: int, threads: int) -> float:
+        client = make_client()
+        client.get_access_token()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            # Разные промпты, в том числе между прогонами: одинаковые singleflight
+            # склеил бы в один запрос или отдал бы из кеша результатов
+            run = uuid.uuid4().hex
+            list(executor.map(lambda number: client.ask(f'ping {run} {number}'), range(total)))
+        return total / (time.perf_counter() - started)
@@ -0,0 +1,57 @@
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.ai.services.similarity import VacancyIndex
+
+
+class Command(BaseCommand):
+    help = 'Замеряет поиск top-k по синтетическому memmap индексу вакансий'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--dims', type=int, default=settings.AI_SIMILARITY_DIMS)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        dims = options['dims']
+        rng = np.random.default_rng(options['seed'])
+
+        with tempfile.TemporaryDirectory() as path:
+            index = VacancyIndex(path, dims)
+            started = time.perf_counter()
+            index.rebuild(
+                (vacancy_id, self._unit(rng.standard_normal(dims, dtype=np.float32)))
+                for vacancy_id in range(1, options['vacancies'] + 1)
+            )
+            self.stdout.write(f'Сборка: {options["vacancies"]} × {dims} за {time.perf_counter() - started:.2f} с')
+
+            # Заново открытый индекс — как в другом процессе после сборки
+            index = VacancyIndex(path, dims)
+            queries = [self._unit(rng.standard_normal(dims, dtype=np.float32))
+                       for _ in range(options['queries'])]
+            index.search(queries[0], options['k'])
+
+            timings = []
+            for query in queries:
+                started = time.perf_counter()
+                index.search(query, options['k'])
+                timings.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            for vacancy_id in range(1, 101):
+                index.upsert(vacancy_id, queries[vacancy_id % len(queries)])
+            upsert = (time.perf_counter() - started) / 100
+
+        p50, p95 = np.percentile(timings, [50, 95]) * 1000
+        self.stdout.write(f'Поиск top-{options["k"]}: p50 {p50:.2f} мс, p95 {p95:.2f} мс')
+        self.stdout.write(f'Обновление одной вакансии: {upsert * 1000:.2f} мс')
+
+    @staticmethod
+    def _unit(vector):
+        return vector / np.linalg.norm(vector)
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ai.services.similarity import rebuild_vacancy_index
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает memmap индекс похожих вакансий из опубликованных вакансий'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Сколько вакансий читать из БД за раз')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        size = rebuild_vacancy_index(options['chunk_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано вакансий: {size} за {elapsed:.1f} с'))
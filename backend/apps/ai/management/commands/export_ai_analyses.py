@@ -0,0 +1,69 @@
+import os
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ai.services.export import AnalysisExport, parse_watermark
+
+
+class Command(BaseCommand):
+    help = 'Выгружает завершённые задачи AI анализа в JSONL или Parquet для оценки модели'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+        parser.add_argument('--output', default='-',
+                            help='Файл выгрузки; «-» — stdout (только для jsonl)')
+        parser.add_argument('--since', default=None,
+                            help='Выгрузить задачи, завершённые позже этого момента (ISO 8601)')
+        parser.add_argument('--watermark-file', default=None,
+                            help='Файл с водяным знаком: читается как --since, если тот не задан, '
+                                 'и обновляется после успешной выгрузки')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Сколько строк читать из БД за раз')
+        parser.add_argument('--row-group-size', type=int, default=10000,
+                            help='Строк в группе Parquet')
+
+    def handle(self, *args, **options):
+        watermark_file = Path(options['watermark_file']) if options['watermark_file'] else None
+        since = options['since']
+        if since is None and watermark_file is not None and watermark_file.exists():
+            since = watermark_file.read_text().strip() or None
+
+        try:
+            since = parse_watermark(since)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        export = AnalysisExport(since=since, chunk_size=options['chunk_size'])
+        if options['format'] == 'parquet':
+            if options['output'] == '-':
+                raise CommandError('Для parquet нужен --output с путём к файлу')
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise CommandError('Для выгрузки в Parquet установите pyarrow')
+            chunks = export.parquet(options['row_group_size'])
+        else:
+            chunks = export.jsonl()
+
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            # Пишем во временный файл: оборванная выгрузка не затрёт прошлую
+            output = Path(options['output'])
+            tmp = output.with_name(output.name + '.tmp')
+            with open(tmp, 'wb') as file:
+                for chunk in chunks:
+                    file.write(chunk)
+            os.replace(tmp, output)
+
+        if watermark_file is not None and export.watermark is not None:
+            watermark_file.write_text(export.watermark.isoformat())
+
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено задач: {export.count}, водяной знак: '
+            f'{export.watermark.isoformat() if export.watermark else "—"}'
+        ))
@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ai.clients.resilience import CircuitBreaker, get_circuit_breaker
+from apps.ai.services.analyzer import VacancyAIAnalyzer
+from apps.ai.services.jobs import claim_jobs, make_worker_id, requeue_stale_jobs, run_jobs
+
+
+class Command(BaseCommand):
+    help = 'Воркер очереди AI анализа: забирает задачи пачками и прогоняет их через GigaChat'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Пауза в секундах, когда очередь пуста')
+        parser.add_argument('--stale-timeout', type=int, default=15 * 60,
+                            help='Через сколько секунд задача упавшего воркера возвращается в очередь')
+        parser.add_argument('--pack-size', type=int, default=None,
+                            help='Сколько кандидатов упаковывать в один запрос к GigaChat')
+        parser.add_argument('--once', action='store_true',
+                            help='Обработать одну пачку и выйти')
+
+    def handle(self, *args, **options):
+        worker_id = make_worker_id()
+        analyzer = VacancyAIAnalyzer()
+        self.stdout.write(f'AI воркер {worker_id} запущен')
+
+        while True:
+            requeued = requeue_stale_jobs(options['stale_timeout'])
+            if requeued:
+                self.stdout.write(self.style.WARNING(f'Возвращено в очередь зависших задач: {requeued}'))
+
+            # Пока цепь разомкнута, задачи не забираем: каждая попытка
+            # впустую расходовала бы attempts
+            if get_circuit_breaker().state == CircuitBreaker.OPEN and not options['once']:
+                time.sleep(options['sleep'])
+                continue
+
+            jobs = claim_jobs(worker_id, options['batch_size'])
+            requeued = 0
+            if jobs:
+                requeued = run_jobs(jobs, analyzer, pack_size=options['pack_size'])
+                self.stdout.write(f'Обработано задач: {len(jobs) - requeued}')
+                if requeued:
+                    self.stdout.write(self.style.WARNING(
+                        f'Возвращено в очередь из-за недоступности GigaChat: {requeued}'
+                    ))
+
+            if options['once']:
+                break
+            if not jobs or requeued:
+                time.sleep(options['sleep'])
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from apps.ai.stub_server import GigaChatStubServer, add_stub_arguments
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает локальную заглушку GigaChat (OAuth и chat/completions). '
+        'Адреса для GIGACHAT_AUTH_URL и GIGACHAT_CHAT_URL выводятся при старте'
+    )
+
+    def add_arguments(self, parser):
+        add_stub_arguments(parser)
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        server = GigaChatStubServer.from_options(options, host=options['host'], port=options['port'])
+        self.stdout.write(f'GIGACHAT_AUTH_URL={server.auth_url}')
+        self.stdout.write(f'GIGACHAT_CHAT_URL={server.chat_url}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0001_initial'),
+        ('vacancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calls', models.PositiveIntegerField(default=0, verbose_name='Вызовы')),
+                ('failed_calls', models.PositiveIntegerField(default=0, verbose_name='Неудачные вызовы')),
+                ('retries', models.PositiveIntegerField(default=0, verbose_name='Повторы')),
+                ('prompt_tokens', models.PositiveBigIntegerField(default=0, verbose_name='Токены промпта')),
+                ('completion_tokens', models.PositiveBigIntegerField(default=0, verbose_name='Токены ответа')),
+                ('cost', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Стоимость, ₽')),
+                ('duration', models.FloatField(default=0, verbose_name='Время вызовов, с')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hr', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ai_usage', to=settings.AUTH_USER_MODEL, verbose_name='HR')),
+                ('vacancy', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ai_usage', to='vacancy.vacancy', verbose_name='Вакансия')),
+            ],
+            options={
+                'verbose_name': 'Расход AI',
+                'verbose_name_plural': 'Расход AI',
+                'ordering': ['-updated_at'],
+            },
+        ),
+    ]
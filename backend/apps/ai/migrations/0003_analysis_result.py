@@ -0,0 +1,40 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0002_ai_usage'),
+        ('vacancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Оценка')),
+                ('strengths', models.JSONField(blank=True, default=list, verbose_name='Сильные стороны')),
+                ('weaknesses', models.JSONField(blank=True, default=list, verbose_name='Слабые стороны')),
+                ('summary', models.TextField(blank=True, verbose_name='Вывод')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('input_hash', models.CharField(max_length=64, verbose_name='Хеш входных данных')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analysis_results', to=settings.AUTH_USER_MODEL, verbose_name='Кандидат')),
+                ('vacancy', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='analysis_results', to='vacancy.vacancy', verbose_name='Вакансия')),
+            ],
+            options={
+                'verbose_name': 'Результат AI анализа',
+                'verbose_name_plural': 'Результаты AI анализа',
+                'ordering': ['vacancy', '-score'],
+                'indexes': [models.Index(fields=['vacancy', '-score'], name='ai_result_vacancy_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vacancy', 'candidate'), name='unique_analysis_result_per_candidate')],
+            },
+        ),
+    ]
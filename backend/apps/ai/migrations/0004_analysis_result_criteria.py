@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0003_analysis_result'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisresult',
+            name='criteria',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Оценки по критериям'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0004_analysis_result_criteria'),
+        ('vacancy', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analysisjob',
+            index=models.Index(fields=['finished_at', 'id'], name='ai_analysis_finishe_aa9f04_idx'),
+        ),
+    ]
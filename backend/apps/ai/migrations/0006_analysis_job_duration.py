@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai', '0005_analysis_job_finished_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='duration',
+            field=models.FloatField(blank=True, null=True, verbose_name='Длительность анализа, с'),
+        ),
+    ]
@@ -0,0 +1,166 @@
+from django.db import models
+from django.conf import settings
+
+
+class AnalysisJob(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    vacancy = models.ForeignKey(
+        'vacancy.Vacancy',
+        on_delete=models.CASCADE,
+        related_name='analysis_jobs',
+        verbose_name='Вакансия'
+    )
+    candidate = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='analysis_jobs',
+        verbose_name='Кандидат'
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='requested_analysis_jobs',
+        verbose_name='Кто запросил'
+    )
+    candidate_answers = models.JSONField(default=dict, verbose_name='Ответы кандидата')
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name='Результат')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Попытки')
+
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Воркер')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Время в вызовах GigaChat по этой задаче (CandidateAnalysis.duration)
+    duration = models.FloatField(null=True, blank=True, verbose_name='Длительность анализа, с')
+
+    class Meta:
+        verbose_name = 'Задача AI анализа'
+        verbose_name_plural = 'Задачи AI анализа'
+        ordering = ['-created_at']
+        indexes = [
+            # Выборка очереди воркером: WHERE status = 'pending' ORDER BY created_at
+            models.Index(fields=['status', 'created_at']),
+            # Инкрементальная выгрузка: WHERE finished_at > X ORDER BY finished_at, id
+            models.Index(fields=['finished_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.vacancy_id} — {self.get_status_display()}'
+
+
+class AnalysisResultQuerySet(models.QuerySet):
+
+    def ranked(self, vacancy, min_score: float = None):
+        """
+        Кандидаты вакансии по убыванию оценки, не ниже min_score (по
+        умолчанию Vacancy.min_ai_score). Выборка идёт диапазоном по индексу
+        (vacancy, -score), поэтому срез [:N] не сортирует всю вакансию.
+        """
+        if min_score is None:
+            min_score = vacancy.min_ai_score
+        return self.filter(vacancy=vacancy, score__gte=min_score).order_by('-score')
+
+
+class AnalysisResult(models.Model):
+    """Последний результат AI анализа кандидата по вакансии."""
+    # Отдельный индекс по vacancy не нужен: его покрывают оба составных ниже
+    vacancy = models.ForeignKey(
+        'vacancy.Vacancy',
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='analysis_results',
+        verbose_name='Вакансия'
+    )
+    candidate = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='analysis_results',
+        verbose_name='Кандидат'
+    )
+    # Итоговая оценка: взвешенные по Vacancy.ai_weight_config подоценки
+    # criteria, а если модель их не вернула — общая оценка модели
+    score = models.FloatField(verbose_name='Оценка')
+    criteria = models.JSONField(default=dict, blank=True, verbose_name='Оценки по критериям')
+    strengths = models.JSONField(default=list, blank=True, verbose_name='Сильные стороны')
+    weaknesses = models.JSONField(default=list, blank=True, verbose_name='Слабые стороны')
+    summary = models.TextField(blank=True, verbose_name='Вывод')
+    model = models.CharField(max_length=100, verbose_name='Модель')
+    # Хеш входа (вакансия + updated_at, ответы, модель) — тот же, что ключ
+    # кеша результатов: по нему видно, устарел ли результат
+    input_hash = models.CharField(max_length=64, verbose_name='Хеш входных данных')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AnalysisResultQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Результат AI анализа'
+        verbose_name_plural = 'Результаты AI анализа'
+        ordering = ['vacancy', '-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vacancy', 'candidate'],
+                name='unique_analysis_result_per_candidate',
+            ),
+        ]
+        indexes = [
+            # Топ кандидатов вакансии: WHERE vacancy_id = X AND score >= Y ORDER BY score DESC
+            models.Index(fields=['vacancy', '-score'], name='ai_result_vacancy_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.vacancy_id} / {self.candidate_id}: {self.score}'
+
+
+class AIUsage(models.Model):
+    """Накопленный расход GigaChat по вакансии (и её HR)."""
+    vacancy = models.OneToOneField(
+        'vacancy.Vacancy',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ai_usage',
+        verbose_name='Вакансия'
+    )
+    hr = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ai_usage',
+        verbose_name='HR'
+    )
+    calls = models.PositiveIntegerField(default=0, verbose_name='Вызовы')
+    failed_calls = models.PositiveIntegerField(default=0, verbose_name='Неудачные вызовы')
+    retries = models.PositiveIntegerField(default=0, verbose_name='Повторы')
+    prompt_tokens = models.PositiveBigIntegerField(default=0, verbose_name='Токены промпта')
+    completion_tokens = models.PositiveBigIntegerField(default=0, verbose_name='Токены ответа')
+    cost = models.DecimalField(max_digits=14, decimal_places=4, default=0, verbose_name='Стоимость, ₽')
+    duration = models.FloatField(default=0, verbose_name='Время вызовов, с')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Расход AI'
+        verbose_name_plural = 'Расход AI'
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f'{self.vacancy_id or "—"}: {self.calls} вызовов, {self.cost} ₽'
@@ -0,0 +1,22 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+def format_event(event: str, data) -> str:
+    """Одно событие Server-Sent Events."""
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n'
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Нужен, чтобы DRF принимал Accept: text/event-stream. Сам поток отдаёт
+    StreamingHttpResponse; через рендерер проходят только ошибки до его
+    начала (валидация, права) — они уходят одним событием error.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data).encode(self.charset)
@@ -0,0 +1,100 @@
+from rest_framework import serializers
+
+from apps.vacancy.models import Vacancy
+from .models import AIUsage, AnalysisJob, AnalysisResult
+
+
+class AnalysisJobSerializer(serializers.ModelSerializer):
+    vacancy = serializers.PrimaryKeyRelatedField(queryset=Vacancy.objects.all())
+
+    class Meta:
+        model = AnalysisJob
+        fields = [
+            'id',
+            'vacancy',
+            'candidate',
+            'candidate_answers',
+            'status',
+            'result',
+            'error',
+            'attempts',
+            'created_at',
+            'finished_at',
+        ]
+        read_only_fields = (
+            'id', 'status', 'result', 'error', 'attempts', 'created_at', 'finished_at',
+        )
+        extra_kwargs = {'candidate_answers': {'required': True}}
+
+    def validate_vacancy(self, vacancy):
+        request = self.context.get('request')
+        user = request.user if request else None
+
+        if user and user.role != 'admin' and vacancy.hr_id != user.id:
+            raise serializers.ValidationError('Можно анализировать кандидатов только своих вакансий')
+        return vacancy
+
+    def validate_candidate_answers(self, value):
+        if not isinstance(value, dict) or not value:
+            raise serializers.ValidationError('Ответы кандидата должны быть непустым объектом')
+        return value
+
+
+class AnalysisStreamSerializer(AnalysisJobSerializer):
+    """Запрос потокового анализа: те же поля и проверки, что у задачи."""
+
+    class Meta(AnalysisJobSerializer.Meta):
+        fields = ['vacancy', 'candidate', 'candidate_answers']
+        read_only_fields = ()
+
+
+class SimilarVacanciesSerializer(serializers.Serializer):
+    candidate_answers = serializers.JSONField()
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def validate_candidate_answers(self, value):
+        if not isinstance(value, dict) or not value:
+            raise serializers.ValidationError('Ответы кандидата должны быть непустым объектом')
+        return value
+
+
+class AnalysisResultSerializer(serializers.ModelSerializer):
+    candidate_email = serializers.EmailField(source='candidate.email', read_only=True)
+
+    class Meta:
+        model = AnalysisResult
+        fields = [
+            'id',
+            'vacancy',
+            'candidate',
+            'candidate_email',
+            'score',
+            'strengths',
+            'weaknesses',
+            'summary',
+            'model',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class AIUsageSerializer(serializers.ModelSerializer):
+    vacancy_title = serializers.CharField(source='vacancy.title', read_only=True, default=None)
+
+    class Meta:
+        model = AIUsage
+        fields = [
+            'id',
+            'vacancy',
+            'vacancy_title',
+            'hr',
+            'calls',
+            'failed_calls',
+            'retries',
+            'prompt_tokens',
+            'completion_tokens',
+            'cost',
+            'duration',
+            'updated_at',
+        ]
+        read_only_fields = fields
@@ -1,29 +1,354 @@
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from ..clients.async_gigachat import AsyncGigaChatClient
 from ..clients.gigachat import GigaChatClient
+from ..clients.instrumentation import usage_scope
+from ..clients.resilience import RetryPolicy, get_circuit_breaker
+from .prescorer import CandidatePreScorer
+from .prompt import VacancyPromptBuilder
+from .ratelimit import AIQuota, get_batch_limiter
+from .response import SummaryExtractor, parse_analysis, parse_batch_analysis
+from .result_cache import AnalysisResultCache
+from .usage import get_usage_recorder
+
+
+@dataclass
+class CandidateAnalysis:
+    candidate_id: Any
+    result: Optional[dict] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+    # Заполнено, если кандидат отсеян локальным скорингом без вызова LLM
+    prescore: Optional[float] = None
+    # Секунды внутри вызовов GigaChat (с повторами, без ожидания лимитов);
+    # у кандидатов одного пакетного запроса — длительность этого запроса.
+    # None — GigaChat не вызывался (кеш, предскоринг)
+    duration: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class VacancyAIAnalyzer:
 
     def __init__(self):
         self.client = GigaChatClient()
+        self.async_client = AsyncGigaChatClient()
+        self.cache = AnalysisResultCache()
+        self.prompts = VacancyPromptBuilder()
+
+    def build_prompt(self, vacancy, candidate_answers: dict) -> str:
+        return self.prompts.build(vacancy, candidate_answers).text
 
-    def analyze_candidate(self, vacancy, candidate_answers: dict) -> dict:
-        prompt = f"""
-            Ты HR AI ассистент.
+    def analyze_candidate(self, vacancy, candidate_answers: dict,
+                          use_cache: bool = True) -> dict:
+        """
+        Возвращает проверенный результат анализа:
+        {'score': float, 'strengths': [...], 'weaknesses': [...], 'summary': str}
+        и, если модель их вернула, 'criteria': {критерий: float}.
+        Битый ответ модели и сбои GigaChat повторяются в пределах
+        AI_CALL_DEADLINE; при недоступности GigaChat — CircuitOpenError,
+        при исчерпанном лимите HR или общем лимите — QuotaExceeded.
+        """
+        cache_key = self.cache.make_key(vacancy, candidate_answers, self.client.MODEL)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        prompt = self.build_prompt(vacancy, candidate_answers)
+        quota = AIQuota(vacancy.hr_id)
+        recorder = get_usage_recorder()
+        try:
+            with usage_scope(vacancy):
+                result = self._ask(
+                    prompt,
+                    RetryPolicy(),
+                    before_attempt=lambda: quota.acquire(settings.AI_QUOTA_MAX_WAIT),
+                )
+        finally:
+            recorder.flush_if_due()
+        self.cache.set(cache_key, result)
+        return result
 
-            Вакансия:   
-            Название: {vacancy.title}
-            Требования: {vacancy.requirements}
-            Навыки: {vacancy.skills}
+    async def aanalyze_candidate(self, vacancy, candidate_answers: dict,
+                                 use_cache: bool = True) -> dict:
+        """
+        Асинхронная версия analyze_candidate для ASGI views и пакетных задач.
+        Число одновременных запросов ограничено GIGACHAT_MAX_CONCURRENCY.
+        """
+        cache_key = self.cache.make_key(vacancy, candidate_answers, self.async_client.MODEL)
+        if use_cache:
+            cached = await self.cache.aget(cache_key)
+            if cached is not None:
+                return cached
 
-            Ответы кандидата:
-            {candidate_answers}
+        # Навыки вакансии читаются из БД, поэтому сборка промпта — в потоке
+        prompt = await sync_to_async(self.build_prompt)(vacancy, candidate_answers)
+        quota = AIQuota(vacancy.hr_id)
+        recorder = get_usage_recorder()
+        try:
+            with usage_scope(vacancy):
+                result = await self._aask(
+                    prompt,
+                    RetryPolicy(),
+                    before_attempt=lambda: quota.aacquire(settings.AI_QUOTA_MAX_WAIT),
+                )
+        finally:
+            if recorder.is_due:
+                await sync_to_async(recorder.flush)()
+        await self.cache.aset(cache_key, result)
+        return result
 
-            Верни JSON:
-            score (0-100)
-            strengths
-            weaknesses
-            summary
+    def stream_candidate(self, vacancy, candidate_answers: dict,
+                         use_cache: bool = True) -> Iterator[tuple]:
+        """
+        Потоковый анализ: отдаёт ('summary', кусок текста) по мере генерации
+        и в конце ('result', проверенный результат). Повторов нет — часть
+        ответа уже ушла клиенту; ошибки пробрасываются вызывающему.
         """
+        cache_key = self.cache.make_key(vacancy, candidate_answers, self.client.MODEL)
+        if use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield 'result', cached
+                return
+
+        prompt = self.build_prompt(vacancy, candidate_answers)
+        # Сначала размыкатель: при открытой цепи лимит HR не тратится
+        breaker = get_circuit_breaker()
+        probe = breaker.before_call()
+        try:
+            AIQuota(vacancy.hr_id).acquire(settings.AI_QUOTA_MAX_WAIT)
+        except BaseException:
+            if probe:
+                breaker.release_probe()
+            raise
+
+        summary = SummaryExtractor()
+        chunks = []
+        try:
+            with usage_scope(vacancy):
+                for delta in self.client.stream(prompt):
+                    chunks.append(delta)
+                    text = summary.feed(delta)
+                    if text:
+                        yield 'summary', text
+            result = parse_analysis(''.join(chunks))
+        except Exception as exc:
+            breaker.record_failure(exc)
+            raise
+        except BaseException:
+            # Клиент отключился (GeneratorExit на yield): если GigaChat уже
+            # начал отвечать, он доступен; иначе пробный вызов не состоялся
+            if chunks:
+                breaker.record_success()
+            elif probe:
+                breaker.release_probe()
+            raise
+        finally:
+            get_usage_recorder().flush_if_due()
+
+        breaker.record_success()
+        self.cache.set(cache_key, result)
+        yield 'result', result
+
+    def _ask(self, prompt: str, policy: RetryPolicy, before_attempt=None, on_time=None) -> dict:
+        def attempt(remaining):
+            started = time.perf_counter()
+            try:
+                return parse_analysis(self.client.ask(prompt, timeout=remaining))
+            finally:
+                if on_time:
+                    on_time(time.perf_counter() - started)
+
+        return policy.call(attempt, before_attempt=before_attempt)
+
+    async def _aask(self, prompt: str, policy: RetryPolicy, before_attempt=None) -> dict:
+        async def attempt(remaining):
+            return parse_analysis(await self.async_client.ask(prompt, timeout=remaining))
+
+        return await policy.acall(attempt, before_attempt=before_attempt)
+
+    def analyze_many(self, vacancy, candidates, max_workers: int = None,
+                     max_retries: int = None, prescreen: bool = True,
+                     pack_size: int = None) -> Iterator[CandidateAnalysis]:
+        """
+        Анализирует кандидатов пулом потоков и отдаёт результаты по мере
+        готовности (в порядке завершения, а не в порядке входа).
+
+        candidates — словарь {candidate_id: answers} или итерируемое пар
+        (candidate_id, answers). Ошибка одного кандидата не прерывает пакет:
+        она возвращается в CandidateAnalysis.error.
+
+        При prescreen=True и заданном Vacancy.min_ai_score кандидаты, чья
+        локальная оценка заметно ниже порога, в GigaChat не отправляются.
+
+        При pack_size > 1 в один запрос к GigaChat упаковывается до pack_size
+        кандидатов (вакансия передаётся один раз). Кандидаты, для которых
+        пакетный ответ не прошёл проверку, анализируются по одному.
+        """
+        max_workers = max_workers or settings.AI_BATCH_MAX_WORKERS
+        pack_size = max(pack_size or settings.AI_PACK_SIZE, 1)
+        max_retries = settings.AI_BATCH_MAX_RETRIES if max_retries is None else max_retries
+        items = iter(candidates.items() if isinstance(candidates, dict) else candidates)
+
+        # Контекст вакансии (с навыками из БД) собираем здесь, а не в потоках пула
+        self.prompts.vacancy_context(vacancy)
+
+        scorer = None
+        if prescreen and vacancy.min_ai_score > 0:
+            scorer = CandidatePreScorer(vacancy)
+            threshold = vacancy.min_ai_score - settings.AI_PRESCORE_MARGIN
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending = set()
+        try:
+            while True:
+                chunk = list(islice(items, settings.AI_PRESCORE_CHUNK_SIZE))
+                if not chunk:
+                    break
+
+                if scorer:
+                    chunk, rejected = scorer.split(chunk, threshold)
+                    for candidate_id, score in rejected:
+                        yield self._prescreened(candidate_id, score)
+
+                # Держим в очереди не больше 2 * max_workers задач, чтобы не
+                # создавать тысячи futures для большой вакансии сразу
+                for start in range(0, len(chunk), pack_size):
+                    pending.add(executor.submit(
+                        self._analyze_pack, vacancy, chunk[start:start + pack_size], max_retries
+                    ))
+                    if len(pending) >= max_workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            get_usage_recorder().flush()
+
+    @staticmethod
+    def _prescreened(candidate_id, score: float) -> CandidateAnalysis:
+        return CandidateAnalysis(
+            candidate_id=candidate_id,
+            prescore=score,
+            result={
+                'score': score,
+                'strengths': [],
+                'weaknesses': [],
+                'summary': 'Кандидат отсеян предварительным скорингом: '
+                           'оценка ниже минимального порога вакансии.',
+            },
+        )
+
+    def _analyze_pack(self, vacancy, pack: list, max_retries: int) -> list:
+        """Анализ пачки кандидатов одним запросом с откатом на поштучный анализ."""
+        if len(pack) == 1:
+            return [self._analyze_with_retries(vacancy, *pack[0], max_retries)]
+
+        outcomes, todo = [], []
+        for candidate_id, answers in pack:
+            cache_key = self.cache.make_key(vacancy, answers, self.client.MODEL)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                outcomes.append(CandidateAnalysis(candidate_id=candidate_id, result=cached))
+            else:
+                todo.append((candidate_id, answers, cache_key))
+
+        if len(todo) < 2:
+            return outcomes + [
+                self._analyze_with_retries(vacancy, candidate_id, answers, max_retries)
+                for candidate_id, answers, _ in todo
+            ]
+
+        limiter = get_batch_limiter()
+        quota = AIQuota(vacancy.hr_id)
+        attempts = 0
+        duration = 0.0
+
+        def before_attempt():
+            nonlocal attempts
+            limiter.acquire()
+            # Пакетный анализ не отклоняется по лимиту, а ждёт своей очереди
+            quota.acquire()
+            attempts += 1
+
+        def ask(remaining):
+            nonlocal duration
+            started = time.perf_counter()
+            try:
+                return self.client.ask(prompt, timeout=remaining)
+            finally:
+                duration += time.perf_counter() - started
+
+        try:
+            prompt = self.prompts.build_batch(vacancy, [answers for _, answers, _ in todo]).text
+            with usage_scope(vacancy):
+                text = RetryPolicy(max_attempts=max_retries + 1).call(ask, before_attempt=before_attempt)
+            results = parse_batch_analysis(text, len(todo))
+        except Exception:
+            # Пакет целиком не удался — каждый кандидат получит свой запрос
+            results = {}
+
+        for number, (candidate_id, answers, cache_key) in enumerate(todo, start=1):
+            result = results.get(number)
+            if result is None:
+                outcomes.append(
+                    self._analyze_with_retries(vacancy, candidate_id, answers, max_retries)
+                )
+                continue
+            self.cache.set(cache_key, result)
+            outcomes.append(CandidateAnalysis(
+                candidate_id=candidate_id, result=result, attempts=attempts, duration=duration,
+            ))
+        return outcomes
+
+    def _analyze_with_retries(self, vacancy, candidate_id, answers: dict,
+                              max_retries: int) -> CandidateAnalysis:
+        outcome = CandidateAnalysis(candidate_id=candidate_id)
+
+        # Попадание в кеш не должно расходовать лимит запросов
+        cache_key = self.cache.make_key(vacancy, answers, self.client.MODEL)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            outcome.result = cached
+            return outcome
+
+        limiter = get_batch_limiter()
+        quota = AIQuota(vacancy.hr_id)
+
+        def before_attempt():
+            limiter.acquire()
+            quota.acquire()
+            outcome.attempts += 1
+
+        def on_time(seconds):
+            outcome.duration = (outcome.duration or 0.0) + seconds
 
-        response = self.client.ask(prompt)
-        return response
+        try:
+            prompt = self.build_prompt(vacancy, answers)
+            with usage_scope(vacancy):
+                outcome.result = self._ask(
+                    prompt,
+                    RetryPolicy(max_attempts=max_retries + 1),
+                    before_attempt=before_attempt,
+                    on_time=on_time,
+                )
+            self.cache.set(cache_key, outcome.result)
+        except Exception as exc:
+            outcome.error = exc
+        return outcome
@@ -0,0 +1,191 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import AnalysisJob
+
+
+# Вложенные объекты: в JSONL они остаются объектами, в Parquet пишутся JSON строками
+JSON_FIELDS = ('candidate_answers', 'result')
+
+
+def parse_watermark(value):
+    """Водяной знак из строки ISO 8601; без часового пояса считается в TIME_ZONE."""
+    if not value:
+        return None
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _json_default(value):
+    # Полная точность, а не миллисекунды DjangoJSONEncoder: finished_at
+    # последней строки годится как since для следующей выгрузки
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _seconds(start, end):
+    if start is None or end is None:
+        return None
+    return round((end - start).total_seconds(), 3)
+
+
+class AnalysisExport:
+    """
+    Потоковая выгрузка завершённых задач AI анализа для оценки модели:
+    входные данные промпта, ответ, оценка, попытки и задержки.
+
+    Строки читаются из БД через iterator(chunk_size) в порядке
+    (finished_at, id), поэтому в памяти не больше одной пачки. since —
+    водяной знак прошлой выгрузки, после неё watermark — наибольший
+    finished_at, его передают в since следующей.
+
+    finished_at воркер ставит до коммита, и задача с finished_at раньше
+    водяного знака может появиться в БД уже после выгрузки. Поэтому
+    выгружаются задачи, завершённые позже since - overlap (по умолчанию
+    AI_EXPORT_OVERLAP): гарантия — «хотя бы один раз» для задач,
+    закоммиченных не позже overlap секунд после finished_at. Строки из
+    окна перекрытия повторяются между выгрузками, потребитель
+    отбрасывает повторы по job_id.
+    """
+
+    def __init__(self, since=None, chunk_size: int = 1000, overlap: float = None):
+        self.since = since
+        self.chunk_size = chunk_size
+        self.overlap = timedelta(seconds=settings.AI_EXPORT_OVERLAP if overlap is None else overlap)
+        self.watermark = since
+        self.count = 0
+
+    def queryset(self):
+        jobs = AnalysisJob.objects.filter(
+            status__in=[AnalysisJob.Status.DONE, AnalysisJob.Status.FAILED],
+            finished_at__isnull=False,
+        )
+        if self.since is not None:
+            jobs = jobs.filter(finished_at__gt=self.since - self.overlap)
+        return (
+            jobs.select_related('vacancy')
+            .prefetch_related('vacancy__skills')
+            .order_by('finished_at', 'pk')
+        )
+
+    def rows(self):
+        for job in self.queryset().iterator(chunk_size=self.chunk_size):
+            vacancy = job.vacancy
+            result = job.result if isinstance(job.result, dict) else None
+            yield {
+                'job_id': job.pk,
+                'vacancy_id': job.vacancy_id,
+                'candidate_id': job.candidate_id,
+                'status': job.status,
+                'vacancy_title': vacancy.title,
+                'vacancy_experience_level': vacancy.experience_level,
+                'vacancy_requirements': vacancy.requirements,
+                'vacancy_skills': sorted(skill.name for skill in vacancy.skills.all()),
+                'candidate_answers': job.candidate_answers,
+                'result': job.result,
+                'score': result.get('score') if result else None,
+                'error': job.error,
+                'attempts': job.attempts,
+                'created_at': job.created_at,
+                'locked_at': job.locked_at,
+                'finished_at': job.finished_at,
+                'queue_seconds': _seconds(job.created_at, job.locked_at),
+                # Измеренное время вызовов GigaChat: finished_at - locked_at
+                # включало бы ожидание за другими задачами пачки воркера
+                'latency_seconds': round(job.duration, 3) if job.duration is not None else None,
+            }
+            self.count += 1
+            # Строки из окна перекрытия старше since: водяной знак назад не идёт
+            if self.watermark is None or job.finished_at > self.watermark:
+                self.watermark = job.finished_at
+
+    def jsonl(self):
+        """Строки выгрузки в JSON Lines, по строке на задачу."""
+        for row in self.rows():
+            yield json.dumps(row, ensure_ascii=False, default=_json_default).encode() + b'\n'
+
+    def parquet(self, row_group_size: int = 10000):
+        """
+        Выгрузка в Parquet кусками байтов: каждая группа строк пишется, как
+        только набралась, поэтому файл можно отдавать потоком. Нужен pyarrow.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ('job_id', pa.int64()),
+            ('vacancy_id', pa.int64()),
+            ('candidate_id', pa.int64()),
+            ('status', pa.string()),
+            ('vacancy_title', pa.string()),
+            ('vacancy_experience_level', pa.string()),
+            ('vacancy_requirements', pa.string()),
+            ('vacancy_skills', pa.list_(pa.string())),
+            ('candidate_answers', pa.string()),
+            ('result', pa.string()),
+            ('score', pa.float64()),
+            ('error', pa.string()),
+            ('attempts', pa.int32()),
+            ('created_at', pa.timestamp('us', tz='UTC')),
+            ('locked_at', pa.timestamp('us', tz='UTC')),
+            ('finished_at', pa.timestamp('us', tz='UTC')),
+            ('queue_seconds', pa.float64()),
+            ('latency_seconds', pa.float64()),
+        ])
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        try:
+            batch = []
+            for row in self.rows():
+                for name in JSON_FIELDS:
+                    row[name] = json.dumps(row[name], ensure_ascii=False, default=_json_default)
+                batch.append(row)
+                if len(batch) >= row_group_size:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    batch = []
+                    yield sink.drain()
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        finally:
+            writer.close()
+        yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Файл только на запись, который отдаёт записанное кусками. Позицию
+    считает сам: ParquetWriter по ней вычисляет смещения в футере.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
@@ -0,0 +1,118 @@
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..clients.resilience import is_outage
+from ..exceptions import CircuitOpenError, DeadlineExceeded, QuotaExceeded
+from ..models import AnalysisJob
+from .results import save_analysis_result
+
+
+def make_worker_id() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def claim_jobs(worker_id: str, batch_size: int) -> list:
+    """
+    Забирает до batch_size задач из очереди и помечает их как выполняемые.
+
+    На PostgreSQL используется SELECT ... FOR UPDATE SKIP LOCKED: воркеры
+    не ждут друг друга и не получают одну и ту же задачу. SQLite такого не
+    умеет, поэтому там задача захватывается условным UPDATE ... WHERE
+    status = 'pending': строку, которую уже забрал другой воркер, UPDATE
+    просто не затронет.
+    """
+    pending = AnalysisJob.objects.filter(
+        status=AnalysisJob.Status.PENDING,
+    ).order_by('created_at')
+    claim = dict(
+        status=AnalysisJob.Status.RUNNING,
+        locked_by=worker_id,
+        locked_at=timezone.now(),
+        attempts=F('attempts') + 1,
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                pending.select_for_update(skip_locked=True)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            AnalysisJob.objects.filter(pk__in=ids).update(**claim)
+    else:
+        ids = list(pending.values_list('pk', flat=True)[:batch_size])
+        AnalysisJob.objects.filter(
+            pk__in=ids,
+            status=AnalysisJob.Status.PENDING,
+        ).update(**claim)
+
+    return list(
+        AnalysisJob.objects
+        .filter(pk__in=ids, status=AnalysisJob.Status.RUNNING, locked_by=worker_id)
+        .select_related('vacancy')
+    )
+
+
+def requeue_stale_jobs(timeout: int) -> int:
+    """Возвращает в очередь задачи упавших воркеров, зависшие дольше timeout секунд."""
+    return AnalysisJob.objects.filter(
+        status=AnalysisJob.Status.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=AnalysisJob.Status.PENDING, locked_by='', locked_at=None)
+
+
+def is_transient(exc: Exception) -> bool:
+    """Сбой доступности GigaChat, а не самой задачи: её стоит повторить позже."""
+    return isinstance(exc, (CircuitOpenError, DeadlineExceeded, QuotaExceeded)) or is_outage(exc)
+
+
+def run_jobs(jobs: list, analyzer, pack_size: int = None) -> int:
+    """
+    Прогоняет захваченные задачи через VacancyAIAnalyzer.analyze_many.
+
+    Задачи, упавшие из-за недоступности GigaChat, возвращаются в очередь,
+    пока attempts меньше AI_JOB_MAX_ATTEMPTS; остальные ошибки — FAILED.
+    Возвращает число задач, возвращённых в очередь.
+    """
+    requeued = 0
+    by_vacancy = {}
+    for job in jobs:
+        by_vacancy.setdefault(job.vacancy_id, []).append(job)
+
+    for vacancy_jobs in by_vacancy.values():
+        vacancy = vacancy_jobs[0].vacancy
+        jobs_by_id = {job.pk: job for job in vacancy_jobs}
+        candidates = {job.pk: job.candidate_answers for job in vacancy_jobs}
+
+        for outcome in analyzer.analyze_many(vacancy, candidates, pack_size=pack_size):
+            job = jobs_by_id[outcome.candidate_id]
+            if outcome.ok:
+                job.status = AnalysisJob.Status.DONE
+                job.result = outcome.result
+                job.error = ''
+                if job.candidate_id:
+                    save_analysis_result(
+                        vacancy, job.candidate_id, job.candidate_answers,
+                        outcome.result, analyzer.client.MODEL,
+                    )
+            elif is_transient(outcome.error) and job.attempts < settings.AI_JOB_MAX_ATTEMPTS:
+                job.status = AnalysisJob.Status.PENDING
+                job.error = f'{type(outcome.error).__name__}: {outcome.error}'
+                job.locked_by, job.locked_at = '', None
+                job.save(update_fields=['status', 'error', 'locked_by', 'locked_at'])
+                requeued += 1
+                continue
+            else:
+                job.status = AnalysisJob.Status.FAILED
+                job.error = f'{type(outcome.error).__name__}: {outcome.error}'
+            job.finished_at = timezone.now()
+            job.duration = outcome.duration
+            # Сохраняем сразу, чтобы клиент видел результат, не дожидаясь пакета
+            job.save(update_fields=['status', 'result', 'error', 'finished_at', 'duration'])
+    return requeued
@@ -0,0 +1,131 @@
+import re
+
+import numpy as np
+
+from apps.vacancy.models import Vacancy
+from .prompt import resolve_skills
+from .weights import vacancy_weights
+
+
+TOKEN_RE = re.compile(r'[\w+#.-]+', re.UNICODE)
+
+EXPERIENCE_ORDER = [
+    Vacancy.ExperienceLevel.JUNIOR,
+    Vacancy.ExperienceLevel.MIDDLE,
+    Vacancy.ExperienceLevel.SENIOR,
+    Vacancy.ExperienceLevel.LEAD,
+]
+
+# Слова требований короче этого не считаются ключевыми («и», «на», «or»)
+MIN_KEYWORD_LENGTH = 4
+
+
+def tokenize(text: str) -> set:
+    return {token.strip('.-') for token in TOKEN_RE.findall(text.lower())} - {''}
+
+
+def candidate_text(value) -> str:
+    """Все строковые значения ответов кандидата одной строкой."""
+    if isinstance(value, dict):
+        return ' '.join(candidate_text(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(candidate_text(item) for item in value)
+    if value is None:
+        return ''
+    return str(value)
+
+
+def candidate_skills(answers: dict) -> set:
+    skills = answers.get('skills') or []
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    return {str(skill).strip().lower() for skill in skills if str(skill).strip()}
+
+
+class CandidatePreScorer:
+    """
+    Детерминированный локальный скоринг кандидатов без обращения к LLM.
+
+    Оценка 0-100 — взвешенная сумма трёх критериев:
+    совпадение навыков с Vacancy.skills, соответствие уровня опыта и доля
+    ключевых слов из requirements, встречающихся в ответах. Веса берутся
+    из Vacancy.ai_weight_config (ключи skills / experience / keywords).
+    Все кандидаты пачки считаются одной матричной операцией.
+    """
+
+    def __init__(self, vacancy):
+        self.vacancy = vacancy
+        self.skills = [name.lower() for name in resolve_skills(vacancy)]
+        self.keywords = sorted(
+            token for token in tokenize(vacancy.requirements or '')
+            if len(token) >= MIN_KEYWORD_LENGTH and not token.isdigit()
+        )
+        self.weights = vacancy_weights(vacancy)
+
+        self._skill_index = {name: i for i, name in enumerate(self.skills)}
+        self._keyword_index = {token: i for i, token in enumerate(self.keywords)}
+
+    def score(self, answers_list: list) -> np.ndarray:
+        count = len(answers_list)
+        if not count:
+            return np.zeros(0, dtype=np.float32)
+
+        skill_hits = np.zeros((count, len(self.skills)), dtype=bool)
+        keyword_hits = np.zeros((count, len(self.keywords)), dtype=bool)
+        levels = np.full(count, -1, dtype=np.int8)
+
+        for row, answers in enumerate(answers_list):
+            answers = answers if isinstance(answers, dict) else {}
+            tokens = tokenize(candidate_text(answers))
+
+            for skill in candidate_skills(answers) | tokens:
+                column = self._skill_index.get(skill)
+                if column is not None:
+                    skill_hits[row, column] = True
+            for token in tokens:
+                column = self._keyword_index.get(token)
+                if column is not None:
+                    keyword_hits[row, column] = True
+
+            level = str(answers.get('experience_level') or '').lower()
+            if level in EXPERIENCE_ORDER:
+                levels[row] = EXPERIENCE_ORDER.index(level)
+
+        criteria = np.stack([
+            self._ratio(skill_hits),
+            self._experience_scores(levels),
+            self._ratio(keyword_hits),
+        ], axis=1)
+        return (criteria @ self.weights * 100).astype(np.float32)
+
+    def split(self, candidates: list, threshold: float) -> tuple:
+        """
+        Делит пары (candidate_id, answers) на прошедших порог и отсеянных.
+        Отсеянные возвращаются вместе с их локальной оценкой.
+        """
+        scores = self.score([answers for _, answers in candidates])
+        passed, rejected = [], []
+        for (candidate_id, answers), score in zip(candidates, scores.tolist()):
+            if score < threshold:
+                rejected.append((candidate_id, round(score, 2)))
+            else:
+                passed.append((candidate_id, answers))
+        return passed, rejected
+
+    @staticmethod
+    def _ratio(hits: np.ndarray) -> np.ndarray:
+        # Критерий без данных (у вакансии нет навыков) не штрафует кандидата
+        if not hits.shape[1]:
+            return np.ones(hits.shape[0], dtype=np.float32)
+        return hits.mean(axis=1, dtype=np.float32)
+
+    def _experience_scores(self, levels: np.ndarray) -> np.ndarray:
+        required = self.vacancy.experience_level
+        if required not in EXPERIENCE_ORDER:
+            return np.ones(levels.shape[0], dtype=np.float32)
+
+        distance = np.abs(levels - EXPERIENCE_ORDER.index(required)).astype(np.float32)
+        scores = np.clip(1 - distance / len(EXPERIENCE_ORDER), 0, 1)
+        # Уровень не указан — нейтральная половина балла
+        scores[levels < 0] = 0.5
+        return scores
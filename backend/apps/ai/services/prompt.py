@@ -0,0 +1,189 @@
+import logging
+import math
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / 'prompts'
+
+# Грубая оценка для смешанного русско-английского текста: GigaChat тратит
+# около одного токена на 3 символа. Точный токенизатор не нужен — бюджет
+# всё равно задаётся с запасом относительно контекстного окна модели
+CHARS_PER_TOKEN = 3
+
+# Поле короче этого не обрезается, даже если бюджет исчерпан
+MIN_FIELD_CHARS = 80
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def compact(text) -> str:
+    return WHITESPACE_RE.sub(' ', str(text or '')).strip()
+
+
+def truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:max(limit - 1, 0)]
+    # Не рвём слово посередине, если пробел недалеко
+    space = cut.rfind(' ')
+    if space > limit * 0.8:
+        cut = cut[:space]
+    return cut.rstrip(' ,.;:') + '…'
+
+
+def fit_to_budget(fields: dict, budget_chars: int) -> tuple:
+    """
+    Распределяет budget_chars между полями «по-честному»: короткие поля
+    остаются целыми, а освободившийся запас достаётся длинным.
+    Возвращает (обрезанные поля, имена обрезанных полей).
+    """
+    remaining = max(budget_chars, 0)
+    result, truncated = {}, []
+    pending = sorted(fields.items(), key=lambda item: len(item[1]))
+
+    for index, (name, text) in enumerate(pending):
+        share = remaining // (len(pending) - index)
+        limit = max(share, MIN_FIELD_CHARS)
+        if len(text) > limit:
+            text = truncate(text, limit)
+            truncated.append(name)
+        result[name] = text
+        remaining = max(remaining - len(text), 0)
+
+    return {name: result[name] for name in fields}, truncated
+
+
+@dataclass
+class Prompt:
+    text: str
+    tokens: int
+    budget: int
+    truncated: list = field(default_factory=list)
+
+    @property
+    def metrics(self) -> dict:
+        return {
+            'chars': len(self.text),
+            'tokens': self.tokens,
+            'budget': self.budget,
+            'truncated': self.truncated,
+        }
+
+
+class VacancyPromptBuilder:
+    """
+    Собирает компактный промпт для анализа кандидата в пределах бюджета
+    токенов. Данные вакансии (включая навыки — одним запросом) кешируются
+    на экземпляре по (id, updated_at), поэтому при пакетном анализе
+    запрос к БД выполняется один раз на вакансию.
+    """
+    template_name = 'vacancy_analysis.txt'
+    batch_template_name = 'vacancy_batch_analysis.txt'
+
+    def __init__(self, budget: int = None):
+        self.budget = budget or settings.AI_PROMPT_TOKEN_BUDGET
+        self.template = (PROMPTS_DIR / self.template_name).read_text(encoding='utf-8')
+        self.batch_template = (PROMPTS_DIR / self.batch_template_name).read_text(encoding='utf-8')
+        self._vacancy_context = {}
+
+    def vacancy_context(self, vacancy) -> dict:
+        key = (vacancy.pk, vacancy.updated_at)
+        context = self._vacancy_context.get(key)
+        if context is None:
+            context = {
+                'title': compact(vacancy.title),
+                'experience_level': vacancy.get_experience_level_display(),
+                'skills': ', '.join(resolve_skills(vacancy)) or '—',
+                'requirements': compact(vacancy.requirements),
+            }
+            self._vacancy_context = {key: context}
+        return context
+
+    def build(self, vacancy, candidate_answers: dict) -> Prompt:
+        context = dict(self.vacancy_context(vacancy))
+        fields = {
+            ('answer', key): compact(value)
+            for key, value in (candidate_answers or {}).items()
+        }
+
+        fitted, truncated = self._fit(self.template, context, fields, self.budget)
+        context['answers'] = self._render_answers(fitted, 'answer')
+        return self._prompt(vacancy, self.template.format(**context), self.budget, truncated)
+
+    def build_batch(self, vacancy, candidates: list, budget: int = None) -> Prompt:
+        """
+        Один промпт на несколько кандидатов: блок вакансии передаётся один
+        раз, кандидаты нумеруются с 1 в порядке списка ответов candidates.
+        """
+        budget = budget or settings.AI_BATCH_PROMPT_TOKEN_BUDGET
+        context = dict(self.vacancy_context(vacancy))
+        fields = {
+            (number, key): compact(value)
+            for number, answers in enumerate(candidates, start=1)
+            for key, value in (answers or {}).items()
+        }
+
+        fitted, truncated = self._fit(self.batch_template, context, fields, budget)
+        context['candidates'] = '\n\n'.join(
+            f'Кандидат {number}:\n{self._render_answers(fitted, number)}'
+            for number in range(1, len(candidates) + 1)
+        )
+        return self._prompt(vacancy, self.batch_template.format(**context), budget, truncated)
+
+    def _fit(self, template: str, context: dict, fields: dict, budget: int) -> tuple:
+        """
+        Подгоняет требования вакансии и ответы под бюджет. Всё остальное
+        (шаблон, название, навыки, разметка строк «- ключ: ») идёт целиком.
+        Возвращает (поля ответов, имена обрезанных полей).
+        """
+        fixed = template.format(**{**context, 'requirements': '', 'answers': '', 'candidates': ''})
+        markup = sum(len(str(key)) + 5 for _, key in fields)
+        markup += sum(
+            len(f'Кандидат {group}:') + 3
+            for group in {group for group, _ in fields} if isinstance(group, int)
+        )
+        budget_chars = budget * CHARS_PER_TOKEN - len(fixed) - markup
+
+        fitted, truncated = fit_to_budget(
+            {('vacancy', 'requirements'): context['requirements'], **fields},
+            budget_chars,
+        )
+        context['requirements'] = fitted.pop(('vacancy', 'requirements'))
+        return fitted, [f'{group}:{key}' for group, key in truncated]
+
+    @staticmethod
+    def _render_answers(fitted: dict, group) -> str:
+        return '\n'.join(
+            f'- {key}: {text}'
+            for (field_group, key), text in fitted.items()
+            if field_group == group
+        ) or '—'
+
+    @staticmethod
+    def _prompt(vacancy, text: str, budget: int, truncated: list) -> Prompt:
+        prompt = Prompt(
+            text=text,
+            tokens=estimate_tokens(text),
+            budget=budget,
+            truncated=truncated,
+        )
+        logger.debug('AI prompt for vacancy %s: %s', vacancy.pk, prompt.metrics)
+        return prompt
+
+
+def resolve_skills(vacancy) -> list:
+    """Названия навыков вакансии: из prefetch_related, если он был, иначе одним запросом."""
+    prefetched = getattr(vacancy, '_prefetched_objects_cache', {}).get('skills')
+    if prefetched is not None:
+        return sorted(skill.name for skill in prefetched)
+    return list(vacancy.skills.order_by('name').values_list('name', flat=True))
@@ -0,0 +1,193 @@
+import asyncio
+import math
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from ..exceptions import QuotaExceeded
+
+
+class RateLimiter:
+    """
+    Token bucket в пределах процесса: не больше rate запросов в секунду,
+    с допустимым всплеском до burst запросов. Безопасен для потоков.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Блокирует поток, пока не появится свободный токен."""
+        if not self.rate:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst,
+                    self._tokens + (now - self._updated_at) * self.rate,
+                )
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_batch_limiter = None
+_batch_limiter_lock = threading.Lock()
+
+
+def get_batch_limiter() -> RateLimiter:
+    """Общий на процесс лимитер для пакетного анализа кандидатов."""
+    global _batch_limiter
+
+    with _batch_limiter_lock:
+        if _batch_limiter is None:
+            _batch_limiter = RateLimiter(
+                rate=settings.AI_BATCH_RATE_LIMIT,
+                burst=settings.AI_BATCH_RATE_BURST,
+            )
+        return _batch_limiter
+
+
+class CacheTokenBucket:
+    """
+    Token bucket в кеше Django: общий для всех процессов, которые смотрят в
+    один кеш (Redis, Memcached). Состояние — (токены, время обновления);
+    чтение и запись идут под короткой блокировкой cache.add, как в
+    SingleFlight. Если блокировку взять не удалось, бакет пропускает вызов,
+    а не останавливает анализ.
+    """
+    KEY_PREFIX = 'ai:quota'
+    LOCK_TTL = 2
+    LOCK_POLL_INTERVAL = 0.01
+
+    def __init__(self, name: str, rate: float, burst: int = 1, alias: str = 'default'):
+        self.key = f'{self.KEY_PREFIX}:{name}'
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.cache = caches[alias]
+        # Через это время пустой бакет наполняется целиком — состояние можно забыть
+        self.ttl = math.ceil(self.burst / rate) + 1 if rate else None
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """Забирает токены и возвращает 0, либо возвращает, сколько секунд ждать."""
+        if not self.rate:
+            return 0.0
+
+        with self._locked():
+            available, now = self._refill()
+            if available >= tokens:
+                self.cache.set(self.key, (available - tokens, now), timeout=self.ttl)
+                return 0.0
+            self.cache.set(self.key, (available, now), timeout=self.ttl)
+            return (tokens - available) / self.rate
+
+    def refund(self, tokens: int = 1):
+        if not self.rate:
+            return
+
+        with self._locked():
+            available, now = self._refill()
+            self.cache.set(self.key, (min(self.burst, available + tokens), now), timeout=self.ttl)
+
+    def _refill(self) -> tuple:
+        # Время стенное, а не monotonic: состояние общее для разных процессов
+        now = time.time()
+        tokens, updated_at = self.cache.get(self.key) or (self.burst, now)
+        return min(self.burst, tokens + max(now - updated_at, 0) * self.rate), now
+
+    @contextmanager
+    def _locked(self):
+        lock_key = f'{self.key}:lock'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_TTL
+        locked = self.cache.add(lock_key, token, timeout=self.LOCK_TTL)
+        while not locked and time.monotonic() < deadline:
+            time.sleep(self.LOCK_POLL_INTERVAL)
+            locked = self.cache.add(lock_key, token, timeout=self.LOCK_TTL)
+        try:
+            yield
+        finally:
+            if locked and self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+
+
+class AIQuota:
+    """
+    Лимит вызовов GigaChat для HR: свой бакет на каждого HR и общий на всех.
+    Сначала проверяется бакет HR, потом общий — если общий пуст, токен HR
+    возвращается. Так один HR с большой вакансией упирается в свой лимит и
+    не выбирает всю общую ёмкость, а остальные получают свою долю до 429.
+    """
+
+    def __init__(self, hr_id=None):
+        self.buckets = []
+        if hr_id is not None:
+            self.buckets.append(CacheTokenBucket(
+                f'hr:{hr_id}', settings.AI_HR_RATE_LIMIT, settings.AI_HR_RATE_BURST,
+            ))
+        self.buckets.append(CacheTokenBucket(
+            'global', settings.AI_GLOBAL_RATE_LIMIT, settings.AI_GLOBAL_RATE_BURST,
+        ))
+
+    def try_acquire(self) -> float:
+        taken = []
+        for bucket in self.buckets:
+            wait = bucket.try_acquire()
+            if wait:
+                for previous in taken:
+                    previous.refund()
+                return wait
+            taken.append(bucket)
+        return 0.0
+
+    def acquire(self, max_wait: float = None):
+        """
+        Ждёт своей очереди. С max_wait ждёт не дольше и, если токен так и
+        не освободился, бросает QuotaExceeded с оценкой retry_after.
+        """
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            self._check_wait(wait, started, max_wait)
+            time.sleep(self._jittered(wait))
+
+    async def aacquire(self, max_wait: float = None):
+        started = time.monotonic()
+        while True:
+            wait = await sync_to_async(self.try_acquire, thread_sensitive=False)()
+            if not wait:
+                return
+            self._check_wait(wait, started, max_wait)
+            await asyncio.sleep(self._jittered(wait))
+
+    @staticmethod
+    def _check_wait(wait: float, started: float, max_wait: float):
+        if max_wait is not None and time.monotonic() - started + wait > max_wait:
+            raise QuotaExceeded(
+                'Превышен лимит запросов к GigaChat, повторите позже',
+                retry_after=wait,
+            )
+
+    @staticmethod
+    def _jittered(wait: float) -> float:
+        # Ожидающие процессы не должны просыпаться и бросаться за токеном разом
+        return wait * random.uniform(1, 1.5)
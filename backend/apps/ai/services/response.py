@@ -0,0 +1,185 @@
+import json
+import re
+
+from ..exceptions import InvalidAIResponse
+from .weights import CRITERIA
+
+
+FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.IGNORECASE)
+SUMMARY_KEY_RE = re.compile(r'"summary"\s*:\s*"')
+JSON_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}
+
+
+def extract_json(text: str):
+    """
+    Достаёт JSON из ответа модели. Модели любят оборачивать ответ в
+    ```json ... ``` или добавлять фразу до и после — это допускаем,
+    всё остальное считается некорректным ответом.
+    """
+    if not isinstance(text, str):
+        raise InvalidAIResponse('Пустой ответ модели')
+
+    text = FENCE_RE.sub('', text.strip())
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    # Первая открывающая скобка объекта или массива и последняя закрывающая
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    start, end = min(starts, default=-1), max(text.rfind('}'), text.rfind(']'))
+    if start == -1 or end <= start:
+        raise InvalidAIResponse('В ответе модели нет JSON')
+    try:
+        return json.loads(text[start:end + 1])
+    except ValueError as exc:
+        raise InvalidAIResponse(f'Некорректный JSON в ответе модели: {exc}') from exc
+
+
+def _string_list(data: dict, name: str) -> list:
+    value = data.get(name, [])
+    if isinstance(value, str):
+        value = [value] if value.strip() else []
+    if not isinstance(value, list):
+        raise InvalidAIResponse(f'Поле {name} должно быть списком строк')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def parse_analysis(text: str) -> dict:
+    """Проверяет ответ анализа кандидата: score, strengths, weaknesses, summary."""
+    return validate_analysis(extract_json(text))
+
+
+def parse_batch_analysis(text: str, count: int) -> dict:
+    """
+    Разбирает ответ на пакетный промпт: JSON массив объектов с полем id
+    (номер кандидата с 1). Возвращает {номер: результат} только для
+    кандидатов с корректным результатом — остальных анализируют отдельно.
+    """
+    data = extract_json(text)
+    if isinstance(data, dict):
+        data = data.get('results', data.get('candidates'))
+    if not isinstance(data, list):
+        raise InvalidAIResponse('Ответ на пакетный промпт должен быть JSON массивом')
+
+    results = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        try:
+            number = int(item.get('id'))
+        except (TypeError, ValueError):
+            continue
+        if not 1 <= number <= count or number in results:
+            continue
+        try:
+            results[number] = validate_analysis(item)
+        except InvalidAIResponse:
+            continue
+    return results
+
+
+def validate_analysis(data) -> dict:
+    if not isinstance(data, dict):
+        raise InvalidAIResponse('Ответ модели должен быть JSON объектом')
+
+    try:
+        score = float(data['score'])
+    except KeyError:
+        raise InvalidAIResponse('В ответе модели нет поля score')
+    except (TypeError, ValueError):
+        raise InvalidAIResponse('Поле score должно быть числом')
+    if not 0 <= score <= 100:
+        raise InvalidAIResponse('Поле score должно быть в диапазоне 0-100')
+
+    summary = data.get('summary')
+    if not isinstance(summary, str) or not summary.strip():
+        raise InvalidAIResponse('В ответе модели нет поля summary')
+
+    result = {
+        'score': round(score, 2),
+        'strengths': _string_list(data, 'strengths'),
+        'weaknesses': _string_list(data, 'weaknesses'),
+        'summary': summary.strip(),
+    }
+    criteria = _criteria(data)
+    if criteria:
+        result['criteria'] = criteria
+    return result
+
+
+def _criteria(data: dict) -> dict:
+    """
+    Необязательные подоценки по критериям CRITERIA. Ответ без них не
+    считается битым: кривые и лишние значения просто отбрасываются.
+    """
+    value = data.get('criteria')
+    if not isinstance(value, dict):
+        return {}
+
+    criteria = {}
+    for name in CRITERIA:
+        try:
+            score = float(value[name])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= score <= 100:
+            criteria[name] = round(score, 2)
+    return criteria
+
+
+class SummaryExtractor:
+    """
+    Достаёт значение поля summary из JSON ответа модели, который приходит
+    кусками при потоковой генерации. feed() возвращает новую часть текста
+    summary (уже без JSON экранирования) или пустую строку.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._position = None
+        self._done = False
+
+    def feed(self, chunk: str) -> str:
+        if self._done:
+            return ''
+        self._buffer += chunk
+
+        if self._position is None:
+            match = SUMMARY_KEY_RE.search(self._buffer)
+            if not match:
+                return ''
+            self._position = match.end()
+
+        buffer, index, text = self._buffer, self._position, []
+        while index < len(buffer):
+            char = buffer[index]
+            if char == '"':
+                self._done = True
+                break
+            if char != '\\':
+                text.append(char)
+                index += 1
+                continue
+
+            # Экранированная последовательность могла разорваться между чанками
+            if index + 1 >= len(buffer):
+                break
+            escaped = buffer[index + 1]
+            if escaped == 'u':
+                # Символы вне BMP приходят суррогатной парой \uD83D\uDE00
+                high = buffer[index + 2:index + 4].lower()
+                size = 12 if len(high) == 2 and high[0] == 'd' and high[1] in '89ab' else 6
+                if index + size > len(buffer):
+                    break
+                try:
+                    text.append(json.loads(f'"{buffer[index:index + size]}"'))
+                except ValueError:
+                    pass
+                index += size
+            else:
+                text.append(JSON_ESCAPES.get(escaped, escaped))
+                index += 2
+
+        self._position = index
+        return ''.join(text)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+
+from django.core.cache import caches
+
+
+def normalize_answers(value):
+    """Ответы приводятся к каноническому виду: без лишних пробелов по краям."""
+    if isinstance(value, dict):
+        return {str(key).strip(): normalize_answers(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_answers(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+class AnalysisResultCache:
+    """
+    Кеш результатов AI анализа с адресацией по содержимому.
+    Ключ — хеш входных данных промпта: вакансия (id + updated_at), ответы
+    кандидата и модель. Любая правка вакансии меняет updated_at, поэтому
+    устаревшие результаты просто перестают находиться и вытесняются по TTL.
+    Срок жизни и размер задаются в настройках кеша 'ai_results'.
+    """
+    KEY_PREFIX = 'ai:analysis'
+    STATS_KEY_PREFIX = 'ai:analysis:stats'
+
+    def __init__(self, alias: str = 'ai_results'):
+        self.store = caches[alias]
+        # Счётчики держим в кеше по умолчанию, чтобы их не задело вытеснение
+        self.stats_store = caches['default']
+
+    @staticmethod
+    def make_key(vacancy, candidate_answers: dict, model: str) -> str:
+        updated_at = vacancy.updated_at.isoformat() if vacancy.updated_at else None
+        raw = json.dumps(
+            {
+                'vacancy': vacancy.pk,
+                'updated_at': updated_at,
+                'answers': normalize_answers(candidate_answers),
+                'model': model,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str):
+        result = self.store.get(f'{self.KEY_PREFIX}:{key}')
+        self._count('hits' if result is not None else 'misses')
+        return result
+
+    def set(self, key: str, result):
+        self.store.set(f'{self.KEY_PREFIX}:{key}', result)
+
+    async def aget(self, key: str):
+        result = await self.store.aget(f'{self.KEY_PREFIX}:{key}')
+        self._count('hits' if result is not None else 'misses')
+        return result
+
+    async def aset(self, key: str, result):
+        await self.store.aset(f'{self.KEY_PREFIX}:{key}', result)
+
+    def stats(self) -> dict:
+        hits = self.stats_store.get(f'{self.STATS_KEY_PREFIX}:hits', 0)
+        misses = self.stats_store.get(f'{self.STATS_KEY_PREFIX}:misses', 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+
+    def _count(self, name: str):
+        key = f'{self.STATS_KEY_PREFIX}:{name}'
+        # add + incr вместо get/set, чтобы не терять инкременты между воркерами
+        self.stats_store.add(key, 0, timeout=None)
+        try:
+            self.stats_store.incr(key)
+        except ValueError:
+            # Ключ вытеснен между add и incr
+            self.stats_store.set(key, 1, timeout=None)
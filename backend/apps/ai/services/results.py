@@ -0,0 +1,83 @@
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import AnalysisResult
+from .result_cache import AnalysisResultCache
+from .weights import criteria_matrix, vacancy_weights, weighted_scores
+
+
+def final_scores(vacancy, criteria_list: list) -> np.ndarray:
+    """Итоговые оценки по подоценкам и весам вакансии, округлённые до сотых."""
+    matrix = criteria_matrix(criteria_list).astype(np.float64)
+    return np.round(weighted_scores(matrix, vacancy_weights(vacancy).astype(np.float64)), 2)
+
+
+def save_analysis_result(vacancy, candidate_id, answers: dict, result: dict,
+                         model: str) -> AnalysisResult:
+    """Сохраняет (или заменяет) результат анализа кандидата по вакансии."""
+    criteria = result.get('criteria') or {}
+    score = result['score']
+    if criteria:
+        score = float(final_scores(vacancy, [criteria])[0])
+
+    analysis, _ = AnalysisResult.objects.update_or_create(
+        vacancy=vacancy,
+        candidate_id=candidate_id,
+        defaults={
+            'score': score,
+            'criteria': criteria,
+            'strengths': result.get('strengths', []),
+            'weaknesses': result.get('weaknesses', []),
+            'summary': result.get('summary', ''),
+            'model': model,
+            'input_hash': AnalysisResultCache.make_key(vacancy, answers, model),
+        },
+    )
+    return analysis
+
+
+def rerank_vacancy(vacancy, batch_size: int = 500) -> int:
+    """
+    Пересчитывает итоговые оценки всех кандидатов вакансии по текущим
+    весам ai_weight_config из сохранённых подоценок — без вызовов LLM.
+    Оценки считаются одной матричной операцией, в БД уходят только
+    изменившиеся строки. Возвращает число обновлённых.
+    """
+    rows = list(
+        AnalysisResult.objects
+        .filter(vacancy=vacancy)
+        .exclude(criteria={})
+        .values_list('pk', 'criteria', 'score')
+    )
+    if not rows:
+        return 0
+
+    pks, criteria_list, old_scores = zip(*rows)
+    scores = final_scores(vacancy, criteria_list)
+    changed = ~np.isnan(scores) & (scores != np.array(old_scores, dtype=np.float64))
+
+    updates = list(zip(np.array(pks)[changed].tolist(), scores[changed].tolist()))
+    with transaction.atomic():
+        for start in range(0, len(updates), batch_size):
+            _update_scores(updates[start:start + batch_size])
+    return len(updates)
+
+
+def _update_scores(updates: list):
+    """
+    UPDATE ... FROM (VALUES ...) одним запросом на пачку. bulk_update
+    строит CASE WHEN на каждую строку и на десятках тысяч кандидатов
+    работает секунды; этот вариант поддерживают PostgreSQL и SQLite 3.33+.
+    Сырой SQL обходит auto_now, поэтому updated_at ставится здесь же.
+    """
+    table = connection.ops.quote_name(AnalysisResult._meta.db_table)
+    rows = ', '.join(['(%s, %s)'] * len(updates))
+    now = AnalysisResult._meta.get_field('updated_at').get_db_prep_value(timezone.now(), connection)
+    params = [now, *(value for row in updates for value in row)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET score = v.column2, updated_at = %s '
+            f'FROM (VALUES {rows}) AS v WHERE {table}.id = v.column1',
+            params,
+        )
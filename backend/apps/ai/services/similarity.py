@@ -0,0 +1,352 @@
+import fcntl
+import json
+import math
+import os
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from apps.vacancy.models import Vacancy
+from .prescorer import TOKEN_RE, candidate_skills, candidate_text
+from .prompt import resolve_skills
+
+
+# Вес поля вакансии в векторе: навыки и заголовок важнее длинного описания
+VACANCY_FIELD_WEIGHTS = {
+    'title': 2.0,
+    'skills': 2.0,
+    'requirements': 1.0,
+    'responsibilities': 0.5,
+    'description': 0.5,
+}
+CANDIDATE_SKILLS_WEIGHT = 2.0
+
+# Слова длиннее обрезаются до этой длины — грубая замена стеммингу,
+# чтобы «разработка» и «разработки» попадали в один признак
+STEM_LENGTH = 6
+MIN_TOKEN_LENGTH = 2
+
+INITIAL_CAPACITY = 1024
+
+
+def stem_tokens(text: str) -> list:
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        token = token.strip('.-')
+        if len(token) < MIN_TOKEN_LENGTH:
+            continue
+        if token.isalpha() and len(token) > STEM_LENGTH:
+            token = token[:STEM_LENGTH]
+        tokens.append(token)
+    return tokens
+
+
+class HashingVectorizer:
+    """
+    Текст в плотный float32 вектор фиксированной длины без словаря:
+    номер признака и знак берутся из crc32 токена, частота сглаживается
+    log1p, вектор нормируется к единичной длине. Словаря и IDF нет,
+    поэтому вектор одной вакансии не зависит от остальных и индекс
+    можно обновлять по одной строке.
+    """
+
+    def __init__(self, dims: int):
+        self.dims = dims
+
+    def transform(self, fields: list) -> np.ndarray:
+        """fields — пары (текст, вес)."""
+        counts = Counter()
+        for text, weight in fields:
+            for token in stem_tokens(text):
+                counts[token] += weight
+
+        vector = np.zeros(self.dims, dtype=np.float32)
+        if not counts:
+            return vector
+
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode()) for token in counts),
+            dtype=np.uint32, count=len(counts),
+        )
+        values = np.fromiter(
+            (math.log1p(count) for count in counts.values()),
+            dtype=np.float32, count=len(counts),
+        )
+        # Старший бит хеша задаёт знак, чтобы коллизии гасили друг друга
+        signs = np.where(hashes >> 31, -1, 1).astype(np.float32)
+        np.add.at(vector, hashes % self.dims, signs * values)
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector
+
+
+class VacancyIndex:
+    """
+    Векторы вакансий в memmap файлах каталога path:
+    vectors.f32 (capacity × dims), ids.i64 (capacity) и meta.json с числом
+    занятых строк. Поиск — одно матричное умножение по занятым строкам.
+
+    Изменения пишутся на месте под эксклюзивной файловой блокировкой,
+    поиск читает под разделяемой, поэтому индекс общий для всех процессов
+    на машине: поиск не видит наполовину перенесённых строк. Процесс
+    замечает чужую запись по смене meta.json (он всегда заменяется
+    целиком) и переоткрывает файлы.
+    """
+
+    def __init__(self, path, dims: int):
+        self.path = Path(path)
+        self.dims = dims
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._size = 0
+        self._vectors = None
+        self._ids = None
+        self._rows = {}
+
+    def __len__(self) -> int:
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._refresh()
+            return self._size
+
+    def search(self, vector: np.ndarray, k: int = 10) -> list:
+        """До k пар (vacancy_id, косинусная близость) по убыванию близости."""
+        with self._lock, self._file_lock(fcntl.LOCK_SH):
+            self._refresh()
+            if not self._size or k <= 0:
+                return []
+            scores = self._vectors[:self._size] @ vector
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [
+                (int(self._ids[row]), float(scores[row]))
+                for row in top if scores[row] > 0
+            ]
+
+    def upsert(self, vacancy_id: int, vector: np.ndarray):
+        with self._writing():
+            row = self._rows.get(vacancy_id)
+            if row is None:
+                row = self._size
+                if row == len(self._ids):
+                    self._grow(row * 2)
+                self._size += 1
+            self._vectors[row] = vector
+            self._ids[row] = vacancy_id
+            self._rows[vacancy_id] = row
+
+    def remove(self, vacancy_id: int):
+        with self._writing():
+            row = self._rows.pop(vacancy_id, None)
+            if row is None:
+                return
+            # На место удалённой строки переносим последнюю: занятые строки
+            # всегда идут подряд и поиск не тратит время на дыры
+            last = self._size - 1
+            if row != last:
+                moved = int(self._ids[last])
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._size = last
+
+    def rebuild(self, items):
+        """
+        Собирает индекс заново из пар (vacancy_id, vector) и атомарно подменяет файлы.
+
+        items обычно читает все вакансии из БД, поэтому новые файлы пишутся
+        без блокировок — поиск и запись в старый индекс продолжаются;
+        блокировка берётся только на подмену файлов. Изменения, сделанные
+        за время сборки в уже прочитанные вакансии, теряются вместе со
+        старым индексом.
+        """
+        # Свой суффикс на сборку: параллельные сборки не пишут в одни файлы
+        suffix = f'.new.{os.getpid()}.{threading.get_ident()}'
+        self.path.mkdir(parents=True, exist_ok=True)
+        try:
+            capacity = INITIAL_CAPACITY
+            vectors, ids = self._create(suffix, capacity)
+            size = 0
+            for vacancy_id, vector in items:
+                if size == capacity:
+                    vectors.flush()
+                    ids.flush()
+                    capacity *= 2
+                    vectors, ids = self._resize(suffix, capacity)
+                vectors[size] = vector
+                ids[size] = vacancy_id
+                size += 1
+            vectors.flush()
+            ids.flush()
+            del vectors, ids
+
+            with self._lock, self._file_lock():
+                for name in ('vectors.f32', 'ids.i64'):
+                    os.replace(self.path / f'{name}{suffix}', self.path / name)
+                self._write_meta(size, capacity)
+                self._stamp = None
+                self._refresh()
+        finally:
+            for name in ('vectors.f32', 'ids.i64'):
+                (self.path / f'{name}{suffix}').unlink(missing_ok=True)
+        return size
+
+    @contextmanager
+    def _writing(self):
+        with self._lock, self._file_lock():
+            self._refresh()
+            if self._vectors is None:
+                self._vectors, self._ids = self._create('', INITIAL_CAPACITY)
+            yield
+            self._vectors.flush()
+            self._ids.flush()
+            self._write_meta(self._size, len(self._ids))
+            self._stamp = self._meta_stamp()
+
+    @contextmanager
+    def _file_lock(self, mode: int = fcntl.LOCK_EX):
+        """LOCK_EX — запись, LOCK_SH — чтение: читатели не мешают друг другу."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / 'lock', 'a') as lock:
+            fcntl.flock(lock, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        stamp = self._meta_stamp()
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        if stamp is None:
+            self._size, self._vectors, self._ids, self._rows = 0, None, None, {}
+            return
+
+        meta = json.loads((self.path / 'meta.json').read_text())
+        if meta['dims'] != self.dims:
+            raise ValueError(
+                f'Индекс {self.path} собран с dims={meta["dims"]}, '
+                f'а в настройках {self.dims}: пересоберите его'
+            )
+        self._size = meta['size']
+        self._vectors = self._open('vectors.f32', np.float32, (meta['capacity'], self.dims))
+        self._ids = self._open('ids.i64', np.int64, (meta['capacity'],))
+        self._rows = {vacancy_id: row for row, vacancy_id in enumerate(self._ids[:self._size].tolist())}
+
+    def _meta_stamp(self):
+        try:
+            stat = os.stat(self.path / 'meta.json')
+        except FileNotFoundError:
+            return None
+        # meta.json заменяется через os.replace, поэтому inode новый на каждую запись
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _open(self, name: str, dtype, shape: tuple):
+        return np.memmap(self.path / name, dtype=dtype, mode='r+', shape=shape)
+
+    def _create(self, suffix: str, capacity: int) -> tuple:
+        vectors = np.memmap(self.path / f'vectors.f32{suffix}', dtype=np.float32,
+                            mode='w+', shape=(capacity, self.dims))
+        ids = np.memmap(self.path / f'ids.i64{suffix}', dtype=np.int64, mode='w+', shape=(capacity,))
+        return vectors, ids
+
+    def _resize(self, suffix: str, capacity: int) -> tuple:
+        vectors_path = self.path / f'vectors.f32{suffix}'
+        ids_path = self.path / f'ids.i64{suffix}'
+        os.truncate(vectors_path, capacity * self.dims * np.dtype(np.float32).itemsize)
+        os.truncate(ids_path, capacity * np.dtype(np.int64).itemsize)
+        vectors = np.memmap(vectors_path, dtype=np.float32, mode='r+', shape=(capacity, self.dims))
+        ids = np.memmap(ids_path, dtype=np.int64, mode='r+', shape=(capacity,))
+        return vectors, ids
+
+    def _grow(self, capacity: int):
+        self._vectors.flush()
+        self._ids.flush()
+        self._vectors, self._ids = self._resize('', capacity)
+
+    def _write_meta(self, size: int, capacity: int):
+        meta = {'dims': self.dims, 'size': size, 'capacity': capacity}
+        tmp = self.path / 'meta.json.tmp'
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / 'meta.json')
+
+
+def vacancy_vector(vacancy, vectorizer: HashingVectorizer = None) -> np.ndarray:
+    vectorizer = vectorizer or get_vectorizer()
+    texts = {
+        'title': vacancy.title,
+        'skills': ' '.join(resolve_skills(vacancy)),
+        'requirements': vacancy.requirements,
+        'responsibilities': vacancy.responsibilities,
+        'description': vacancy.description,
+    }
+    return vectorizer.transform([
+        (texts[name], weight) for name, weight in VACANCY_FIELD_WEIGHTS.items()
+    ])
+
+
+def candidate_vector(answers: dict, vectorizer: HashingVectorizer = None) -> np.ndarray:
+    vectorizer = vectorizer or get_vectorizer()
+    return vectorizer.transform([
+        (candidate_text(answers), 1.0),
+        (' '.join(candidate_skills(answers)), CANDIDATE_SKILLS_WEIGHT),
+    ])
+
+
+def index_vacancy(vacancy):
+    """В индексе только опубликованные вакансии: остальные из него убираются."""
+    index = get_vacancy_index()
+    if vacancy.status == Vacancy.Status.PUBLISHED:
+        index.upsert(vacancy.pk, vacancy_vector(vacancy))
+    else:
+        index.remove(vacancy.pk)
+
+
+def rebuild_vacancy_index(chunk_size: int = 1000) -> int:
+    vectorizer = get_vectorizer()
+    vacancies = (
+        Vacancy.objects
+        .filter(status=Vacancy.Status.PUBLISHED)
+        .prefetch_related('skills')
+        .order_by('pk')
+        .iterator(chunk_size=chunk_size)
+    )
+    return get_vacancy_index().rebuild(
+        (vacancy.pk, vacancy_vector(vacancy, vectorizer)) for vacancy in vacancies
+    )
+
+
+def similar_vacancies(answers: dict, k: int = 10) -> list:
+    """Пары (vacancy_id, близость) опубликованных вакансий, ближайших к ответам кандидата."""
+    return get_vacancy_index().search(candidate_vector(answers), k)
+
+
+_vectorizer = None
+_index = None
+_lock = threading.Lock()
+
+
+def get_vectorizer() -> HashingVectorizer:
+    global _vectorizer
+
+    with _lock:
+        if _vectorizer is None:
+            _vectorizer = HashingVectorizer(settings.AI_SIMILARITY_DIMS)
+        return _vectorizer
+
+
+def get_vacancy_index() -> VacancyIndex:
+    global _index
+
+    with _lock:
+        if _index is None:
+            _index = VacancyIndex(settings.AI_SIMILARITY_INDEX_DIR, settings.AI_SIMILARITY_DIMS)
+        return _index
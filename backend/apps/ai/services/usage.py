@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import AIUsage
+
+logger = logging.getLogger(__name__)
+
+
+def token_cost(prompt_tokens: int, completion_tokens: int) -> Decimal:
+    price = Decimal(str(settings.AI_COST_PER_1K_TOKENS))
+    return (price * (prompt_tokens + completion_tokens) / 1000).quantize(Decimal('0.0001'))
+
+
+class _OperationStats:
+
+    def __init__(self, window: int):
+        self.counters = Counter()
+        self.statuses = Counter()
+        self.duration = 0.0
+        # Перцентили считаем по последним window вызовам
+        self.recent = deque(maxlen=window)
+
+    def add(self, event):
+        self.counters['calls'] += 1
+        self.counters['errors'] += not event.ok
+        self.counters['retries'] += event.attempt > 1
+        self.counters['prompt_tokens'] += event.prompt_tokens
+        self.counters['completion_tokens'] += event.completion_tokens
+        self.statuses[event.status] += 1
+        self.duration += event.duration
+        self.recent.append(event.duration)
+
+    def as_dict(self) -> dict:
+        calls = self.counters['calls']
+        p50, p95 = np.percentile(self.recent, [50, 95]) if self.recent else (0.0, 0.0)
+        return {
+            'calls': calls,
+            'errors': self.counters['errors'],
+            'retries': self.counters['retries'],
+            'statuses': dict(self.statuses),
+            'prompt_tokens': self.counters['prompt_tokens'],
+            'completion_tokens': self.counters['completion_tokens'],
+            'cost': str(token_cost(self.counters['prompt_tokens'], self.counters['completion_tokens'])),
+            'avg_ms': round(self.duration / calls * 1000, 1) if calls else 0.0,
+            'p50_ms': round(float(p50) * 1000, 1),
+            'p95_ms': round(float(p95) * 1000, 1),
+        }
+
+
+class CallMetrics:
+    """
+    Агрегаты вызовов GigaChat в памяти процесса: число вызовов, ошибки,
+    повторы, токены, стоимость и задержки по операциям (auth, chat).
+    У каждого воркера свои агрегаты — это оперативная картина, а не учёт.
+    """
+
+    def __init__(self, window: int = None):
+        self.window = window or settings.AI_METRICS_WINDOW
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, event):
+        with self._lock:
+            stats = self._operations.get(event.operation)
+            if stats is None:
+                stats = self._operations[event.operation] = _OperationStats(self.window)
+            stats.add(event)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'since': self._since.isoformat(),
+                'operations': {
+                    operation: stats.as_dict()
+                    for operation, stats in self._operations.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}
+            self._since = timezone.now()
+
+
+class UsageRecorder:
+    """
+    Копит расход chat вызовов по вакансиям в памяти и переносит его в
+    AIUsage одним UPDATE ... SET x = x + delta на вакансию. Из хука в БД
+    не пишем (он может сработать внутри event loop) — сброс делают
+    flush / flush_if_due из синхронного кода.
+    """
+
+    def __init__(self, flush_interval: float = None):
+        self.flush_interval = (
+            settings.AI_USAGE_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flushed_at = time.monotonic()
+
+    def record(self, event):
+        if event.operation != 'chat' or event.scope is None:
+            return
+        with self._lock:
+            totals = self._pending.setdefault(event.scope, Counter())
+            totals['calls'] += 1
+            totals['failed_calls'] += not event.ok
+            totals['retries'] += event.attempt > 1
+            totals['prompt_tokens'] += event.prompt_tokens
+            totals['completion_tokens'] += event.completion_tokens
+            totals['duration'] += event.duration
+
+    @property
+    def is_due(self) -> bool:
+        return bool(self._pending) and (
+            time.monotonic() - self._flushed_at >= self.flush_interval
+        )
+
+    def flush_if_due(self):
+        if self.is_due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+
+        for (vacancy_id, hr_id), totals in pending.items():
+            try:
+                usage, _ = AIUsage.objects.get_or_create(
+                    vacancy_id=vacancy_id, defaults={'hr_id': hr_id},
+                )
+                AIUsage.objects.filter(pk=usage.pk).update(
+                    calls=F('calls') + totals['calls'],
+                    failed_calls=F('failed_calls') + totals['failed_calls'],
+                    retries=F('retries') + totals['retries'],
+                    prompt_tokens=F('prompt_tokens') + totals['prompt_tokens'],
+                    completion_tokens=F('completion_tokens') + totals['completion_tokens'],
+                    cost=F('cost') + token_cost(totals['prompt_tokens'], totals['completion_tokens']),
+                    duration=F('duration') + totals['duration'],
+                    updated_at=timezone.now(),
+                )
+            except DatabaseError:
+                # Например, вакансию удалили, пока шёл анализ
+                logger.exception('Failed to save AI usage for vacancy %s', vacancy_id)
+
+
+_metrics = None
+_recorder = None
+_lock = threading.Lock()
+
+
+def get_call_metrics() -> CallMetrics:
+    global _metrics
+
+    with _lock:
+        if _metrics is None:
+            _metrics = CallMetrics()
+        return _metrics
+
+
+def get_usage_recorder() -> UsageRecorder:
+    global _recorder
+
+    with _lock:
+        if _recorder is None:
+            _recorder = UsageRecorder()
+        return _recorder
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+# Критерии оценки кандидата и их веса по умолчанию. Те же ключи ожидаются
+# в Vacancy.ai_weight_config и в поле criteria ответа модели
+DEFAULT_WEIGHTS = {
+    'skills': 0.5,
+    'experience': 0.2,
+    'keywords': 0.3,
+}
+CRITERIA = tuple(DEFAULT_WEIGHTS)
+
+
+def vacancy_weights(vacancy) -> np.ndarray:
+    """Веса критериев вакансии в порядке CRITERIA, нормированные к сумме 1."""
+    config = vacancy.ai_weight_config
+    config = config if isinstance(config, dict) else {}
+
+    values = []
+    for name, default in DEFAULT_WEIGHTS.items():
+        try:
+            values.append(float(config.get(name, default)))
+        except (TypeError, ValueError):
+            values.append(default)
+
+    weights = np.array(values, dtype=np.float32)
+    weights = np.clip(weights, 0, None)
+    total = weights.sum()
+    if not total:
+        weights = np.array(list(DEFAULT_WEIGHTS.values()), dtype=np.float32)
+        total = weights.sum()
+    return weights / total
+
+
+def criteria_matrix(criteria_list: list) -> np.ndarray:
+    """Подоценки кандидатов ({критерий: 0-100}) матрицей кандидаты × CRITERIA; пропуски — NaN."""
+    matrix = np.full((len(criteria_list), len(CRITERIA)), np.nan, dtype=np.float32)
+    for row, criteria in enumerate(criteria_list):
+        for column, name in enumerate(CRITERIA):
+            value = (criteria or {}).get(name)
+            if value is not None:
+                matrix[row, column] = value
+    return matrix
+
+
+def weighted_scores(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Итоговые оценки 0-100 по матрице подоценок. Отсутствующий критерий не
+    штрафует кандидата: веса остальных перенормируются. Для строк без
+    подоценок результат — NaN.
+    """
+    present = ~np.isnan(matrix)
+    total = present @ weights
+    values = np.where(present, matrix, 0) @ weights
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(total > 0, values / total, np.nan)
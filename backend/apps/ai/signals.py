@@ -0,0 +1,74 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.vacancy.models import Vacancy
+from apps.vacancy.signals import vacancies_bulk_created
+from .services.results import rerank_vacancy
+from .services.similarity import get_vacancy_index, index_vacancy
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=Vacancy)
+def remember_weight_change(sender, instance, update_fields=None, **kwargs):
+    instance._ai_weights_changed = False
+    if instance.pk is None:
+        return
+    if update_fields is not None and 'ai_weight_config' not in update_fields:
+        return
+
+    previous = (
+        Vacancy.objects.filter(pk=instance.pk)
+        .values_list('ai_weight_config', flat=True)
+        .first()
+    )
+    instance._ai_weights_changed = previous != instance.ai_weight_config
+
+
+@receiver(post_save, sender=Vacancy)
+def rerank_on_weight_change(sender, instance, created, **kwargs):
+    # Новые веса — новые итоговые оценки по уже сохранённым подоценкам
+    if not created and getattr(instance, '_ai_weights_changed', False):
+        transaction.on_commit(lambda: rerank_vacancy(instance))
+
+
+def _reindex(vacancy):
+    try:
+        index_vacancy(vacancy)
+    except Exception:
+        # Индекс можно пересобрать командой, сохранение вакансии важнее
+        logger.exception('Failed to update similarity index for vacancy %s', vacancy.pk)
+
+
+@receiver(post_save, sender=Vacancy)
+def reindex_on_save(sender, instance, **kwargs):
+    transaction.on_commit(lambda: _reindex(instance))
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def reindex_on_skills_change(sender, instance, action, reverse, **kwargs):
+    if not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: _reindex(instance))
+
+
+@receiver(vacancies_bulk_created, sender=Vacancy)
+def reindex_on_bulk_create(sender, vacancy_ids, **kwargs):
+    # Импорт шлёт сигнал уже после коммита
+    for vacancy in Vacancy.objects.filter(pk__in=vacancy_ids).prefetch_related('skills'):
+        _reindex(vacancy)
+
+
+@receiver(post_delete, sender=Vacancy)
+def remove_from_index(sender, instance, **kwargs):
+    vacancy_id = instance.pk
+
+    def remove():
+        try:
+            get_vacancy_index().remove(vacancy_id)
+        except Exception:
+            logger.exception('Failed to remove vacancy %s from similarity index', vacancy_id)
+
+    transaction.on_commit(remove)
@@ -0,0 +1,248 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .services.prompt import estimate_tokens
+
+
+CANDIDATE_RE = re.compile(r'^Кандидат (\d+):', re.MULTILINE)
+
+SHAPES = ('json', 'fenced', 'prose', 'invalid')
+
+# Размер чанка потокового ответа в символах (примерно 2-3 токена)
+STREAM_CHUNK_CHARS = 8
+
+
+class GigaChatStubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1, чтобы клиент мог держать соединение открытым (keep-alive)
+    protocol_version = 'HTTP/1.1'
+    # Заголовки и тело пишутся отдельно; без TCP_NODELAY keep-alive
+    # соединение упирается в delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+
+        if self.path.endswith('/oauth'):
+            self.server.delay()
+            self._send_json(200, {
+                'access_token': uuid.uuid4().hex,
+                'expires_at': int((time.time() + 30 * 60) * 1000),
+            })
+        elif self.path.endswith('/chat/completions'):
+            error = self.server.pick_error()
+            if error:
+                self.server.delay()
+                self._send_json(error, {'status': error, 'message': 'Stub error'})
+                return
+            payload = json.loads(body or b'{}')
+            response = self.server.chat_response(payload)
+            if payload.get('stream'):
+                self._send_stream(response)
+                return
+            self.server.delay(response.get('usage', {}).get('completion_tokens', 0))
+            self._send_json(200, response)
+        else:
+            self._send_json(404, {'message': 'Not found'})
+
+    def _send_json(self, status: int, data: dict):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, response: dict):
+        """Отдаёт ответ чанками SSE, как GigaChat при stream=true."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        # Как у настоящего API: chunked, каждое событие — отдельный чанк
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        # Задержка до первого токена, дальше — по token_latency на чанк
+        self.server.delay()
+        content = response['choices'][0]['message']['content']
+        step = STREAM_CHUNK_CHARS
+        for start in range(0, len(content), step):
+            piece = content[start:start + step]
+            self._send_event({'choices': [{'delta': {'content': piece}, 'index': 0}]})
+            if self.server.token_latency:
+                time.sleep(estimate_tokens(piece) * self.server.token_latency)
+        self._send_event({
+            'choices': [{'delta': {}, 'index': 0, 'finish_reason': 'stop'}],
+            'usage': response.get('usage'),
+        })
+        self._send_chunk(b'data: [DONE]\n\n')
+        self._send_chunk(b'')
+
+    def _send_event(self, data: dict):
+        self._send_chunk(f'data: {json.dumps(data, ensure_ascii=False)}\n\n'.encode())
+
+    def _send_chunk(self, payload: bytes):
+        self.wfile.write(f'{len(payload):X}\r\n'.encode() + payload + b'\r\n')
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GigaChatStubServer(ThreadingHTTPServer):
+    """
+    Локальная заглушка OAuth и chat/completions эндпоинтов GigaChat.
+    Работает по HTTP в отдельном потоке, удобна для бенчмарков.
+
+    latency / jitter — задержка ответа в секундах (равномерно в пределах
+    latency ± jitter), token_latency — добавка за каждый токен ответа.
+    error_rate — доля запросов к чату, на которые отвечаем error_status.
+    shape — вид ответа модели: json, fenced (в ```json```), prose (JSON
+    внутри текста), invalid (битый JSON) или mixed (случайный из них).
+    """
+    daemon_threads = True
+    # Очередь accept по умолчанию — 5 соединений; при сотне одновременных
+    # асинхронных запросов лишние SYN отбрасываются и ждут повтора ~1 с
+    request_queue_size = 256
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, token_latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, shape: str = 'json', seed: int = None):
+        if shape not in SHAPES + ('mixed',):
+            raise ValueError(f'Неизвестный вид ответа: {shape}')
+        super().__init__((host, port), GigaChatStubHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.shape = shape
+        self.random = random.Random(seed)
+        self._thread = None
+
+    @classmethod
+    def from_options(cls, options: dict, **kwargs) -> 'GigaChatStubServer':
+        """Создаёт сервер из опций management команды (см. add_stub_arguments)."""
+        return cls(
+            latency=options['latency'],
+            jitter=options['jitter'],
+            token_latency=options['token_latency'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            shape=options['shape'],
+            seed=options['seed'],
+            **kwargs,
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def auth_url(self) -> str:
+        return f'{self.base_url}/api/v2/oauth'
+
+    @property
+    def chat_url(self) -> str:
+        return f'{self.base_url}/api/v1/chat/completions'
+
+    def delay(self, tokens: int = 0):
+        seconds = self.latency + tokens * self.token_latency
+        if self.jitter:
+            seconds += self.random.uniform(-self.jitter, self.jitter)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def pick_error(self):
+        if self.error_rate and self.random.random() < self.error_rate:
+            return self.error_status
+        return None
+
+    def chat_response(self, payload: dict) -> dict:
+        prompt = ''.join(message.get('content', '') for message in payload.get('messages', []))
+        numbers = [int(number) for number in CANDIDATE_RE.findall(prompt)]
+
+        if numbers:
+            # Пакетный промпт: массив результатов с номерами кандидатов
+            data = [dict(self.analysis(), id=number) for number in numbers]
+        else:
+            data = self.analysis()
+        content = self.render(data)
+
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        return {
+            'choices': [{
+                'message': {'role': 'assistant', 'content': content},
+                'index': 0,
+                'finish_reason': 'stop',
+            }],
+            'created': int(time.time()),
+            'model': payload.get('model', 'GigaChat'),
+            'object': 'chat.completion',
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+    def analysis(self) -> dict:
+        return {
+            'summary': 'Кандидат соответствует основным требованиям.',
+            'score': 75,
+            'criteria': {'skills': 80, 'experience': 70, 'keywords': 70},
+            'strengths': ['Опыт работы с Django'],
+            'weaknesses': ['Нет опыта с Kubernetes'],
+        }
+
+    def render(self, data) -> str:
+        shape = self.shape
+        if shape == 'mixed':
+            shape = self.random.choice(SHAPES)
+
+        content = json.dumps(data, ensure_ascii=False)
+        if shape == 'fenced':
+            return f'```json\n{content}\n```'
+        if shape == 'prose':
+            return f'Вот результат анализа:\n{content}\nНадеюсь, это поможет.'
+        if shape == 'invalid':
+            return content[:len(content) // 2]
+        return content
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_stub_arguments(parser):
+    """Опции заглушки для management команд (см. GigaChatStubServer.from_options)."""
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Задержка ответа в секундах')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Разброс задержки в секундах (±)')
+    parser.add_argument('--token-latency', type=float, default=0.0,
+                        help='Добавка к задержке за каждый токен ответа')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Доля запросов к чату, завершающихся ошибкой')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--shape', choices=SHAPES + ('mixed',), default='json',
+                        help='Вид ответа модели')
+    parser.add_argument('--seed', type=int, default=None)
+
@@ -0,0 +1,780 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import requests
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.vacancy.models import Category, Skill, Vacancy
+
+from .clients.gigachat import GigaChatClient
+from .clients.resilience import CircuitBreaker, RetryPolicy
+from .clients.singleflight import SingleFlight
+from .clients.token_manager import GigaChatTokenManager
+from .exceptions import CircuitOpenError, InvalidAIResponse, QuotaExceeded
+from .models import AnalysisJob, AnalysisResult
+from .services.analyzer import CandidateAnalysis, VacancyAIAnalyzer
+from .services.export import AnalysisExport
+from .services.prescorer import CandidatePreScorer
+from .services.prompt import VacancyPromptBuilder, estimate_tokens
+from .services.ratelimit import AIQuota, CacheTokenBucket
+from .services.jobs import claim_jobs, requeue_stale_jobs, run_jobs
+from .services.response import parse_analysis, parse_batch_analysis
+from .services.results import rerank_vacancy
+from .services.similarity import VacancyIndex
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'ai_results': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-ai-results'},
+}
+
+
+def clear_caches(test):
+    for alias in LOCMEM_CACHES:
+        caches[alias].clear()
+    test.addCleanup(lambda: [caches[alias].clear() for alias in LOCMEM_CACHES])
+
+
+def create_vacancy(**fields):
+    hr = get_user_model().objects.create_user(
+        email=f'hr{get_user_model().objects.count()}@example.com',
+        first_name='Анна', last_name='Иванова', password='password', role='hr',
+    )
+    category, _ = Category.objects.get_or_create(name='IT')
+    values = dict(
+        hr=hr, title='Python разработчик', company_name='SmartHR',
+        description='Backend', responsibilities='Писать код', requirements='Python',
+        category=category, employment_type=Vacancy.EmploymentType.FULL_TIME,
+        work_format=Vacancy.WorkFormat.REMOTE,
+    )
+    values.update(fields)
+    return Vacancy.objects.create(**values)
+
+
+class FailingAnalyzer:
+    client = SimpleNamespace(MODEL='GigaChat')
+
+    def __init__(self, error):
+        self.error = error
+
+    def analyze_many(self, vacancy, candidates, pack_size=None):
+        for candidate_id in candidates:
+            yield CandidateAnalysis(candidate_id=candidate_id, error=self.error)
+
+
+class RetryPolicyBreakerTests(SimpleTestCase):
+
+    def make_policy(self, breaker):
+        return RetryPolicy(max_attempts=1, deadline=5, base_delay=0, max_delay=0, breaker=breaker)
+
+    def test_open_circuit_does_not_take_quota(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker._state, breaker._opened_at = CircuitBreaker.OPEN, time.monotonic()
+        taken = []
+
+        with self.assertRaises(CircuitOpenError):
+            self.make_policy(breaker).call(lambda remaining: 'ok', before_attempt=lambda: taken.append(1))
+
+        self.assertEqual(taken, [])
+
+    def test_quota_rejection_releases_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker._state = CircuitBreaker.OPEN
+
+        def no_quota():
+            raise QuotaExceeded('лимит', retry_after=1)
+
+        with self.assertRaises(QuotaExceeded):
+            self.make_policy(breaker).call(lambda remaining: 'ok', before_attempt=no_quota)
+
+        # Пробный вызов не состоялся: следующий снова пробный, а не отклонённый
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(self.make_policy(breaker).call(lambda remaining: 'ok'), 'ok')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class StreamCandidateBreakerTests(SimpleTestCase):
+
+    def stream(self, breaker, deltas):
+        analyzer = VacancyAIAnalyzer.__new__(VacancyAIAnalyzer)
+        analyzer.cache = mock.Mock()
+        analyzer.client = SimpleNamespace(MODEL='GigaChat', stream=lambda prompt: iter(deltas))
+        analyzer.build_prompt = lambda vacancy, answers: 'prompt'
+        vacancy = SimpleNamespace(pk=1, hr_id=1)
+        # Генератор выполняется после return, поэтому патчи держим до конца теста
+        for patcher in (
+            mock.patch('apps.ai.services.analyzer.get_circuit_breaker', return_value=breaker),
+            mock.patch('apps.ai.services.analyzer.AIQuota'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return analyzer.stream_candidate(vacancy, {}, use_cache=False)
+
+    def test_disconnect_after_first_delta_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker._state = CircuitBreaker.OPEN
+        events = self.stream(breaker, ['{"summary": "Опытный разработчик', '"}'])
+
+        self.assertEqual(next(events)[0], 'summary')
+        events.close()
+
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+@override_settings(AI_JOB_MAX_ATTEMPTS=2)
+class RunJobsRetryTests(TestCase):
+
+    def setUp(self):
+        self.vacancy = create_vacancy()
+        self.job = AnalysisJob.objects.create(vacancy=self.vacancy, candidate_answers={'q': 'a'})
+
+    def run_once(self, error):
+        jobs = claim_jobs('worker-1', 10)
+        return run_jobs(jobs, FailingAnalyzer(error))
+
+    def test_outage_requeues_until_max_attempts(self):
+        self.assertEqual(self.run_once(CircuitOpenError('цепь разомкнута')), 1)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, AnalysisJob.Status.PENDING)
+        self.assertEqual((self.job.locked_by, self.job.locked_at), ('', None))
+        self.assertEqual(self.job.attempts, 1)
+
+        self.assertEqual(self.run_once(CircuitOpenError('цепь разомкнута')), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, AnalysisJob.Status.FAILED)
+        self.assertEqual(self.job.attempts, 2)
+
+    def test_other_errors_fail_at_once(self):
+        self.assertEqual(self.run_once(InvalidAIResponse('не JSON')), 0)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, AnalysisJob.Status.FAILED)
+        self.assertIsNotNone(self.job.finished_at)
+
+
+class ExportLatencyTests(TestCase):
+
+    def test_latency_is_measured_duration_per_job(self):
+        vacancy = create_vacancy()
+        first = AnalysisJob.objects.create(vacancy=vacancy, candidate_answers={'q': '1'})
+        second = AnalysisJob.objects.create(vacancy=vacancy, candidate_answers={'q': '2'})
+        durations = {first.pk: 1.25, second.pk: 0.5}
+
+        class Analyzer:
+            client = SimpleNamespace(MODEL='GigaChat')
+
+            def analyze_many(self, vacancy, candidates, pack_size=None):
+                for candidate_id in candidates:
+                    yield CandidateAnalysis(
+                        candidate_id=candidate_id,
+                        result={'score': 80, 'strengths': [], 'weaknesses': [], 'summary': ''},
+                        duration=durations[candidate_id],
+                    )
+
+        run_jobs(claim_jobs('worker-1', 10), Analyzer())
+
+        rows = {row['job_id']: row for row in AnalysisExport().rows()}
+        self.assertEqual(rows[first.pk]['latency_seconds'], 1.25)
+        self.assertEqual(rows[second.pk]['latency_seconds'], 0.5)
+
+    def test_incremental_export_rereads_late_commits(self):
+        vacancy = create_vacancy()
+        now = timezone.now()
+
+        def finish(seconds_ago):
+            return AnalysisJob.objects.create(
+                vacancy=vacancy, candidate_answers={}, status=AnalysisJob.Status.DONE,
+                finished_at=now - timedelta(seconds=seconds_ago),
+            )
+
+        first = finish(10)
+        export = AnalysisExport(overlap=60)
+        self.assertEqual([row['job_id'] for row in export.rows()], [first.pk])
+
+        # Воркер поставил finished_at раньше водяного знака, а закоммитил позже выгрузки
+        late = finish(20)
+        following = AnalysisExport(since=export.watermark, overlap=60)
+
+        self.assertEqual([row['job_id'] for row in following.rows()], [late.pk, first.pk])
+        self.assertEqual(following.watermark, export.watermark)
+
+
+class VacancyIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix='vacancy_index_test_')
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+
+    @staticmethod
+    def unit(*values):
+        vector = np.array(values, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def test_remove_moves_last_row(self):
+        index = VacancyIndex(self.path, 3)
+        index.upsert(1, self.unit(1, 0, 0))
+        index.upsert(2, self.unit(0, 1, 0))
+        index.upsert(3, self.unit(0, 0, 1))
+        index.remove(1)
+
+        # Другой процесс видит изменения через meta.json
+        other = VacancyIndex(self.path, 3)
+        self.assertEqual(len(other), 2)
+        self.assertEqual(other.search(self.unit(0, 0, 1), k=1)[0][0], 3)
+        self.assertEqual(other.search(self.unit(1, 0, 0), k=5), [])
+
+    def test_search_waits_for_writer(self):
+        writer = VacancyIndex(self.path, 3)
+        writer.upsert(1, self.unit(1, 0, 0))
+        reader = VacancyIndex(self.path, 3)
+        results = []
+
+        with writer._file_lock():
+            thread = threading.Thread(target=lambda: results.append(reader.search(self.unit(1, 0, 0))))
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+        thread.join(5)
+
+        self.assertEqual(results[0][0][0], 1)
+
+    def test_search_answers_during_rebuild(self):
+        index = VacancyIndex(self.path, 3)
+        index.upsert(1, self.unit(1, 0, 0))
+        consumed, release = threading.Event(), threading.Event()
+
+        def slow_items():
+            yield 2, self.unit(0, 1, 0)
+            consumed.set()
+            # Как будто дальше идёт долгое чтение вакансий из БД
+            release.wait(5)
+            yield 3, self.unit(0, 0, 1)
+
+        thread = threading.Thread(target=lambda: VacancyIndex(self.path, 3).rebuild(slow_items()))
+        thread.start()
+        self.assertTrue(consumed.wait(5))
+        try:
+            started = time.monotonic()
+            self.assertEqual(index.search(self.unit(1, 0, 0))[0][0], 1)
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            release.set()
+            thread.join(5)
+
+        self.assertEqual(sorted(vacancy_id for vacancy_id, _ in index.search(self.unit(0, 1, 1))), [2, 3])
+        self.assertEqual(sorted(os.listdir(self.path)), ['ids.i64', 'lock', 'meta.json', 'vectors.f32'])
+
+
+class ResponseParsingTests(SimpleTestCase):
+    answer = '{"score": 87.456, "strengths": ["Python"], "weaknesses": "Мало опыта", ' \
+             '"summary": " Сильный кандидат ", "criteria": {"skills": 90, "experience": 150}}'
+
+    def test_plain_json(self):
+        result = parse_analysis(self.answer)
+
+        self.assertEqual(result['score'], 87.46)
+        self.assertEqual(result['weaknesses'], ['Мало опыта'])
+        self.assertEqual(result['summary'], 'Сильный кандидат')
+        # Значение вне 0-100 отброшено, ответ при этом не битый
+        self.assertEqual(result['criteria'], {'skills': 90.0})
+
+    def test_fenced_json(self):
+        self.assertEqual(parse_analysis(f'```json\n{self.answer}\n```'), parse_analysis(self.answer))
+
+    def test_json_inside_prose(self):
+        text = f'Вот результат анализа:\n{self.answer}\nНадеюсь, это поможет.'
+        self.assertEqual(parse_analysis(text), parse_analysis(self.answer))
+
+    def test_broken_replies(self):
+        for text in (
+            '',
+            'Кандидат подходит, оценка 80',
+            '{"score": 80, "summary": "Хорошо"',
+            '{"score": "высокая", "summary": "Хорошо"}',
+            '{"score": 120, "summary": "Хорошо"}',
+            '{"score": 80}',
+            '[1, 2]',
+        ):
+            with self.subTest(text=text), self.assertRaises(InvalidAIResponse):
+                parse_analysis(text)
+
+    def test_batch_keeps_only_valid_items(self):
+        text = '```json\n[' \
+               '{"id": 1, "score": 70, "summary": "Подходит"},' \
+               '{"id": 2, "score": "нет"},' \
+               '{"id": 1, "score": 10, "summary": "Дубль"},' \
+               '{"id": 5, "score": 50, "summary": "Лишний номер"},' \
+               '"мусор",' \
+               '{"id": "3", "score": 40, "summary": "Не подходит"}' \
+               ']\n```'
+
+        results = parse_batch_analysis(text, 3)
+
+        self.assertEqual(sorted(results), [1, 3])
+        self.assertEqual(results[1]['summary'], 'Подходит')
+        self.assertEqual(results[3]['score'], 40)
+
+    def test_batch_wrapped_in_object_and_prose(self):
+        text = 'Результаты: {"results": [{"id": 1, "score": 55, "summary": "Средне"}]}'
+        self.assertEqual(parse_batch_analysis(text, 1)[1]['score'], 55)
+
+    def test_batch_not_array(self):
+        with self.assertRaises(InvalidAIResponse):
+            parse_batch_analysis('{"score": 80, "summary": "Один кандидат"}', 2)
+
+
+class ClaimJobsTests(TestCase):
+
+    def setUp(self):
+        self.vacancy = create_vacancy()
+        self.jobs = [
+            AnalysisJob.objects.create(vacancy=self.vacancy, candidate_answers={'q': str(number)})
+            for number in range(5)
+        ]
+
+    def test_claims_oldest_pending_jobs(self):
+        claimed = claim_jobs('worker-1', 3)
+
+        self.assertEqual({job.pk for job in claimed}, {job.pk for job in self.jobs[:3]})
+        for job in claimed:
+            self.assertEqual(job.status, AnalysisJob.Status.RUNNING)
+            self.assertEqual(job.locked_by, 'worker-1')
+            self.assertIsNotNone(job.locked_at)
+            self.assertEqual(job.attempts, 1)
+
+    def test_workers_do_not_share_jobs(self):
+        first = {job.pk for job in claim_jobs('worker-1', 3)}
+        second = {job.pk for job in claim_jobs('worker-2', 3)}
+
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(first & second)
+        self.assertEqual(claim_jobs('worker-3', 3), [])
+
+    def test_stale_jobs_return_to_queue(self):
+        claim_jobs('worker-1', 2)
+
+        self.assertEqual(requeue_stale_jobs(timeout=3600), 0)
+        self.assertEqual(requeue_stale_jobs(timeout=-1), 2)
+        reclaimed = claim_jobs('worker-2', 5)
+        self.assertEqual(len(reclaimed), 5)
+        self.assertEqual(sorted(job.attempts for job in reclaimed), [1, 1, 1, 2, 2])
+
+
+class RerankTests(TestCase):
+
+    def setUp(self):
+        self.vacancy = create_vacancy(ai_weight_config={'skills': 1, 'experience': 0, 'keywords': 0})
+        self.candidates = [
+            get_user_model().objects.create_user(
+                email=f'candidate{number}@example.com', first_name='Иван', last_name='Петров',
+                password='password', role='user',
+            )
+            for number in range(3)
+        ]
+        criteria = [
+            {'skills': 90, 'experience': 20, 'keywords': 50},
+            {'skills': 40, 'experience': 100, 'keywords': 60},
+            {'skills': 70},
+        ]
+        self.results = [
+            AnalysisResult.objects.create(
+                vacancy=self.vacancy, candidate=candidate, score=item['skills'], criteria=item,
+                summary='', model='GigaChat', input_hash='',
+            )
+            for candidate, item in zip(self.candidates, criteria)
+        ]
+        self.plain = AnalysisResult.objects.create(
+            vacancy=self.vacancy,
+            candidate=get_user_model().objects.create_user(
+                email='plain@example.com', first_name='Пётр', last_name='Сидоров',
+                password='password', role='user',
+            ),
+            score=55, criteria={}, summary='', model='GigaChat', input_hash='',
+        )
+
+    def scores(self):
+        return {result.candidate_id: result.score for result in AnalysisResult.objects.filter(vacancy=self.vacancy)}
+
+    def test_weight_change_reranks_from_criteria(self):
+        self.vacancy.ai_weight_config = {'skills': 0, 'experience': 1, 'keywords': 0}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.vacancy.save()
+
+        scores = self.scores()
+        self.assertEqual(scores[self.candidates[0].pk], 20)
+        self.assertEqual(scores[self.candidates[1].pk], 100)
+        # Нет подоценки по experience: веса остальных перенормируются
+        self.assertEqual(scores[self.candidates[2].pk], 70)
+        # Без подоценок оценка модели не трогается
+        self.assertEqual(scores[self.plain.candidate_id], 55)
+        ranked = list(AnalysisResult.objects.ranked(self.vacancy, min_score=0).values_list('candidate_id', flat=True))
+        self.assertEqual(ranked[0], self.candidates[1].pk)
+
+    def test_rerank_in_small_batches_updates_only_changed(self):
+        self.vacancy.ai_weight_config = {'skills': 1, 'experience': 1, 'keywords': 0}
+
+        self.assertEqual(rerank_vacancy(self.vacancy, batch_size=1), 2)
+        self.assertEqual(rerank_vacancy(self.vacancy, batch_size=1), 0)
+        scores = self.scores()
+        self.assertEqual(scores[self.candidates[0].pk], 55)
+        self.assertEqual(scores[self.candidates[1].pk], 70)
+        self.assertEqual(scores[self.candidates[2].pk], 70)
+
+    def test_rerank_touches_updated_at(self):
+        before = timezone.now()
+        self.vacancy.ai_weight_config = {'skills': 0, 'experience': 1, 'keywords': 0}
+
+        rerank_vacancy(self.vacancy)
+
+        updated = {result.pk: result.updated_at for result in AnalysisResult.objects.filter(vacancy=self.vacancy)}
+        # Оценки кандидатов 0 и 1 изменились, у кандидата 2 и без подоценок — нет
+        self.assertGreaterEqual(updated[self.results[0].pk], before)
+        self.assertGreaterEqual(updated[self.results[1].pk], before)
+        self.assertEqual(updated[self.results[2].pk], self.results[2].updated_at)
+        self.assertEqual(updated[self.plain.pk], self.plain.updated_at)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SingleFlightTests(SimpleTestCase):
+
+    def setUp(self):
+        clear_caches(self)
+        self.calls = []
+
+    def singleflight(self):
+        return SingleFlight(lock_ttl=5, result_ttl=60, poll_interval=0.01)
+
+    def slow(self, result=None, error=None):
+        def func():
+            self.calls.append(threading.get_ident())
+            time.sleep(0.2)
+            if error is not None:
+                raise error
+            return result
+        return func
+
+    def run_threads(self, targets):
+        outcomes = [None] * len(targets)
+
+        def run(number, target):
+            try:
+                outcomes[number] = target()
+            except Exception as exc:
+                outcomes[number] = exc
+
+        threads = [threading.Thread(target=run, args=item) for item in enumerate(targets)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return outcomes
+
+    def test_same_key_makes_one_call(self):
+        singleflight = self.singleflight()
+        func = self.slow(result='ответ')
+
+        outcomes = self.run_threads([lambda: singleflight.do('prompt', func)] * 8)
+
+        self.assertEqual(outcomes, ['ответ'] * 8)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_other_process_waits_for_leader(self):
+        # Два экземпляра — как два процесса с общим кешем
+        leader, follower = self.singleflight(), self.singleflight()
+
+        outcomes = self.run_threads([
+            lambda: leader.do('prompt', self.slow(result='ответ')),
+            lambda: (time.sleep(0.05), follower.do('prompt', self.slow(result='чужой')))[1],
+        ])
+
+        self.assertEqual(outcomes, ['ответ', 'ответ'])
+        self.assertEqual(len(self.calls), 1)
+        # Результат ещё живёт в кеше и достаётся без вызова
+        self.assertEqual(self.singleflight().do('prompt', self.slow(result='новый')), 'ответ')
+        self.assertEqual(len(self.calls), 1)
+
+    def test_error_reaches_every_waiter_and_is_not_cached(self):
+        singleflight = self.singleflight()
+        error = ConnectionError('GigaChat недоступен')
+        func = self.slow(error=error)
+
+        outcomes = self.run_threads([lambda: singleflight.do('prompt', func)] * 5)
+
+        self.assertEqual(outcomes, [error] * 5)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(singleflight.do('prompt', self.slow(result='ответ')), 'ответ')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_distinct_keys_are_not_merged(self):
+        singleflight = self.singleflight()
+
+        outcomes = self.run_threads([
+            lambda: singleflight.do('first', self.slow(result='первый')),
+            lambda: singleflight.do('second', self.slow(result='второй')),
+        ])
+
+        self.assertEqual(outcomes, ['первый', 'второй'])
+        self.assertEqual(len(self.calls), 2)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    AI_HR_RATE_LIMIT=1.0, AI_HR_RATE_BURST=1,
+    AI_GLOBAL_RATE_LIMIT=1.0, AI_GLOBAL_RATE_BURST=3,
+)
+class QuotaTests(SimpleTestCase):
+
+    def setUp(self):
+        clear_caches(self)
+        # Бакет считает по стенным часам: двигаем их вручную
+        self.now = time.time()
+        patcher = mock.patch('time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bucket_refills_over_time(self):
+        bucket = CacheTokenBucket('test', rate=2.0, burst=2)
+
+        self.assertEqual([bucket.try_acquire() for _ in range(3)], [0, 0, 0.5])
+        self.now += 0.25
+        self.assertAlmostEqual(bucket.try_acquire(), 0.25)
+        self.now += 0.25
+        self.assertEqual(bucket.try_acquire(), 0)
+        # Больше burst токенов не копится
+        self.now += 60
+        self.assertEqual([bucket.try_acquire() for _ in range(3)], [0, 0, 0.5])
+
+    def test_hr_limit_leaves_global_capacity_to_others(self):
+        self.assertEqual(AIQuota(hr_id=1).try_acquire(), 0)
+        self.assertEqual(AIQuota(hr_id=1).try_acquire(), 1.0)
+
+        # Отказ по лимиту HR не тратит общий бакет
+        self.assertEqual(AIQuota(hr_id=2).try_acquire(), 0)
+        self.assertEqual(AIQuota(hr_id=3).try_acquire(), 0)
+
+    def test_global_exhaustion_refunds_hr_token(self):
+        for hr_id in (1, 2, 3):
+            self.assertEqual(AIQuota(hr_id=hr_id).try_acquire(), 0)
+
+        self.assertEqual(AIQuota(hr_id=4).try_acquire(), 1.0)
+        # Токен HR 4 вернулся в его бакет
+        self.assertEqual(CacheTokenBucket('hr:4', rate=1.0, burst=1).try_acquire(), 0)
+
+    def test_quota_exceeded_reports_retry_after(self):
+        quota = AIQuota(hr_id=1)
+        quota.acquire(max_wait=0.5)
+
+        with self.assertRaises(QuotaExceeded) as raised:
+            quota.acquire(max_wait=0.5)
+
+        self.assertEqual(raised.exception.retry_after, 1.0)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalysisResultCacheTests(TestCase):
+    result = {'score': 80.0, 'strengths': ['Python'], 'weaknesses': [], 'summary': 'Подходит'}
+
+    def setUp(self):
+        clear_caches(self)
+        self.vacancy = create_vacancy()
+        self.answers = {'Опыт': '5 лет Python'}
+        self.analyzer = VacancyAIAnalyzer()
+        patcher = mock.patch.object(self.analyzer, '_ask', return_value=self.result)
+        self.ask = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def analyze(self, answers=None, **kwargs):
+        return self.analyzer.analyze_candidate(self.vacancy, answers or self.answers, **kwargs)
+
+    def test_same_input_hits(self):
+        self.assertEqual(self.analyze(), self.result)
+        # Пробелы по краям ответов на ключ не влияют
+        self.assertEqual(self.analyze({' Опыт ': '5 лет Python  '}), self.result)
+
+        self.assertEqual(self.ask.call_count, 1)
+        self.assertEqual(self.analyzer.cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_changed_input_misses(self):
+        self.analyze()
+
+        self.vacancy.title = 'Senior Python разработчик'
+        self.vacancy.save()
+        self.analyze()
+        self.analyze({'Опыт': '1 год Python'})
+        self.analyzer.client.MODEL = 'GigaChat-Pro'
+        self.analyze()
+
+        self.assertEqual(self.ask.call_count, 4)
+
+    def test_use_cache_false_bypasses_cache(self):
+        self.analyze()
+        self.analyze(use_cache=False)
+
+        self.assertEqual(self.ask.call_count, 2)
+        self.assertEqual(self.analyzer.cache.stats()['hits'], 0)
+
+
+class FakeGigaChatSession:
+    """Отвечает на OAuth и chat запросы; chat_statuses — статусы ответов по очереди."""
+
+    def __init__(self, expires_in: float = 1800, chat_statuses=()):
+        self.expires_in = expires_in
+        self.chat_statuses = list(chat_statuses)
+        self.issued = 0
+        self.chat_tokens = []
+
+    def post(self, url, **kwargs):
+        if 'oauth' in url:
+            self.issued += 1
+            return self._response(200, {
+                'access_token': f'token-{self.issued}',
+                'expires_at': int((time.time() + self.expires_in) * 1000),
+            })
+        self.chat_tokens.append(kwargs['headers']['Authorization'])
+        status = self.chat_statuses.pop(0) if self.chat_statuses else 200
+        return self._response(status, {'choices': [{'message': {'content': 'ответ'}}]})
+
+    @staticmethod
+    def _response(status, data):
+        response = mock.Mock(status_code=status)
+        response.json.return_value = data
+        if status >= 400:
+            response.raise_for_status.side_effect = requests.HTTPError(response=response)
+        return response
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    GIGACHAT_AUTH_URL='http://gigachat.test/oauth',
+    GIGACHAT_CHAT_URL='http://gigachat.test/chat',
+)
+class TokenManagerTests(SimpleTestCase):
+
+    def setUp(self):
+        clear_caches(self)
+
+    def make_client(self, session):
+        client = GigaChatClient(session=session)
+        client.tokens = GigaChatTokenManager('test-client', refresh_margin=60)
+        return client
+
+    def test_token_is_reused(self):
+        session = FakeGigaChatSession()
+        client = self.make_client(session)
+
+        self.assertEqual(client.get_access_token(), 'token-1')
+        self.assertEqual(client.get_access_token(), 'token-1')
+        # Другой процесс берёт токен из общего кеша
+        self.assertEqual(self.make_client(session).get_access_token(), 'token-1')
+        self.assertEqual(session.issued, 1)
+
+    def test_token_near_expiry_is_refreshed(self):
+        session = FakeGigaChatSession(expires_in=30)
+        client = self.make_client(session)
+
+        self.assertEqual(client.get_access_token(), 'token-1')
+        # До expires_at меньше refresh_margin — токен уже не считается свежим
+        self.assertEqual(client.get_access_token(), 'token-2')
+        self.assertEqual(session.issued, 2)
+
+    def test_unauthorized_refreshes_token_once(self):
+        session = FakeGigaChatSession(chat_statuses=[401])
+        client = self.make_client(session)
+
+        self.assertEqual(client._ask('привет'), 'ответ')
+        self.assertEqual(session.chat_tokens, ['Bearer token-1', 'Bearer token-2'])
+
+    def test_repeated_unauthorized_is_raised(self):
+        session = FakeGigaChatSession(chat_statuses=[401, 401])
+        client = self.make_client(session)
+
+        with self.assertRaises(requests.HTTPError):
+            client._ask('привет')
+        self.assertEqual(session.issued, 2)
+
+
+class PreScorerTests(TestCase):
+
+    def setUp(self):
+        self.vacancy = create_vacancy(
+            requirements='Опыт коммерческой разработки на Python, Django, PostgreSQL',
+            experience_level=Vacancy.ExperienceLevel.SENIOR,
+        )
+        self.vacancy.skills.set([Skill.objects.create(name=name) for name in ('Python', 'Django')])
+        self.relevant = {
+            'skills': ['Python', 'Django'],
+            'experience_level': 'senior',
+            'about': 'Пять лет коммерческой разработки backend на Python и PostgreSQL',
+        }
+        self.irrelevant = {
+            'skills': 'Photoshop, Illustrator',
+            'experience_level': 'junior',
+            'about': 'Рисую логотипы и баннеры',
+        }
+
+    def test_split_by_threshold(self):
+        passed, rejected = CandidatePreScorer(self.vacancy).split(
+            [(1, self.relevant), (2, self.irrelevant)], threshold=50,
+        )
+
+        self.assertEqual(passed, [(1, self.relevant)])
+        self.assertEqual([candidate_id for candidate_id, _ in rejected], [2])
+        self.assertLess(rejected[0][1], 50)
+
+    def test_scores_are_ordered_and_bounded(self):
+        relevant, irrelevant, empty = CandidatePreScorer(self.vacancy).score(
+            [self.relevant, self.irrelevant, {}],
+        ).tolist()
+
+        self.assertGreater(relevant, 80)
+        self.assertLess(irrelevant, 20)
+        self.assertTrue(0 <= empty <= 100)
+
+
+class PromptBudgetTests(TestCase):
+
+    def setUp(self):
+        self.vacancy = create_vacancy(requirements='Python, Django. ' * 400)
+
+    def test_oversized_answers_fit_budget(self):
+        answers = {
+            'Имя': 'Иван',
+            'Опыт': 'Разрабатывал backend сервисы на Python. ' * 500,
+            'О себе': 'Люблю писать тесты и читать чужой код. ' * 300,
+        }
+
+        prompt = VacancyPromptBuilder(budget=800).build(self.vacancy, answers)
+
+        self.assertLessEqual(prompt.tokens, 800)
+        self.assertEqual(prompt.tokens, estimate_tokens(prompt.text))
+        self.assertCountEqual(prompt.truncated, ['vacancy:requirements', 'answer:Опыт', 'answer:О себе'])
+        # Короткий ответ не обрезается
+        self.assertIn('- Имя: Иван\n', prompt.text)
+
+    def test_batch_fits_budget(self):
+        candidates = [{'Опыт': f'Кандидат {number}: ' + 'Python ' * 2000} for number in range(5)]
+
+        prompt = VacancyPromptBuilder().build_batch(self.vacancy, candidates, budget=1500)
+
+        self.assertLessEqual(prompt.tokens, 1500)
+        for number in range(1, 6):
+            self.assertIn(f'Кандидат {number}:\n- Опыт: ', prompt.text)
+
+    def test_small_answers_are_untouched(self):
+        answers = {'Опыт': '3 года Django'}
+
+        prompt = VacancyPromptBuilder(budget=800).build(self.vacancy, answers)
+
+        self.assertNotIn('answer:Опыт', prompt.truncated)
+        self.assertIn('- Опыт: 3 года Django', prompt.text)
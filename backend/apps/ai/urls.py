@@ -0,0 +1,24 @@
+from rest_framework.routers import DefaultRouter
+from django.urls import path, include
+from .views import (
+    AIMetricsAPIView,
+    AIUsageViewSet,
+    AnalysisExportAPIView,
+    AnalysisJobViewSet,
+    AnalysisResultViewSet,
+    AnalysisStreamAPIView,
+    SimilarVacanciesAPIView,
+)
+
+router = DefaultRouter()
+router.register(r'jobs', AnalysisJobViewSet, basename='analysis-job')
+router.register(r'results', AnalysisResultViewSet, basename='analysis-result')
+router.register(r'usage', AIUsageViewSet, basename='ai-usage')
+
+urlpatterns = [
+    path('metrics/', AIMetricsAPIView.as_view(), name='ai-metrics'),
+    path('analyze/stream/', AnalysisStreamAPIView.as_view(), name='ai-analyze-stream'),
+    path('export/', AnalysisExportAPIView.as_view(), name='ai-export'),
+    path('similar-vacancies/', SimilarVacanciesAPIView.as_view(), name='ai-similar-vacancies'),
+    path('', include(router.urls)),
+]
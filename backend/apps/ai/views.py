@@ -0,0 +1,302 @@
+import logging
+
+from django.conf import settings
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import Throttled, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+
+from apps.accounts.permissions import IsAdmin, IsHR
+from apps.vacancy.models import Vacancy
+from .clients.resilience import get_circuit_breaker
+from .exceptions import CircuitOpenError, QuotaExceeded
+from .models import AIUsage, AnalysisJob, AnalysisResult
+from .renderers import EventStreamRenderer, format_event
+from .serializers import (
+    AIUsageSerializer,
+    AnalysisJobSerializer,
+    AnalysisResultSerializer,
+    AnalysisStreamSerializer,
+    SimilarVacanciesSerializer,
+)
+from .services.analyzer import VacancyAIAnalyzer
+from .services.export import AnalysisExport, parse_watermark
+from .services.result_cache import AnalysisResultCache
+from .services.results import save_analysis_result
+from .services.similarity import similar_vacancies
+from .services.usage import get_call_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisJobViewSet(mixins.CreateModelMixin,
+                         mixins.RetrieveModelMixin,
+                         mixins.ListModelMixin,
+                         viewsets.GenericViewSet):
+    queryset = AnalysisJob.objects.all()
+    serializer_class = AnalysisJobSerializer
+    permission_classes = [IsAuthenticated, IsHR]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+
+        if user.role == 'admin':
+            return queryset
+
+        return queryset.filter(requested_by=user)
+
+    @extend_schema(
+        summary="Поставить AI анализ кандидата в очередь",
+        description="Создаёт задачу анализа и сразу возвращает её id. "
+                    "Задачу выполняет воркер run_ai_worker, статус можно опрашивать по id."
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        unfinished = AnalysisJob.objects.filter(
+            requested_by=request.user,
+            status__in=[AnalysisJob.Status.PENDING, AnalysisJob.Status.RUNNING],
+        ).count()
+        if unfinished >= settings.AI_HR_MAX_PENDING_JOBS:
+            raise Throttled(detail='Слишком много задач AI анализа в очереди, дождитесь их завершения')
+
+        serializer.save(requested_by=request.user)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(
+        summary="Статус и результат задачи AI анализа",
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+class AnalysisStreamAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsHR]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    @extend_schema(
+        request=AnalysisStreamSerializer,
+        responses={(200, 'text/event-stream'): str},
+        summary="Потоковый AI анализ кандидата (SSE)",
+        description="События: summary — очередной кусок вывода по мере генерации, "
+                    "result — итоговый проверенный результат, error — ошибка анализа."
+    )
+    def post(self, request):
+        serializer = AnalysisStreamSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+
+        response = StreamingHttpResponse(
+            self._events(**serializer.validated_data),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        # nginx не должен буферизовать поток
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def _events(self, vacancy, candidate_answers, candidate=None):
+        # Комментарий SSE сразу отдаёт заголовки, не дожидаясь модели
+        yield ': stream started\n\n'
+        analyzer = VacancyAIAnalyzer()
+        try:
+            for event, data in analyzer.stream_candidate(vacancy, candidate_answers):
+                if event == 'summary':
+                    yield format_event(event, {'text': data})
+                    continue
+                if candidate is not None:
+                    save_analysis_result(
+                        vacancy, candidate.pk, candidate_answers, data, analyzer.client.MODEL,
+                    )
+                yield format_event(event, data)
+        except QuotaExceeded as exc:
+            yield format_event('error', {'detail': str(exc), 'retry_after': round(exc.retry_after, 1)})
+        except CircuitOpenError as exc:
+            yield format_event('error', {'detail': str(exc)})
+        except Exception:
+            logger.exception('Streaming analysis failed for vacancy %s', vacancy.pk)
+            yield format_event('error', {'detail': 'Не удалось получить анализ от GigaChat'})
+
+
+class SimilarVacanciesAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=SimilarVacanciesSerializer,
+        summary="Похожие вакансии для кандидата",
+        description="Опубликованные вакансии, ближайшие к ответам кандидата по "
+                    "косинусной близости хешированных векторов. Работает локально, "
+                    "без обращения к GigaChat."
+    )
+    def post(self, request):
+        serializer = SimilarVacanciesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        matches = similar_vacancies(
+            serializer.validated_data['candidate_answers'],
+            serializer.validated_data['limit'],
+        )
+        # Индекс обновляется после коммита, поэтому ещё раз проверяем статус по БД
+        vacancies = Vacancy.objects.filter(
+            pk__in=[vacancy_id for vacancy_id, _ in matches],
+            status=Vacancy.Status.PUBLISHED,
+        ).in_bulk()
+
+        return Response([
+            {
+                'vacancy': vacancy_id,
+                'title': vacancies[vacancy_id].title,
+                'company_name': vacancies[vacancy_id].company_name,
+                'similarity': round(score, 4),
+            }
+            for vacancy_id, score in matches
+            if vacancy_id in vacancies
+        ])
+
+
+class AnalysisResultViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = AnalysisResult.objects.select_related('candidate')
+    serializer_class = AnalysisResultSerializer
+    permission_classes = [IsAuthenticated, IsHR]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+
+        if user.role != 'admin':
+            queryset = queryset.filter(vacancy__hr=user)
+
+        vacancy_id = self.request.query_params.get('vacancy')
+        if self.action == 'list' and vacancy_id:
+            vacancies = Vacancy.objects.all()
+            if user.role != 'admin':
+                vacancies = vacancies.filter(hr=user)
+            vacancy = get_object_or_404(vacancies, pk=vacancy_id)
+            return queryset.ranked(vacancy, self._min_score())
+
+        return queryset
+
+    def _min_score(self):
+        value = self.request.query_params.get('min_score')
+        if value in (None, ''):
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            raise ValidationError({'min_score': 'Должно быть числом'})
+
+    @extend_schema(
+        summary="Результаты AI анализа",
+        description="С параметром vacancy — кандидаты вакансии по убыванию оценки, "
+                    "не ниже min_score (по умолчанию min_ai_score вакансии).",
+        parameters=[
+            OpenApiParameter('vacancy', int, description='ID вакансии'),
+            OpenApiParameter('min_score', float, description='Минимальная оценка'),
+        ],
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+
+class AIUsageViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = AIUsage.objects.select_related('vacancy')
+    serializer_class = AIUsageSerializer
+    permission_classes = [IsAuthenticated, IsHR]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+
+        if user.role == 'admin':
+            return queryset
+
+        return queryset.filter(hr=user)
+
+    @extend_schema(
+        summary="Расход GigaChat по HR",
+        description="Суммы вызовов, токенов, стоимости и времени по каждому HR."
+    )
+    @action(detail=False, methods=['get'], url_path='by-hr')
+    def by_hr(self, request):
+        totals = (
+            self.get_queryset()
+            .order_by()
+            .values('hr', 'hr__email')
+            .annotate(
+                calls=Sum('calls'),
+                failed_calls=Sum('failed_calls'),
+                retries=Sum('retries'),
+                prompt_tokens=Sum('prompt_tokens'),
+                completion_tokens=Sum('completion_tokens'),
+                cost=Sum('cost'),
+                duration=Sum('duration'),
+            )
+            .order_by('-cost')
+        )
+        return Response(list(totals))
+
+
+class AIMetricsAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    @extend_schema(
+        summary="Метрики вызовов GigaChat",
+        description="Задержки, ошибки, повторы и токены по вызовам auth и chat "
+                    "в текущем процессе, статистика кеша результатов и состояние "
+                    "размыкателя цепи."
+    )
+    def get(self, request):
+        return Response({
+            **get_call_metrics().snapshot(),
+            'result_cache': AnalysisResultCache().stats(),
+            'circuit_breaker': get_circuit_breaker().state,
+        })
+
+
+class AnalysisExportAPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    @extend_schema(
+        summary="Выгрузка результатов AI анализа",
+        description="Потоком отдаёт завершённые задачи анализа: входные данные, ответ "
+                    "модели, оценку, попытки и задержки. output — jsonl или parquet; "
+                    "since — выгрузить только задачи, завершённые позже этого момента "
+                    "(finished_at последней строки прошлой выгрузки); задачи, завершённые "
+                    "за AI_EXPORT_OVERLAP секунд до него, выгружаются повторно, повторы "
+                    "отбрасываются по job_id.",
+        parameters=[
+            OpenApiParameter('output', str, enum=['jsonl', 'parquet'], description='Формат файла'),
+            OpenApiParameter('since', str, description='Водяной знак, ISO 8601'),
+        ],
+        responses={(200, 'application/octet-stream'): bytes},
+    )
+    def get(self, request):
+        output = request.query_params.get('output', 'jsonl')
+        if output not in ('jsonl', 'parquet'):
+            raise ValidationError({'output': 'Допустимые значения: jsonl, parquet'})
+        try:
+            since = parse_watermark(request.query_params.get('since'))
+        except ValueError as exc:
+            raise ValidationError({'since': str(exc)})
+
+        export = AnalysisExport(since=since)
+        if output == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ValidationError({'output': 'Выгрузка в Parquet недоступна: не установлен pyarrow'})
+            chunks, content_type = export.parquet(), 'application/vnd.apache.parquet'
+        else:
+            chunks, content_type = export.jsonl(), 'application/x-ndjson'
+
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="ai_analyses.{output}"'
+        return response
@@ -5,3 +5,6 @@ class VacancyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.vacancy'
     verbose_name = "Вакансии"
+
+    def ready(self):
+        from . import signals  # noqa: F401
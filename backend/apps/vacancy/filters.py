@@ -0,0 +1,222 @@
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import CharField, Count, Exists, F, IntegerField, OuterRef, Q, Value
+from rest_framework.exceptions import ValidationError
+
+from .models import Vacancy
+from .taxonomy import get_taxonomy_cache
+
+
+# Фасеты: параметр запроса -> поле вакансии. В пределах фасета значения
+# объединяются через ИЛИ (?work_format=remote,hybrid), фасеты между собой — через И
+FACET_FIELDS = {
+    'category': 'category_id',
+    'specialization': 'specialization_id',
+    'employment_type': 'employment_type',
+    'work_format': 'work_format',
+    'experience_level': 'experience_level',
+    'skills': 'skills__id',
+}
+# Фасет -> поле TaxonomySnapshot с подписями {id: имя}
+FACET_LABELS = {
+    'category': 'category_names',
+    'specialization': 'specialization_names',
+    'skills': 'skill_names',
+}
+FACET_CHOICES = {
+    'employment_type': Vacancy.EmploymentType,
+    'work_format': Vacancy.WorkFormat,
+    'experience_level': Vacancy.ExperienceLevel,
+}
+
+FACETS_VERSION_KEY = 'vacancy:facets:version'
+
+
+def bump_facets_version():
+    """Сбрасывает закешированные счётчики фасетов после изменения вакансий."""
+    try:
+        cache.incr(FACETS_VERSION_KEY)
+    except ValueError:
+        cache.set(FACETS_VERSION_KEY, 1, None)
+
+
+class VacancyFilter:
+    """
+    Фильтры списка вакансий из query параметров и счётчики по фасетам.
+
+    Счётчик значения фасета считается с учётом всех фильтров, кроме
+    фильтра по самому этому фасету: выбрав «remote», пользователь
+    по-прежнему видит, сколько вакансий даст «hybrid».
+    """
+
+    def __init__(self, params):
+        self.selected = {}
+        errors = {}
+        for facet in FACET_FIELDS:
+            values = self._split(params.getlist(facet))
+            if not values:
+                continue
+            try:
+                self.selected[facet] = self._clean(facet, values)
+            except ValueError as exc:
+                errors[facet] = str(exc)
+
+        self.salary = {}
+        for name in ('salary_min', 'salary_max'):
+            value = params.get(name)
+            if value in (None, ''):
+                continue
+            try:
+                self.salary[name] = int(value)
+            except ValueError:
+                errors[name] = 'Должно быть целым числом'
+        self.salary_currency = params.get('salary_currency') or None
+
+        if errors:
+            raise ValidationError(errors)
+
+    def filter(self, queryset, exclude: str = None, only: list = None):
+        """
+        Все фильтры; exclude — кроме фильтра по этому фасету, only — из
+        фасетов только перечисленные (зарплата применяется всегда).
+        """
+        for facet, values in self.selected.items():
+            if facet == exclude or (only is not None and facet not in only):
+                continue
+            if facet == 'skills':
+                # Exists, а не JOIN: вакансия с двумя нужными навыками не задваивается
+                queryset = queryset.filter(Exists(
+                    Vacancy.skills.through.objects.filter(
+                        vacancy_id=OuterRef('pk'), skill_id__in=values,
+                    )
+                ))
+            else:
+                queryset = queryset.filter(**{f'{FACET_FIELDS[facet]}__in': values})
+
+        if self.salary or self.salary_currency:
+            queryset = queryset.filter(salary_is_hidden=False)
+        if self.salary_currency:
+            queryset = queryset.filter(salary_currency=self.salary_currency)
+        if 'salary_min' in self.salary:
+            # Вилка должна доходить до salary_min; без верхней границы смотрим на нижнюю
+            low = self.salary['salary_min']
+            queryset = queryset.filter(
+                Q(salary_to__gte=low) | Q(salary_to__isnull=True, salary_from__gte=low)
+            )
+        if 'salary_max' in self.salary:
+            high = self.salary['salary_max']
+            queryset = queryset.filter(
+                Q(salary_from__lte=high) | Q(salary_from__isnull=True, salary_to__lte=high)
+            )
+        return queryset
+
+    def facet_counts(self, queryset) -> dict:
+        """
+        Счётчики фасетов из кеша. Ключ — SQL базовой выборки (в нём уже
+        видимость по роли) и фильтры; любое изменение вакансий меняет
+        версию. Кеш по умолчанию локальный для процесса, поэтому в других
+        процессах счётчики могут отставать на VACANCY_FACETS_CACHE_TTL.
+        """
+        sql, params = queryset.query.sql_with_params()
+        fingerprint = repr((sql, params, sorted(self.selected.items()), self.salary, self.salary_currency))
+        key = 'vacancy:facets:{}:{}'.format(
+            cache.get(FACETS_VERSION_KEY, 0),
+            hashlib.sha256(fingerprint.encode()).hexdigest(),
+        )
+        counts = cache.get(key)
+        if counts is None:
+            counts = self._count_facets(queryset)
+            cache.set(key, counts, settings.VACANCY_FACETS_CACHE_TTL)
+        return counts
+
+    def _count_facets(self, queryset) -> dict:
+        """
+        Счётчики всех фасетов одним запросом из двух частей через UNION ALL:
+
+        - GROUP BY по всем полям-фасетам сразу: сколько вакансий в каждой
+          встретившейся комбинации (их на порядки меньше, чем вакансий);
+        - GROUP BY по навыкам среди вакансий, прошедших остальные фильтры.
+
+        Счётчики полей-фасетов собираются из комбинаций в Python: для
+        фасета суммируются комбинации, подходящие под все остальные фильтры.
+        """
+        fields = [facet for facet in FACET_FIELDS if facet != 'skills']
+        combinations = (
+            self.filter(queryset, only=['skills'])
+            .order_by()
+            .annotate(**{f'f_{facet}': F(FACET_FIELDS[facet]) for facet in fields},
+                      f_skills=Value(None, output_field=IntegerField()))
+            .values(*(f'f_{facet}' for facet in fields), 'f_skills')
+            .annotate(count=Count('pk'))
+        )
+        skills = (
+            Vacancy.skills.through.objects
+            .filter(vacancy__in=self.filter(queryset, exclude='skills').order_by().values('pk'))
+            .annotate(**{f'f_{facet}': Value(None, output_field=self._output_field(facet))
+                         for facet in fields},
+                      f_skills=F('skill_id'))
+            .values(*(f'f_{facet}' for facet in fields), 'f_skills')
+            .annotate(count=Count('vacancy_id'))
+        )
+
+        counts = {facet: Counter() for facet in FACET_FIELDS}
+        for row in combinations.union(skills, all=True):
+            if row['f_skills'] is not None:
+                counts['skills'][row['f_skills']] += row['count']
+                continue
+            for facet in fields:
+                others_match = all(
+                    row[f'f_{other}'] in values
+                    for other, values in self.selected.items()
+                    if other not in (facet, 'skills')
+                )
+                if others_match and row[f'f_{facet}'] is not None:
+                    counts[facet][row[f'f_{facet}']] += row['count']
+
+        result = {}
+        for facet, values in counts.items():
+            labels = self._labels(facet, values)
+            items = [
+                {'value': value, 'label': self._label(facet, value, labels), 'count': count}
+                for value, count in values.items()
+            ]
+            result[facet] = sorted(items, key=lambda item: (-item['count'], str(item['label'])))
+        return result
+
+    @staticmethod
+    def _output_field(facet: str):
+        return CharField() if facet in FACET_CHOICES else IntegerField()
+
+    @staticmethod
+    def _labels(facet: str, values) -> dict:
+        attribute = FACET_LABELS.get(facet)
+        if attribute is None or not values:
+            return {}
+        return getattr(get_taxonomy_cache().get(), attribute)
+
+    @staticmethod
+    def _label(facet: str, value, labels: dict) -> str:
+        choices = FACET_CHOICES.get(facet)
+        if choices:
+            return choices(value).label
+        return labels.get(value, '')
+
+    @staticmethod
+    def _split(values: list) -> list:
+        return [item.strip() for value in values for item in value.split(',') if item.strip()]
+
+    @staticmethod
+    def _clean(facet: str, values: list) -> list:
+        choices = FACET_CHOICES.get(facet)
+        if choices:
+            invalid = sorted(set(values) - set(choices.values))
+            if invalid:
+                raise ValueError(f'Недопустимые значения: {", ".join(invalid)}')
+            return values
+        try:
+            return [int(value) for value in values]
+        except ValueError:
+            raise ValueError('Ожидаются id через запятую')
@@ -0,0 +1,242 @@
+import codecs
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.db import DatabaseError, transaction
+
+from .models import Category, Skill, Specialization, Vacancy
+from .serializers import VacancySerializer
+from .signals import vacancies_bulk_created
+from .taxonomy import invalidate_taxonomy
+
+
+FORMATS = ('csv', 'jsonl')
+DEFAULT_ENCODING = 'utf-8-sig'
+
+
+class ImportFileError(ValueError):
+    """Файл не читается дальше строки line: кодировка или разметка CSV."""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    failed: int = 0
+    # [{'row': номер строки файла, 'errors': {поле: [сообщения]}}]
+    errors: list = field(default_factory=list)
+    # Чтение файла прервано: строки после этой не импортированы
+    aborted_at: int = None
+
+    def add_error(self, row: int, errors):
+        self.failed += 1
+        self.errors.append({'row': row, 'errors': errors})
+
+
+def detect_format(filename: str) -> str:
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return ''
+
+
+def check_encoding(encoding: str) -> str:
+    """Имя кодировки, если Python её знает; иначе ValueError."""
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        raise ValueError(f'Неизвестная кодировка: {encoding}')
+
+
+def read_rows(stream, file_format: str, encoding: str = DEFAULT_ENCODING):
+    """
+    Строки файла по одной: (номер строки, словарь полей). stream —
+    бинарный файл, читается потоково. В CSV навыки — skills_names через
+    запятую; строки JSONL — объекты в формате VacancySerializer.
+
+    Файл декодируется построчно, чтобы ошибка кодировки (например, CSV
+    из Excel в cp1251 без encoding='cp1251') указывала точную строку:
+    чтение прерывается ImportFileError.
+    """
+    text = _decoded_lines(stream, encoding)
+
+    if file_format == 'csv':
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                data = {key: value for key, value in row.items() if key and value not in (None, '')}
+                if 'skills_names' in data:
+                    data['skills_names'] = [name for name in data['skills_names'].split(',') if name.strip()]
+                yield reader.line_num, data
+        except csv.Error as exc:
+            raise ImportFileError(reader.line_num, f'Ошибка разметки CSV: {exc}')
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield line_number, None
+            continue
+        yield line_number, data
+
+
+def _decoded_lines(stream, encoding: str):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    line_number = 0
+    for line_number, raw in enumerate(stream, start=1):
+        try:
+            yield decoder.decode(raw)
+        except UnicodeDecodeError:
+            raise ImportFileError(line_number, f'Строка не в кодировке {encoding}')
+    try:
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        # Файл оборван посреди символа
+        raise ImportFileError(line_number, f'Строка не в кодировке {encoding}')
+
+
+class VacancyImporter:
+    """
+    Массовый импорт вакансий HR пачками по batch_size строк.
+
+    Каждая строка проверяется VacancySerializer (те же правила, что у
+    API), ошибки собираются по номерам строк. Для пачки категории,
+    специализации и навыки разрешаются по именам несколькими запросами
+    на всю пачку, недостающие создаются bulk_create, затем одним
+    bulk_create создаются вакансии и одним — их связи с навыками.
+    """
+
+    def __init__(self, hr, batch_size: int = 500, publish: bool = False):
+        self.hr = hr
+        self.batch_size = batch_size
+        self.status = Vacancy.Status.PUBLISHED if publish else Vacancy.Status.DRAFT
+        self.report = ImportReport()
+
+    def run(self, rows) -> ImportReport:
+        """
+        Импортирует строки. Если файл перестал читаться, строки до ошибки
+        сохраняются (как и уже записанные пачки), а в отчёте — номер
+        строки и aborted_at.
+        """
+        batch = []
+        try:
+            for row_number, data in rows:
+                if not isinstance(data, dict):
+                    self.report.add_error(row_number, {'non_field_errors': ['Строка не является JSON объектом']})
+                    continue
+
+                serializer = VacancySerializer(data=data)
+                if not serializer.is_valid():
+                    self.report.add_error(row_number, serializer.errors)
+                    continue
+
+                batch.append((row_number, serializer.validated_data))
+                if len(batch) >= self.batch_size:
+                    self._save_batch(batch)
+                    batch = []
+        except ImportFileError as exc:
+            self.report.add_error(exc.line, {'file': [str(exc)]})
+            self.report.aborted_at = exc.line
+
+        if batch:
+            self._save_batch(batch)
+        return self.report
+
+    def _save_batch(self, batch: list):
+        try:
+            with transaction.atomic():
+                vacancy_ids = self._create(batch)
+        except DatabaseError as exc:
+            for row_number, _ in batch:
+                self.report.add_error(row_number, {'non_field_errors': [f'Ошибка БД: {exc}']})
+            return
+
+        self.report.created += len(vacancy_ids)
+        # bulk_create не шлёт post_save: индексы обновляют подписчики сигнала
+        transaction.on_commit(
+            lambda: vacancies_bulk_created.send(sender=Vacancy, vacancy_ids=vacancy_ids),
+            robust=True,
+        )
+
+    def _create(self, batch: list) -> list:
+        rows = [data for _, data in batch]
+
+        categories = self._resolve_names(Category, {data['category_name'].strip() for data in rows})
+        specializations = self._resolve_specializations({
+            (categories[data['category_name'].strip()], data['specialization_name'].strip())
+            for data in rows if (data.get('specialization_name') or '').strip()
+        })
+        skills = self._resolve_names(Skill, {
+            name.strip() for data in rows for name in data.get('skills_names', []) if name.strip()
+        })
+
+        vacancies = []
+        for data in rows:
+            data = dict(data)
+            category = categories[data.pop('category_name').strip()]
+            specialization_name = (data.pop('specialization_name', None) or '').strip()
+            data.pop('skills_names', None)
+            data['status'] = self.status
+            vacancies.append(Vacancy(
+                hr=self.hr,
+                category_id=category,
+                specialization_id=specializations.get((category, specialization_name)),
+                **data,
+            ))
+        Vacancy.objects.bulk_create(vacancies)
+
+        Through = Vacancy.skills.through
+        Through.objects.bulk_create([
+            Through(vacancy_id=vacancy.pk, skill_id=skill_id)
+            for vacancy, data in zip(vacancies, rows)
+            for skill_id in {skills[name.strip()] for name in data.get('skills_names', []) if name.strip()}
+        ])
+        return [vacancy.pk for vacancy in vacancies]
+
+    @staticmethod
+    def _resolve_names(model, names: set) -> dict:
+        """{имя: id}; недостающие записи создаются одним bulk_create."""
+        if not names:
+            return {}
+        found = dict(model.objects.filter(name__in=names).values_list('name', 'pk'))
+        missing = names - found.keys()
+        if missing:
+            # ignore_conflicts: параллельный импорт мог создать то же имя
+            model.objects.bulk_create([model(name=name) for name in missing], ignore_conflicts=True)
+            # bulk_create не шлёт post_save — кеш справочников сбрасываем сами
+            transaction.on_commit(invalidate_taxonomy, robust=True)
+            found.update(model.objects.filter(name__in=missing).values_list('name', 'pk'))
+        return found
+
+    @staticmethod
+    def _resolve_specializations(pairs: set) -> dict:
+        """{(category_id, имя): id} для специализаций пачки."""
+        if not pairs:
+            return {}
+
+        def fetch(wanted):
+            rows = Specialization.objects.filter(
+                category_id__in={category for category, _ in wanted},
+                name__in={name for _, name in wanted},
+            ).values_list('category_id', 'name', 'pk')
+            return {(category, name): pk for category, name, pk in rows if (category, name) in wanted}
+
+        found = fetch(pairs)
+        missing = pairs - found.keys()
+        if missing:
+            Specialization.objects.bulk_create(
+                [Specialization(category_id=category, name=name) for category, name in missing],
+                ignore_conflicts=True,
+            )
+            transaction.on_commit(invalidate_taxonomy, robust=True)
+            found.update(fetch(missing))
+        return found
@@ -0,0 +1,105 @@
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .models import Vacancy
+
+
+# Поля вакансии в порядке VacancySerializer; category, specialization и
+# skills собираются отдельно
+VALUE_FIELDS = (
+    'id',
+    'title',
+    'company_name',
+    'description',
+    'responsibilities',
+    'requirements',
+    'category_id',
+    'category__name',
+    'specialization_id',
+    'specialization__name',
+    'employment_type',
+    'work_format',
+    'experience_level',
+    'location',
+    'salary_from',
+    'salary_to',
+    'salary_currency',
+    'salary_is_hidden',
+    'ai_weight_config',
+    'min_ai_score',
+    'status',
+    'created_at',
+    'updated_at',
+)
+
+
+def vacancy_rows(queryset):
+    """
+    Выборка для списков: values() с именами категории и специализации
+    через JOIN (как select_related) — без создания моделей. Навыки
+    добавляет encode_vacancies.
+    """
+    return queryset.prefetch_related(None).values(*VALUE_FIELDS)
+
+
+def encode_vacancies(rows) -> list:
+    """
+    Строки vacancy_rows -> словари в формате VacancySerializer. Навыки
+    всей страницы берутся одним запросом к связям (как prefetch_related),
+    остальное — перекладывание полей без полей DRF на каждый объект.
+    """
+    rows = list(rows)
+    skills = defaultdict(list)
+    if rows:
+        links = (
+            Vacancy.skills.through.objects
+            .filter(vacancy_id__in=[row['id'] for row in rows])
+            .order_by('skill__name')
+            .values_list('vacancy_id', 'skill_id', 'skill__name')
+        )
+        for vacancy_id, skill_id, name in links:
+            skills[vacancy_id].append({'id': skill_id, 'name': name})
+
+    return [_encode(row, skills[row['id']]) for row in rows]
+
+
+def _encode(row: dict, skills: list) -> dict:
+    specialization = None
+    if row['specialization_id'] is not None:
+        specialization = {'id': row['specialization_id'], 'name': row['specialization__name']}
+
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'company_name': row['company_name'],
+        'description': row['description'],
+        'responsibilities': row['responsibilities'],
+        'requirements': row['requirements'],
+        'category': {'id': row['category_id'], 'name': row['category__name']},
+        'specialization': specialization,
+        'employment_type': row['employment_type'],
+        'work_format': row['work_format'],
+        'experience_level': row['experience_level'],
+        'location': row['location'],
+        'salary_from': row['salary_from'],
+        'salary_to': row['salary_to'],
+        'salary_currency': row['salary_currency'],
+        'salary_is_hidden': row['salary_is_hidden'],
+        'skills': skills,
+        'ai_weight_config': row['ai_weight_config'],
+        'min_ai_score': float(row['min_ai_score']),
+        'status': row['status'],
+        'created_at': _datetime(row['created_at']),
+        'updated_at': _datetime(row['updated_at']),
+    }
+
+
+def _datetime(value):
+    # Как DateTimeField DRF: в текущей зоне, ISO 8601, UTC как «Z»
+    if not value:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
@@ -0,0 +1,104 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from apps.vacancy.models import Category, Skill, Specialization, Vacancy
+from apps.vacancy.serializers import VacancySerializer
+from apps.vacancy.taxonomy import get_taxonomy_cache, invalidate_taxonomy
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает число запросов и время создания вакансии с кешем справочников и без него'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=200)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--specializations', type=int, default=10, help='На категорию')
+        parser.add_argument('--skills', type=int, default=2000)
+        parser.add_argument('--skills-per-vacancy', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        # Всё в одной транзакции с откатом: в БД ничего не остаётся
+        with transaction.atomic():
+            hr = get_user_model().objects.create_user(
+                email='bench-create@example.com', first_name='Bench', last_name='HR',
+                password=None, role='hr',
+            )
+            categories, skills = self._seed(options)
+            payloads = [
+                self._payload(rng, categories, skills, options['skills_per_vacancy'])
+                for _ in range(options['vacancies'])
+            ]
+
+            results = {}
+            for enabled in (False, True):
+                with override_settings(VACANCY_TAXONOMY_CACHE=enabled):
+                    invalidate_taxonomy()
+                    if enabled:
+                        get_taxonomy_cache().get()
+                    results[enabled] = self._run(hr, payloads)
+
+            transaction.set_rollback(True)
+
+        # Снимок мог запомнить откаченные справочники
+        invalidate_taxonomy()
+
+        count = options['vacancies']
+        for enabled, label in ((False, 'без кеша'), (True, 'с кешем')):
+            queries, elapsed = results[enabled]
+            self.stdout.write(
+                f'{label}: {queries / count:.1f} запросов и {elapsed / count * 1000:.2f} мс на вакансию'
+            )
+        saved = (results[False][0] - results[True][0]) / count
+        self.stdout.write(self.style.SUCCESS(f'Экономия: {saved:.1f} запросов на вакансию'))
+
+    @staticmethod
+    def _seed(options):
+        Category.objects.bulk_create([
+            Category(name=f'Bench категория {number}') for number in range(options['categories'])
+        ])
+        categories = {}
+        for category in Category.objects.filter(name__startswith='Bench категория '):
+            Specialization.objects.bulk_create([
+                Specialization(category=category, name=f'Специализация {number}')
+                for number in range(options['specializations'])
+            ])
+            categories[category.name] = [f'Специализация {number}' for number in range(options['specializations'])]
+
+        names = [f'bench-skill-{number}' for number in range(options['skills'])]
+        Skill.objects.bulk_create([Skill(name=name) for name in names])
+        return categories, names
+
+    @staticmethod
+    def _payload(rng, categories, skills, skills_per_vacancy):
+        category = rng.choice(list(categories))
+        return {
+            'title': 'Python разработчик',
+            'company_name': 'Bench',
+            'description': 'Описание',
+            'responsibilities': 'Обязанности',
+            'requirements': 'Требования',
+            'category_name': category,
+            'specialization_name': rng.choice(categories[category]),
+            'skills_names': rng.sample(skills, min(skills_per_vacancy, len(skills))),
+            'employment_type': Vacancy.EmploymentType.FULL_TIME,
+            'work_format': Vacancy.WorkFormat.REMOTE,
+        }
+
+    @staticmethod
+    def _run(hr, payloads):
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            for payload in payloads:
+                serializer = VacancySerializer(data=payload)
+                serializer.is_valid(raise_exception=True)
+                serializer.save(hr=hr, status=Vacancy.Status.DRAFT)
+            elapsed = time.perf_counter() - started
+        return len(context.captured_queries), elapsed
@@ -0,0 +1,105 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from apps.vacancy.listing import encode_vacancies, vacancy_rows
+from apps.vacancy.models import Category, Skill, Specialization, Vacancy
+from apps.vacancy.serializers import VacancySerializer
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает пропускную способность страницы списка вакансий: VacancySerializer и быстрый путь'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vacancies', type=int, default=2000)
+        parser.add_argument('--page-sizes', default='20,100,500')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        variants = (
+            ('VacancySerializer', self._model_serializer),
+            ('VacancySerializer + select/prefetch', self._model_serializer_prefetched),
+            ('values() + encode_vacancies', self._fast_path),
+        )
+
+        # Всё в одной транзакции с откатом: в БД ничего не остаётся
+        with transaction.atomic():
+            self._seed(options['vacancies'], random.Random(options['seed']))
+            queryset = Vacancy.objects.filter(status=Vacancy.Status.PUBLISHED)
+
+            for page_size in page_sizes:
+                self.stdout.write(f'Страница {page_size}:')
+                for label, render in variants:
+                    render(queryset, page_size)
+                    with CaptureQueriesContext(connection) as context:
+                        render(queryset, page_size)
+                    started = time.perf_counter()
+                    for _ in range(options['repeat']):
+                        render(queryset, page_size)
+                    elapsed = (time.perf_counter() - started) / options['repeat']
+                    self.stdout.write(
+                        f'  {label}: {1 / elapsed:.0f} стр/с, {elapsed * 1000:.1f} мс, '
+                        f'запросов {len(context.captured_queries)}'
+                    )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _model_serializer(queryset, page_size):
+        page = list(queryset[:page_size])
+        return JSONRenderer().render(VacancySerializer(page, many=True).data)
+
+    @staticmethod
+    def _model_serializer_prefetched(queryset, page_size):
+        page = list(queryset.select_related('category', 'specialization').prefetch_related('skills')[:page_size])
+        return JSONRenderer().render(VacancySerializer(page, many=True).data)
+
+    @staticmethod
+    def _fast_path(queryset, page_size):
+        return JSONRenderer().render(encode_vacancies(vacancy_rows(queryset)[:page_size]))
+
+    @staticmethod
+    def _seed(count, rng):
+        hr = get_user_model().objects.create_user(
+            email='bench-list@example.com', first_name='Bench', last_name='HR',
+            password=None, role='hr',
+        )
+        categories = Category.objects.bulk_create([Category(name=f'Bench категория {number}') for number in range(10)])
+        specializations = Specialization.objects.bulk_create([
+            Specialization(category=category, name=f'Специализация {number}')
+            for category in categories for number in range(5)
+        ])
+        skills = Skill.objects.bulk_create([Skill(name=f'bench-skill-{number}') for number in range(300)])
+
+        vacancies = []
+        for number in range(count):
+            specialization = rng.choice(specializations)
+            vacancies.append(Vacancy(
+                hr=hr,
+                title=f'Вакансия {number}',
+                company_name='Bench',
+                description='Описание вакансии ' * 20,
+                responsibilities='Обязанности ' * 10,
+                requirements='Требования ' * 10,
+                category=specialization.category,
+                specialization=specialization,
+                employment_type=Vacancy.EmploymentType.FULL_TIME,
+                work_format=rng.choice(Vacancy.WorkFormat.values),
+                salary_from=1000,
+                salary_to=3000,
+                status=Vacancy.Status.PUBLISHED,
+            ))
+        Vacancy.objects.bulk_create(vacancies)
+
+        Through = Vacancy.skills.through
+        Through.objects.bulk_create([
+            Through(vacancy_id=vacancy.pk, skill_id=skill.pk)
+            for vacancy in vacancies for skill in rng.sample(skills, 5)
+        ])
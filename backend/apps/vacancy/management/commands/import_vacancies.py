@@ -0,0 +1,48 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.vacancy.importer import (
+    DEFAULT_ENCODING, FORMATS, VacancyImporter, check_encoding, detect_format, read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = 'Массовый импорт вакансий HR из CSV или JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--hr', required=True, help='Email HR, от имени которого создаются вакансии')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='По умолчанию — по расширению файла')
+        parser.add_argument('--encoding', default=DEFAULT_ENCODING, help='Например, cp1251 для CSV из Excel')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--publish', action='store_true', help='Сразу опубликовать вакансии')
+
+    def handle(self, *args, **options):
+        try:
+            hr = get_user_model().objects.get(email=options['hr'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Пользователь {options["hr"]} не найден')
+
+        file_format = options['format'] or detect_format(options['path'])
+        if file_format not in FORMATS:
+            raise CommandError('Не удалось определить формат, укажите --format')
+
+        try:
+            encoding = check_encoding(options['encoding'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        importer = VacancyImporter(hr, batch_size=options['batch_size'], publish=options['publish'])
+        with open(options['path'], 'rb') as stream:
+            report = importer.run(read_rows(stream, file_format, encoding))
+
+        for error in report.errors:
+            self.stderr.write(f'Строка {error["row"]}: {json.dumps(error["errors"], ensure_ascii=False)}')
+        if report.aborted_at is not None:
+            raise CommandError(
+                f'Импорт остановлен на строке {report.aborted_at}, до неё создано вакансий: {report.created}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Создано вакансий: {report.created}, с ошибками: {report.failed}'))
@@ -0,0 +1,90 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Категория',
+                'verbose_name_plural': 'Категории',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Навык',
+                'verbose_name_plural': 'Навыки',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Specialization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='specializations', to='vacancy.category')),
+            ],
+            options={
+                'verbose_name': 'Специализация',
+                'verbose_name_plural': 'Специализации',
+                'ordering': ['name'],
+                'unique_together': {('category', 'name')},
+            },
+        ),
+        migrations.CreateModel(
+            name='Vacancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('company_name', models.CharField(max_length=255, verbose_name='Компания')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('responsibilities', models.TextField()),
+                ('requirements', models.TextField()),
+                ('employment_type', models.CharField(choices=[('full_time', 'Полная занятость'), ('part_time', 'Частичная занятость'), ('contract', 'Контракт'), ('internship', 'Стажировка')], max_length=20)),
+                ('work_format', models.CharField(choices=[('onsite', 'Офис'), ('remote', 'Удалённо'), ('hybrid', 'Гибрид')], max_length=20)),
+                ('experience_level', models.CharField(choices=[('junior', 'Junior'), ('middle', 'Middle'), ('senior', 'Senior'), ('lead', 'Lead'), ('any', 'Не важно')], default='any', max_length=20)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('salary_from', models.IntegerField(blank=True, null=True)),
+                ('salary_to', models.IntegerField(blank=True, null=True)),
+                ('salary_currency', models.CharField(default='USD', max_length=10)),
+                ('salary_is_hidden', models.BooleanField(default=False)),
+                ('ai_weight_config', models.JSONField(blank=True, default=dict)),
+                ('min_ai_score', models.FloatField(default=0)),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('published', 'Опубликована'), ('closed', 'Закрыта')], default='draft', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='vacancies', to='vacancy.category')),
+                ('hr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vacancies', to=settings.AUTH_USER_MODEL, verbose_name='HR')),
+                ('skills', models.ManyToManyField(blank=True, related_name='vacancies', to='vacancy.skill')),
+                ('specialization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='vacancies', to='vacancy.specialization')),
+            ],
+            options={
+                'verbose_name': 'Вакансия',
+                'verbose_name_plural': 'Вакансии',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status'], name='vacancy_vac_status_5087c2_idx'), models.Index(fields=['category'], name='vacancy_vac_categor_8e3509_idx'), models.Index(fields=['specialization'], name='vacancy_vac_special_b4c588_idx'), models.Index(fields=['experience_level'], name='vacancy_vac_experie_830e5b_idx'), models.Index(fields=['company_name'], name='vacancy_vac_company_538538_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+# DDL зафиксирован здесь, а не берётся из apps.vacancy.search: миграция
+# должна делать то же самое, как бы потом ни менялся код поиска. Индекс
+# заполняется командой rebuild_vacancy_search; на других БД таблица не
+# создаётся и поиск недоступен.
+CREATE_SQL = {
+    'postgresql': [
+        '''
+        CREATE TABLE IF NOT EXISTS vacancy_vacancy_search (
+            vacancy_id bigint PRIMARY KEY
+                REFERENCES vacancy_vacancy (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+            document tsvector NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS vacancy_vacancy_search_gin ON vacancy_vacancy_search USING gin (document)',
+    ],
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS vacancy_vacancy_search USING fts5("
+        "title, skills, requirements, responsibilities, description, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')",
+    ],
+}
+
+DROP_SQL = {
+    'postgresql': ['DROP TABLE IF EXISTS vacancy_vacancy_search'],
+    'sqlite': ['DROP TABLE IF EXISTS vacancy_vacancy_search'],
+}
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0002_vacancy_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['status', 'category', 'specialization', 'employment_type', 'work_format', 'experience_level'], name='vacancy_facets_idx'),
+        ),
+    ]
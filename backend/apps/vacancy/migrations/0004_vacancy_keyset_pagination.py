@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vacancy', '0003_vacancy_facets_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='vacancy',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Вакансия', 'verbose_name_plural': 'Вакансии'},
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['-created_at', '-id'], name='vacancy_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='vacancy_status_created_idx'),
+        ),
+    ]
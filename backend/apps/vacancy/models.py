@@ -141,13 +141,25 @@ class Vacancy(models.Model):
     class Meta:
         verbose_name = 'Вакансия'
         verbose_name_plural = 'Вакансии'
-        ordering = ['-created_at']
+        # id — второй ключ: у вакансий, созданных в одну микросекунду
+        # (bulk_create, импорт), порядок всё равно однозначный
+        ordering = ['-created_at', '-id']
         indexes = [
             models.Index(fields=['status']),
             models.Index(fields=['category']),
             models.Index(fields=['specialization']),
             models.Index(fields=['experience_level']),
             models.Index(fields=['company_name']),
+            # Keyset пагинация списка: все вакансии (админ) и опубликованные
+            models.Index(fields=['-created_at', '-id'], name='vacancy_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='vacancy_status_created_idx'),
+            # Счётчики фасетов: GROUP BY по этим полям среди опубликованных
+            # читается из индекса целиком, без обращения к таблице
+            models.Index(
+                fields=['status', 'category', 'specialization', 'employment_type',
+                        'work_format', 'experience_level'],
+                name='vacancy_facets_idx',
+            ),
         ]
 
 
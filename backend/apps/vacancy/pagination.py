@@ -0,0 +1,130 @@
+import json
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.response import Response
+
+
+class VacancyCursorPagination(CursorPagination):
+    """
+    Keyset пагинация по (created_at, id) — тот же порядок, что
+    Vacancy.Meta.ordering и составные индексы модели.
+
+    Стандартный CursorPagination хранит в курсоре только первое поле
+    сортировки и добирает одинаковые значения смещением. Здесь позиция —
+    пара (created_at, id), страница выбирается условием
+    created_at < X OR (created_at = X AND id < Y) без OFFSET, поэтому
+    страница 500 стоит столько же, сколько первая, а вакансии,
+    опубликованные во время листания, не сдвигают выдачу.
+
+    Общее число по умолчанию не считается. ?total=exact — COUNT(*);
+    ?total=approx — оценка планировщика PostgreSQL или COUNT не дальше
+    approx_count_limit строк на других БД.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    approx_count_limit = 10000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.total = self.get_total(queryset, request.query_params.get('total'))
+
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        if self.cursor is not None:
+            created_at, pk = self._parse_position(self.cursor.position)
+            if reverse:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        ordering = ('created_at', 'id') if reverse else self.ordering
+        results = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor is not None, has_more
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = Cursor(offset=0, reverse=False, position=self._position(self.page[-1]))
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        cursor = Cursor(offset=0, reverse=True, position=self._position(self.page[0]))
+        return self.encode_cursor(cursor)
+
+    def get_paginated_response(self, data):
+        body = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.total is not None:
+            body['total'], body['total_is_exact'] = self.total
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['properties']['total'] = {'type': 'integer', 'nullable': True}
+        response['properties']['total_is_exact'] = {'type': 'boolean', 'nullable': True}
+        return response
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [{
+            'name': 'total',
+            'required': False,
+            'in': 'query',
+            'description': 'Посчитать общее число: exact или approx',
+            'schema': {'type': 'string', 'enum': ['exact', 'approx']},
+        }]
+
+    def get_total(self, queryset, mode):
+        """(число, точное ли оно) или None, если не просили."""
+        if mode == 'exact':
+            return queryset.count(), True
+        if mode != 'approx':
+            return None
+
+        if connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.order_by().explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows']), False
+
+        count = queryset.order_by()[:self.approx_count_limit + 1].count()
+        if count > self.approx_count_limit:
+            return self.approx_count_limit, False
+        return count, True
+
+    @staticmethod
+    def _position(vacancy) -> str:
+        # Список вакансий листается строками values(), остальное — моделями
+        if isinstance(vacancy, dict):
+            return f'{vacancy["created_at"].isoformat()}|{vacancy["id"]}'
+        return f'{vacancy.created_at.isoformat()}|{vacancy.pk}'
+
+    def _parse_position(self, position: str) -> tuple:
+        try:
+            created_at, pk = (position or '').rsplit('|', 1)
+            created_at, pk = parse_datetime(created_at), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
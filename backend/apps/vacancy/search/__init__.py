@@ -0,0 +1,7 @@
+from .index import (
+    SEARCH_MAX_RESULTS,
+    index_vacancies,
+    rebuild_search_index,
+    remove_vacancies,
+    search_vacancies,
+)
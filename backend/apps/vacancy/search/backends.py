@@ -0,0 +1,156 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .stemmer import stem_text
+
+
+SEARCH_TABLE = 'vacancy_vacancy_search'
+
+# Поля документа в порядке важности для ранжирования
+DOCUMENT_FIELDS = ('title', 'skills', 'requirements', 'responsibilities', 'description')
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class PostgresSearchBackend:
+    """
+    tsvector в отдельной таблице с GIN индексом (их создаёт миграция
+    0002_vacancy_search). Конфигурация russian стеммирует русские слова
+    snowball, а латиницу — english_stem, поэтому одна конфигурация
+    покрывает оба языка. Поля получают веса A-D.
+    """
+    WEIGHTS = {
+        'title': 'A',
+        'skills': 'A',
+        'requirements': 'B',
+        'responsibilities': 'C',
+        'description': 'D',
+    }
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, documents: list):
+        """documents — словари с vacancy_id и полями DOCUMENT_FIELDS."""
+        if not documents:
+            return
+        vector = ' || '.join(
+            f"setweight(to_tsvector('russian', %s), '{self.WEIGHTS[name]}')"
+            for name in DOCUMENT_FIELDS
+        )
+        rows = ', '.join(f'(%s, {vector})' for _ in documents)
+        params = []
+        for document in documents:
+            params.append(document['vacancy_id'])
+            params.extend(document[name] or '' for name in DOCUMENT_FIELDS)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (vacancy_id, document) VALUES {rows} '
+                f'ON CONFLICT (vacancy_id) DO UPDATE SET document = EXCLUDED.document',
+                params,
+            )
+
+    def remove(self, vacancy_ids: list):
+        if not vacancy_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE vacancy_id = ANY(%s)', [list(vacancy_ids)])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search(self, query: str, within: tuple, limit: int) -> list:
+        within_sql, within_params = within
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                SELECT s.vacancy_id, ts_rank_cd(s.document, q.query) AS rank
+                FROM {SEARCH_TABLE} s, websearch_to_tsquery('russian', %s) AS q(query)
+                WHERE s.document @@ q.query AND s.vacancy_id IN ({within_sql})
+                ORDER BY rank DESC, s.vacancy_id DESC
+                LIMIT %s
+                ''',
+                [query, *within_params, limit],
+            )
+            return cursor.fetchall()
+
+
+class SQLiteSearchBackend:
+    """
+    Таблица FTS5 из миграции 0002_vacancy_search, rowid = id вакансии.
+    Русские слова приводятся к основам стеммером Snowball до записи и в
+    запросе, английские стеммирует токенайзер porter. Ранжирование — bm25
+    с весами колонок.
+    """
+    WEIGHTS = (10.0, 8.0, 4.0, 2.0, 1.0)
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def index(self, documents: list):
+        if not documents:
+            return
+        self.remove([document['vacancy_id'] for document in documents])
+        columns = ', '.join(DOCUMENT_FIELDS)
+        placeholders = ', '.join(['%s'] * (len(DOCUMENT_FIELDS) + 1))
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES ({placeholders})',
+                [
+                    [document['vacancy_id'], *(stem_text(document[name]) for name in DOCUMENT_FIELDS)]
+                    for document in documents
+                ],
+            )
+
+    def remove(self, vacancy_ids: list):
+        if not vacancy_ids:
+            return
+        vacancy_ids = list(vacancy_ids)
+        placeholders = ', '.join(['%s'] * len(vacancy_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', vacancy_ids)
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, query: str, within: tuple, limit: int) -> list:
+        match = self.match_expression(query)
+        if not match:
+            return []
+        within_sql, within_params = within
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                SELECT rowid, -bm25({SEARCH_TABLE}, {weights}) AS rank
+                FROM {SEARCH_TABLE}
+                WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({within_sql})
+                ORDER BY rank DESC, rowid DESC
+                LIMIT %s
+                ''',
+                [match, *within_params, limit],
+            )
+            return cursor.fetchall()
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        """Все слова запроса обязательны; каждое в кавычках, чтобы не разбирался синтаксис FTS5."""
+        words = WORD_RE.findall(stem_text(query))
+        return ' '.join(f'"{word}"' for word in words)
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_search_backend(connection):
+    try:
+        return BACKENDS[connection.vendor](connection)
+    except KeyError:
+        raise ImproperlyConfigured(f'Полнотекстовый поиск вакансий не поддерживает {connection.vendor}')
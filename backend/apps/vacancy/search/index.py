@@ -0,0 +1,64 @@
+from django.db import connection
+
+from apps.vacancy.models import Vacancy
+from .backends import DOCUMENT_FIELDS, get_search_backend
+
+
+# Поиск возвращает не больше стольких вакансий — дальше релевантность
+# уже мало что значит, а страницы по ним всё равно никто не листает
+SEARCH_MAX_RESULTS = 1000
+
+
+def vacancy_documents(vacancy_model, vacancy_ids: list) -> list:
+    """Документы для индекса двумя запросами на пачку: поля вакансий и их навыки."""
+    documents = {
+        row['id']: {'vacancy_id': row['id'], 'skills': [], **row}
+        for row in vacancy_model.objects.filter(pk__in=vacancy_ids).values(
+            'id', *(name for name in DOCUMENT_FIELDS if name != 'skills'),
+        )
+    }
+    skills = (
+        vacancy_model.skills.through.objects
+        .filter(vacancy_id__in=documents)
+        .values_list('vacancy_id', 'skill__name')
+    )
+    for vacancy_id, name in skills:
+        documents[vacancy_id]['skills'].append(name)
+
+    for document in documents.values():
+        document.pop('id')
+        document['skills'] = ' '.join(sorted(document['skills']))
+    return list(documents.values())
+
+
+def index_vacancies(vacancy_ids: list, using=connection):
+    """Обновляет документы вакансий; удалённые вакансии убираются из индекса."""
+    vacancy_ids = set(vacancy_ids)
+    documents = vacancy_documents(Vacancy, list(vacancy_ids))
+    backend = get_search_backend(using)
+    backend.index(documents)
+    backend.remove(vacancy_ids - {document['vacancy_id'] for document in documents})
+
+
+def remove_vacancies(vacancy_ids: list, using=connection):
+    get_search_backend(using).remove(vacancy_ids)
+
+
+def rebuild_search_index(vacancy_model=Vacancy, using=connection, chunk_size: int = 1000) -> int:
+    backend = get_search_backend(using)
+    backend.clear()
+    ids = list(vacancy_model.objects.order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(ids), chunk_size):
+        backend.index(vacancy_documents(vacancy_model, ids[start:start + chunk_size]))
+    return len(ids)
+
+
+def search_vacancies(query: str, queryset, limit: int = SEARCH_MAX_RESULTS) -> list:
+    """
+    id вакансий из queryset, подходящих под запрос, по убыванию
+    релевантности. queryset ограничивает поиск видимыми пользователю
+    вакансиями прямо в SQL, до LIMIT.
+    """
+    within = queryset.order_by().values('pk').query.sql_with_params()
+    backend = get_search_backend(connection)
+    return [vacancy_id for vacancy_id, _ in backend.search(query, within, limit)]
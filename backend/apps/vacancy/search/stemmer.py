@@ -0,0 +1,120 @@
+import re
+
+
+# Стеммер Snowball для русского языка (snowballstem.org/algorithms/russian).
+# Английские слова стеммирует сама БД: porter в SQLite FTS5, english_stem
+# в конфигурации russian у PostgreSQL
+
+VOWELS = 'аеиоуыэюя'
+
+# Окончания первой группы снимаются, только если перед ними «а» или «я»
+PERFECTIVE_GERUND = (('в', 'вши', 'вшись'), ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'))
+REFLEXIVE = ((), ('ся', 'сь'))
+ADJECTIVE = ((), (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом',
+    'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю', 'ая', 'яя', 'ою', 'ею',
+))
+PARTICIPLE = (('ем', 'нн', 'вш', 'ющ', 'щ'), ('ивш', 'ывш', 'ующ'))
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет', 'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй', 'ил', 'ыл', 'им', 'ым',
+     'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют', 'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = ((), (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и', 'ией', 'ей', 'ой',
+    'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь',
+    'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+))
+SUPERLATIVE = ('ейше', 'ейш')
+DERIVATIONAL = ('ость', 'ост')
+
+CYRILLIC_WORD_RE = re.compile(r'[а-яё]+')
+
+
+def _regions(word: str) -> tuple:
+    """Начала областей RV и R2."""
+    rv = next((i + 1 for i, char in enumerate(word) if char in VOWELS), len(word))
+
+    def after_consonant(start):
+        for i in range(start + 1, len(word)):
+            if word[i] not in VOWELS and word[i - 1] in VOWELS:
+                return i + 1
+        return len(word)
+
+    r1 = after_consonant(0)
+    return rv, after_consonant(r1) if r1 < len(word) else len(word)
+
+
+def _strip(rv: str, groups: tuple):
+    """Снимает самое длинное окончание из groups; None, если ни одно не подошло."""
+    after_a, plain = groups
+    candidates = sorted(
+        [(suffix, True) for suffix in after_a] + [(suffix, False) for suffix in plain],
+        key=lambda item: -len(item[0]),
+    )
+    for suffix, needs_a in candidates:
+        if not rv.endswith(suffix):
+            continue
+        rest = rv[:-len(suffix)]
+        if needs_a and not (rest and rest[-1] in 'ая'):
+            continue
+        return rest
+    return None
+
+
+def _strip_adjectival(rv: str):
+    rest = _strip(rv, ADJECTIVE)
+    if rest is None:
+        return None
+    participle = _strip(rest, PARTICIPLE)
+    return rest if participle is None else participle
+
+
+def stem(word: str) -> str:
+    word = word.lower().replace('ё', 'е')
+    rv_start, r2_start = _regions(word)
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    # Шаг 1
+    rest = _strip(rv, PERFECTIVE_GERUND)
+    if rest is None:
+        reflexive = _strip(rv, REFLEXIVE)
+        rv = rv if reflexive is None else reflexive
+        for strip in (_strip_adjectival, lambda value: _strip(value, VERB), lambda value: _strip(value, NOUN)):
+            rest = strip(rv)
+            if rest is not None:
+                break
+    if rest is not None:
+        rv = rest
+
+    # Шаг 2
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # Шаг 3: словообразовательное окончание только в R2
+    r2 = max(r2_start - rv_start, 0)
+    for suffix in DERIVATIONAL:
+        if rv.endswith(suffix) and len(rv) - len(suffix) >= r2:
+            rv = rv[:-len(suffix)]
+            break
+
+    # Шаг 4
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        for suffix in SUPERLATIVE:
+            if rv.endswith(suffix):
+                rv = rv[:-len(suffix)]
+                if rv.endswith('нн'):
+                    rv = rv[:-1]
+                break
+        else:
+            if rv.endswith('ь'):
+                rv = rv[:-1]
+
+    return prefix + rv
+
+
+def stem_text(text: str) -> str:
+    """Текст, в котором русские слова заменены основами; остальное как было."""
+    return CYRILLIC_WORD_RE.sub(lambda match: stem(match.group()), (text or '').lower())
@@ -1,12 +1,24 @@
 from rest_framework import serializers
-from .models import Vacancy, Category, Specialization, Skill
+from .models import Vacancy
+from .taxonomy import resolve_taxonomy
+
+
+class TaxonomyItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
 
 
 class VacancySerializer(serializers.ModelSerializer):
-    category_name = serializers.CharField(write_only=True)
-    specialization_name = serializers.CharField(write_only=True, required=False, allow_blank=True)
+    # Чтение — вложенные {id, name}; запись — по именам через *_name поля.
+    # Списки отдаются не этим сериализатором, а apps.vacancy.listing —
+    # при изменении полей здесь обновите и его
+    category = TaxonomyItemSerializer(read_only=True)
+    specialization = TaxonomyItemSerializer(read_only=True)
+    skills = TaxonomyItemSerializer(many=True, read_only=True)
+    category_name = serializers.CharField(write_only=True, max_length=100)
+    specialization_name = serializers.CharField(write_only=True, required=False, allow_blank=True, max_length=100)
     skills_names = serializers.ListField(
-        child=serializers.CharField(),
+        child=serializers.CharField(max_length=100),
         write_only=True,
         required=False
     )
@@ -20,7 +32,9 @@ class VacancySerializer(serializers.ModelSerializer):
             'description',
             'responsibilities',
             'requirements',
+            'category',
             'category_name',
+            'specialization',
             'specialization_name',
             'employment_type',
             'work_format',
@@ -30,6 +44,7 @@ class VacancySerializer(serializers.ModelSerializer):
             'salary_to',
             'salary_currency',
             'salary_is_hidden',
+            'skills',
             'skills_names',
             'ai_weight_config',
             'min_ai_score',
@@ -41,31 +56,25 @@ class VacancySerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         request = self.context.get('request')
-        hr = request.user if request else None
-
-        category_name = validated_data.pop('category_name')
-        specialization_name = validated_data.pop('specialization_name', None)
-        skills_names = validated_data.pop('skills_names', [])
+        # hr может прийти из serializer.save(hr=...), как в perform_create
+        hr = validated_data.pop('hr', None) or (request.user if request else None)
 
-        category, _ = Category.objects.get_or_create(name=category_name.strip())
-
-        specialization = None
-        if specialization_name:
-            specialization, _ = Specialization.objects.get_or_create(
-                category=category,
-                name=specialization_name.strip()
-            )
+        # Имена -> id через кеш справочников: для известных имён без запросов
+        category_id, specialization_id, skill_ids = resolve_taxonomy(
+            validated_data.pop('category_name'),
+            validated_data.pop('specialization_name', None),
+            validated_data.pop('skills_names', []),
+        )
 
         vacancy = Vacancy.objects.create(
             hr=hr,
-            category=category,
-            specialization=specialization,
+            category_id=category_id,
+            specialization_id=specialization_id,
             **validated_data
         )
 
-        for skill_name in skills_names:
-            skill, _ = Skill.objects.get_or_create(name=skill_name.strip())
-            vacancy.skills.add(skill)
+        if skill_ids:
+            vacancy.skills.add(*skill_ids)
 
         return vacancy
 
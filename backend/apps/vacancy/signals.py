@@ -0,0 +1,76 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .filters import bump_facets_version
+from .models import Category, Skill, Specialization, Vacancy
+from .search import index_vacancies, remove_vacancies
+from .taxonomy import invalidate_taxonomy
+
+
+# Вакансии созданы в обход save() (bulk_create при импорте): vacancy_ids
+vacancies_bulk_created = Signal()
+
+# Индекс поиска обновляется после коммита; robust — сбой индексации
+# логируется, но не превращает уже сохранённую вакансию в ошибку 500.
+# Индекс всегда можно пересобрать командой rebuild_vacancy_search
+
+def _reindex(vacancy_ids):
+    if vacancy_ids:
+        transaction.on_commit(lambda: index_vacancies(vacancy_ids), robust=True)
+        transaction.on_commit(bump_facets_version, robust=True)
+
+
+@receiver(post_save, sender=Vacancy)
+def index_on_save(sender, instance, **kwargs):
+    _reindex([instance.pk])
+
+
+@receiver(vacancies_bulk_created, sender=Vacancy)
+def index_on_bulk_create(sender, vacancy_ids, **kwargs):
+    _reindex(list(vacancy_ids))
+
+
+@receiver(post_delete, sender=Vacancy)
+def remove_on_delete(sender, instance, **kwargs):
+    vacancy_id = instance.pk
+    transaction.on_commit(lambda: remove_vacancies([vacancy_id]), robust=True)
+    transaction.on_commit(bump_facets_version, robust=True)
+
+
+@receiver(m2m_changed, sender=Vacancy.skills.through)
+def index_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _reindex([instance.pk])
+        return
+
+    # skill.vacancies.add(...): instance — навык, pk_set — вакансии
+    if action == 'pre_clear':
+        instance._cleared_vacancy_ids = list(instance.vacancies.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        _reindex(getattr(instance, '_cleared_vacancy_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        _reindex(list(pk_set))
+
+
+@receiver(post_save, sender=Skill)
+def index_on_skill_rename(sender, instance, created, **kwargs):
+    if not created:
+        _reindex(list(instance.vacancies.values_list('pk', flat=True)))
+
+
+@receiver(pre_delete, sender=Skill)
+def index_on_skill_delete(sender, instance, **kwargs):
+    # Связи удаляются каскадом без m2m_changed, поэтому вакансии запоминаем заранее
+    _reindex(list(instance.vacancies.values_list('pk', flat=True)))
+
+
+# Кеш справочников сбрасывается после коммита: иначе другой процесс успел
+# бы перечитать снимок без ещё не закоммиченных изменений
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Specialization)
+@receiver([post_save, post_delete], sender=Skill)
+def invalidate_taxonomy_on_change(sender, **kwargs):
+    transaction.on_commit(invalidate_taxonomy, robust=True)
@@ -0,0 +1,204 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Value
+
+from .models import Category, Skill, Specialization
+
+
+VERSION_KEY = 'vacancy:taxonomy:version'
+
+
+@dataclass
+class TaxonomySnapshot:
+    """Все категории, специализации и навыки: имя -> id и обратно."""
+    version: int
+    category_ids: dict = field(default_factory=dict)
+    specialization_ids: dict = field(default_factory=dict)  # (category_id, имя) -> id
+    skill_ids: dict = field(default_factory=dict)
+    categories: list = field(default_factory=list)  # для API: активные, со специализациями
+    category_names: dict = field(default_factory=dict)
+    specialization_names: dict = field(default_factory=dict)
+    skill_names: dict = field(default_factory=dict)
+    etag: str = ''
+
+    @classmethod
+    def load(cls, version: int) -> 'TaxonomySnapshot':
+        snapshot = cls(version=version)
+        active = {}
+        for pk, name, is_active in Category.objects.values_list('pk', 'name', 'is_active'):
+            snapshot.category_ids[name] = pk
+            snapshot.category_names[pk] = name
+            if is_active:
+                active[pk] = {'id': pk, 'name': name, 'specializations': []}
+
+        for pk, category_id, name in Specialization.objects.values_list('pk', 'category_id', 'name'):
+            snapshot.specialization_ids[(category_id, name)] = pk
+            snapshot.specialization_names[pk] = name
+            if category_id in active:
+                active[category_id]['specializations'].append({'id': pk, 'name': name})
+
+        for pk, name in Skill.objects.values_list('pk', 'name'):
+            snapshot.skill_ids[name] = pk
+            snapshot.skill_names[pk] = name
+
+        snapshot.categories = sorted(active.values(), key=lambda item: item['name'])
+        for category in snapshot.categories:
+            category['specializations'].sort(key=lambda item: item['name'])
+        # По содержимому, а не по версии: версии разных процессов независимы
+        snapshot.etag = hashlib.sha256(repr((
+            snapshot.categories, sorted(snapshot.skill_ids.items()),
+        )).encode()).hexdigest()[:32]
+        return snapshot
+
+    @property
+    def skills(self) -> list:
+        return [{'id': pk, 'name': name} for name, pk in sorted(self.skill_ids.items())]
+
+
+class TaxonomyCache:
+    """
+    Версионированный кеш справочников в два уровня: снимок в памяти
+    процесса и тот же снимок в общем кеше Django под ключом с версией.
+
+    Номер версии лежит в общем кеше; сигналы save/delete категорий,
+    специализаций и навыков увеличивают его. Каждое обращение сверяет
+    версию одним cache.get: совпала — отдаём снимок из памяти, нет —
+    берём снимок новой версии из общего кеша, а если его там нет,
+    собираем из БД тремя запросами. С локальным кешем (LocMemCache)
+    версия видна только своему процессу, поэтому снимок живёт не дольше
+    VACANCY_TAXONOMY_CACHE_TTL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._expires_at = 0.0
+
+    def get(self) -> TaxonomySnapshot:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = 1
+            cache.add(VERSION_KEY, version, None)
+
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot, version):
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot, version):
+                return snapshot
+
+            key = f'vacancy:taxonomy:{version}'
+            snapshot = cache.get(key)
+            if snapshot is None:
+                snapshot = TaxonomySnapshot.load(version)
+                cache.set(key, snapshot, settings.VACANCY_TAXONOMY_CACHE_TTL)
+            self._snapshot = snapshot
+            self._expires_at = time.monotonic() + settings.VACANCY_TAXONOMY_CACHE_TTL
+            return snapshot
+
+    def _is_fresh(self, snapshot, version) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == version
+            and time.monotonic() < self._expires_at
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 2, None)
+
+
+def resolve_taxonomy(category_name: str, specialization_name: str = None, skills_names=()) -> tuple:
+    """
+    id категории, специализации (или None) и навыков по именам. Известные
+    имена берутся из кеша, недостающие записи создаются.
+
+    Снимок в другом процессе может не знать об удалении записи ещё до
+    VACANCY_TAXONOMY_CACHE_TTL, поэтому id из кеша перед записью
+    проверяются одним запросом; пропавшие сбрасывают кеш и создаются заново.
+    """
+    category_name = category_name.strip()
+    specialization_name = (specialization_name or '').strip()
+    skills_names = list(dict.fromkeys(name.strip() for name in skills_names if name.strip()))
+
+    category_id = specialization_id = None
+    skill_ids = {}
+    if settings.VACANCY_TAXONOMY_CACHE:
+        snapshot = get_taxonomy_cache().get()
+        category_id = snapshot.category_ids.get(category_name)
+        if category_id is not None and specialization_name:
+            specialization_id = snapshot.specialization_ids.get((category_id, specialization_name))
+        skill_ids = {name: snapshot.skill_ids[name] for name in skills_names if name in snapshot.skill_ids}
+        category_id, specialization_id, skill_ids = _existing(category_id, specialization_id, skill_ids)
+
+    if category_id is None:
+        category_id = Category.objects.get_or_create(name=category_name)[0].pk
+
+    if specialization_name and specialization_id is None:
+        specialization_id = Specialization.objects.get_or_create(
+            category_id=category_id, name=specialization_name,
+        )[0].pk
+
+    for name in skills_names:
+        if name not in skill_ids:
+            skill_ids[name] = Skill.objects.get_or_create(name=name)[0].pk
+
+    return category_id, specialization_id, [skill_ids[name] for name in skills_names]
+
+
+def _existing(category_id, specialization_id, skill_ids: dict) -> tuple:
+    """Оставляет только id из кеша, которые есть в БД (один запрос через UNION ALL)."""
+    wanted = []
+    if category_id is not None:
+        wanted.append((Category, 'category', [category_id]))
+    if specialization_id is not None:
+        wanted.append((Specialization, 'specialization', [specialization_id]))
+    if skill_ids:
+        wanted.append((Skill, 'skill', list(skill_ids.values())))
+    if not wanted:
+        return category_id, specialization_id, skill_ids
+
+    queries = [
+        model.objects.filter(pk__in=ids).order_by().annotate(kind=Value(kind)).values_list('pk', 'kind')
+        for model, kind, ids in wanted
+    ]
+    found = set(queries[0].union(*queries[1:], all=True))
+
+    fresh_skills = {name: pk for name, pk in skill_ids.items() if (pk, 'skill') in found}
+    if category_id is not None and (category_id, 'category') not in found:
+        # Специализации удаляются вместе с категорией
+        category_id = specialization_id = None
+    if specialization_id is not None and (specialization_id, 'specialization') not in found:
+        specialization_id = None
+
+    if len(found) < sum(len(ids) for _, _, ids in wanted):
+        invalidate_taxonomy()
+    return category_id, specialization_id, fresh_skills
+
+
+def invalidate_taxonomy():
+    get_taxonomy_cache().invalidate()
+
+
+_taxonomy_cache = None
+_lock = threading.Lock()
+
+
+def get_taxonomy_cache() -> TaxonomyCache:
+    global _taxonomy_cache
+
+    with _lock:
+        if _taxonomy_cache is None:
+            _taxonomy_cache = TaxonomyCache()
+        return _taxonomy_cache
@@ -1,3 +1,392 @@
-from django.test import TestCase
+import json
+from base64 import b64encode
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .filters import FACET_FIELDS, VacancyFilter
+from .listing import encode_vacancies, vacancy_rows
+from .models import Category, Skill, Specialization, Vacancy
+from .search.stemmer import stem, stem_text
+from .serializers import VacancySerializer
+from .taxonomy import get_taxonomy_cache, invalidate_taxonomy
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'ai_results': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def vacancy_payload(**overrides):
+    payload = {
+        'title': 'Python разработчик',
+        'company_name': 'SmartHR',
+        'description': 'Разработка backend сервисов',
+        'responsibilities': 'Писать код',
+        'requirements': 'Python, Django',
+        'category_name': 'IT',
+        'specialization_name': 'Backend',
+        'skills_names': ['Python', 'Django'],
+        'employment_type': Vacancy.EmploymentType.FULL_TIME,
+        'work_format': Vacancy.WorkFormat.REMOTE,
+    }
+    payload.update(overrides)
+    return payload
+
+
+def create_user(email, role):
+    return get_user_model().objects.create_user(
+        email=email, first_name='Анна', last_name='Иванова', password='password', role=role,
+    )
+
+
+def create_vacancy(hr, **fields):
+    category, _ = Category.objects.get_or_create(name='IT')
+    values = dict(
+        hr=hr, title='Вакансия', company_name='SmartHR', description='Описание',
+        responsibilities='Обязанности', requirements='Требования', category=category,
+        employment_type=Vacancy.EmploymentType.FULL_TIME, work_format=Vacancy.WorkFormat.REMOTE,
+        status=Vacancy.Status.PUBLISHED,
+    )
+    values.update(fields)
+    return Vacancy.objects.create(**values)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, VACANCY_TAXONOMY_CACHE=True)
+class TaxonomyCacheTests(TestCase):
+
+    def setUp(self):
+        invalidate_taxonomy()
+        self.hr = get_user_model().objects.create_user(
+            email='hr@example.com', first_name='Анна', last_name='Иванова',
+            password='password', role='hr',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def tearDown(self):
+        invalidate_taxonomy()
+
+    def test_create_uses_cached_ids(self):
+        category = Category.objects.create(name='IT')
+        specialization = Specialization.objects.create(category=category, name='Backend')
+        skill = Skill.objects.create(name='Python')
+        get_taxonomy_cache().get()
+
+        response = self.client.post('/api/auth/vacancies/', vacancy_payload(skills_names=['Python']), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        vacancy = Vacancy.objects.get(pk=response.data['id'])
+        self.assertEqual(vacancy.hr, self.hr)
+        self.assertEqual(vacancy.category_id, category.pk)
+        self.assertEqual(vacancy.specialization_id, specialization.pk)
+        self.assertEqual(list(vacancy.skills.values_list('pk', flat=True)), [skill.pk])
+
+    def test_stale_snapshot_after_delete_in_other_process(self):
+        # Сигналы шлют сброс после коммита, а в TestCase коммита нет —
+        # как если бы записи удалил другой процесс с локальным кешем
+        category = Category.objects.create(name='IT')
+        Specialization.objects.create(category=category, name='Backend')
+        Skill.objects.create(name='Python')
+        snapshot = get_taxonomy_cache().get()
+        Skill.objects.filter(name='Python').delete()
+        Category.objects.filter(name='IT').delete()
+
+        response = self.client.post('/api/auth/vacancies/', vacancy_payload(), format='json')
+
+        self.assertEqual(response.status_code, 201)
+        vacancy = Vacancy.objects.get(pk=response.data['id'])
+        self.assertEqual(vacancy.category.name, 'IT')
+        self.assertEqual(vacancy.specialization.name, 'Backend')
+        self.assertEqual(sorted(vacancy.skills.values_list('name', flat=True)), ['Django', 'Python'])
+        self.assertIsNot(get_taxonomy_cache().get(), snapshot)
+
+
+class VacancyImportTests(TestCase):
+    header = 'title,company_name,description,responsibilities,requirements,category_name,' \
+             'employment_type,work_format,skills_names\n'
+
+    def setUp(self):
+        self.hr = get_user_model().objects.create_user(
+            email='hr@example.com', first_name='Анна', last_name='Иванова',
+            password='password', role='hr',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def row(self, title):
+        return f'{title},SmartHR,Описание,Обязанности,Требования,IT,full_time,remote,"Python,Django"\n'
+
+    def upload(self, content: bytes, **data):
+        data['file'] = SimpleUploadedFile('vacancies.csv', content, content_type='text/csv')
+        return self.client.post('/api/auth/vacancies/import/', data, format='multipart')
+
+    def test_cp1251_with_encoding(self):
+        content = (self.header + self.row('Разработчик')).encode('cp1251')
+
+        response = self.upload(content, encoding='cp1251')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Vacancy.objects.get().title, 'Разработчик')
+
+    def test_wrong_encoding_reports_line(self):
+        content = (self.header + self.row('Тестировщик')).encode('utf-8') + self.row('Аналитик').encode('cp1251')
+
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['aborted_at'], 3)
+        self.assertEqual(response.data['errors'][-1]['row'], 3)
+        # Строки до ошибки сохранены, и это видно по отчёту
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Vacancy.objects.get().title, 'Тестировщик')
+
+    def test_unknown_encoding(self):
+        response = self.upload(self.header.encode(), encoding='no-such-codec')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('encoding', response.data)
+
+
+class StemmerTests(SimpleTestCase):
+
+    def test_word_forms_share_stem(self):
+        for forms in (
+            ('разработчик', 'разработчика', 'разработчики', 'разработчиками', 'разработчиков'),
+            ('аналитик', 'аналитика', 'аналитиков'),
+            ('тестирование', 'тестированием', 'тестирования'),
+        ):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(form) for form in forms}), 1)
+
+    def test_text_keeps_latin_words(self):
+        self.assertEqual(stem_text('Опытные разработчики Python'), 'опытн разработчик python')
+        self.assertEqual(stem('Ёлка'), stem('елка'))
+
+
+class VacancySearchTests(TestCase):
+
+    def setUp(self):
+        self.hr = create_user('hr@example.com', 'hr')
+        self.client = APIClient()
+        # Индекс обновляют сигналы после коммита — выполняем их сразу
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_title = create_vacancy(self.hr, title='Python разработчик')
+            self.in_description = create_vacancy(
+                self.hr, title='Аналитик данных', description='Помогаем разработчикам с отчётами',
+            )
+            self.draft = create_vacancy(self.hr, title='Разработчик Go', status=Vacancy.Status.DRAFT)
+            self.foreign_draft = create_vacancy(
+                create_user('other@example.com', 'hr'), title='Разработчик 1С', status=Vacancy.Status.DRAFT,
+            )
+            create_vacancy(self.hr, title='Дизайнер')
+
+    def search(self, user, query):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/auth/vacancies/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_title_match_ranks_first(self):
+        # Совпадение в названии выше, хотя при равном ранге первой шла бы более новая вакансия
+        self.assertEqual(
+            self.search(create_user('user@example.com', 'user'), 'разработчиков'),
+            [self.in_title.pk, self.in_description.pk],
+        )
+
+    def test_hr_sees_own_drafts_only(self):
+        ids = self.search(self.hr, 'разработчик')
+
+        self.assertCountEqual(ids, [self.in_title.pk, self.in_description.pk, self.draft.pk])
+        self.assertNotIn(self.foreign_draft.pk, ids)
+
+    def test_index_follows_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_title.title = 'Python инженер'
+            self.in_title.save()
+            self.in_description.delete()
+
+        self.assertEqual(self.search(create_user('user@example.com', 'user'), 'разработчик'), [])
+
+    def test_migration_skips_unsupported_vendor(self):
+        migration = import_module('apps.vacancy.migrations.0002_vacancy_search')
+        schema_editor = SimpleNamespace(connection=SimpleNamespace(vendor='mysql'), execute=mock.Mock())
+
+        for operation in migration.Migration.operations:
+            operation.code(None, schema_editor)
+            operation.reverse_code(None, schema_editor)
+
+        schema_editor.execute.assert_not_called()
+
+
+class VacancyCursorPaginationTests(TestCase):
+
+    def setUp(self):
+        hr = create_user('hr@example.com', 'hr')
+        self.client = APIClient()
+        self.client.force_authenticate(create_user('user@example.com', 'user'))
+
+        vacancies = [create_vacancy(hr, title=f'Вакансия {number}') for number in range(7)]
+        # Три вакансии с одинаковым created_at: порядок среди них решает id
+        now = timezone.now()
+        created = [now, now - timedelta(minutes=1), now - timedelta(minutes=1),
+                   now - timedelta(minutes=1), now - timedelta(minutes=2), now - timedelta(minutes=3),
+                   now - timedelta(minutes=3)]
+        for vacancy, created_at in zip(vacancies, created):
+            Vacancy.objects.filter(pk=vacancy.pk).update(created_at=created_at)
+        self.expected = list(Vacancy.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_pages_cover_ties_without_gaps(self):
+        pages = [self.get('/api/auth/vacancies/', page_size=2)]
+        while pages[-1]['next']:
+            pages.append(self.get(pages[-1]['next']))
+
+        self.assertEqual([len(page['results']) for page in pages], [2, 2, 2, 1])
+        self.assertEqual([row['id'] for page in pages for row in page['results']], self.expected)
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_returns_same_pages(self):
+        forward = [self.get('/api/auth/vacancies/', page_size=2)]
+        while forward[-1]['next']:
+            forward.append(self.get(forward[-1]['next']))
+
+        backward = [forward[-1]]
+        while backward[-1]['previous']:
+            backward.append(self.get(backward[-1]['previous']))
+
+        self.assertEqual(
+            [[row['id'] for row in page['results']] for page in reversed(backward)],
+            [[row['id'] for row in page['results']] for page in forward],
+        )
+
+    def test_exact_total(self):
+        data = self.get('/api/auth/vacancies/', page_size=2, total='exact')
+
+        self.assertEqual((data['total'], data['total_is_exact']), (7, True))
+
+    def test_invalid_cursor(self):
+        bad_position = b64encode(urlencode({'p': 'вчера|1'}).encode()).decode()
+        for cursor in ('not-a-cursor', bad_position):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/auth/vacancies/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class FacetCountsTests(TestCase):
+
+    def setUp(self):
+        hr = create_user('hr@example.com', 'hr')
+        self.it = it = Category.objects.create(name='IT')
+        sales = Category.objects.create(name='Продажи')
+        backend = Specialization.objects.create(category=it, name='Backend')
+        self.python, self.django, self.excel = (
+            Skill.objects.create(name=name) for name in ('Python', 'Django', 'Excel')
+        )
+        remote, office, hybrid = Vacancy.WorkFormat.REMOTE, Vacancy.WorkFormat.ONSITE, Vacancy.WorkFormat.HYBRID
+        for category, specialization, work_format, skills in (
+            (it, backend, remote, [self.python, self.django]),
+            (it, backend, office, [self.python]),
+            (it, None, hybrid, [self.django]),
+            (it, None, remote, []),
+            (sales, None, remote, [self.excel]),
+            (sales, None, office, [self.excel, self.python]),
+        ):
+            vacancy = create_vacancy(hr, category=category, specialization=specialization, work_format=work_format)
+            vacancy.skills.set(skills)
+        self.queryset = Vacancy.objects.filter(status=Vacancy.Status.PUBLISHED)
+
+    def expected(self, vacancy_filter, facet, value):
+        queryset = vacancy_filter.filter(self.queryset, exclude=facet)
+        return queryset.filter(**{FACET_FIELDS[facet]: value}).distinct().count()
+
+    def test_counts_match_per_facet_queries(self):
+        for query in (
+            '',
+            'work_format=remote',
+            f'category={self.it.pk}&work_format=remote,onsite',
+            f'skills={self.python.pk},{self.excel.pk}&work_format=onsite',
+        ):
+            vacancy_filter = VacancyFilter(QueryDict(query))
+            with self.subTest(query=query):
+                counts = vacancy_filter.facet_counts(self.queryset)
+                for facet, items in counts.items():
+                    for item in items:
+                        self.assertEqual(
+                            item['count'], self.expected(vacancy_filter, facet, item['value']),
+                            f'{facet}={item["value"]}',
+                        )
+                # Значения с ненулевым счётчиком не пропущены
+                self.assertEqual(
+                    sum(item['count'] for item in counts['work_format']),
+                    vacancy_filter.filter(self.queryset, exclude='work_format').count(),
+                )
+                self.assertEqual(
+                    {item['value'] for item in counts['skills']},
+                    set(vacancy_filter.filter(self.queryset, exclude='skills')
+                        .values_list('skills__id', flat=True).exclude(skills__id=None)),
+                )
+
+    def test_counts_take_one_query(self):
+        vacancy_filter = VacancyFilter(QueryDict(f'skills={self.python.pk}&work_format=remote'))
+        # Подписи берутся из кеша справочников — прогреваем его заранее
+        get_taxonomy_cache().get()
+
+        with self.assertNumQueries(1):
+            vacancy_filter.facet_counts(self.queryset)
+
+
+class VacancyListingTests(TestCase):
+
+    def setUp(self):
+        self.hr = create_user('hr@example.com', 'hr')
+        category = Category.objects.create(name='IT')
+        specialization = Specialization.objects.create(category=category, name='Backend')
+        with_skills = create_vacancy(
+            self.hr, category=category, specialization=specialization, location='Москва',
+            salary_from=150000, salary_to=None, salary_currency='RUB',
+            ai_weight_config={'skills': 0.7, 'experience': 0.3}, min_ai_score=55.5,
+        )
+        with_skills.skills.set([Skill.objects.create(name=name) for name in ('SQL', 'Django', 'Python')])
+        # Без специализации, навыков и вилки, черновик со скрытой зарплатой
+        create_vacancy(self.hr, category=category, status=Vacancy.Status.DRAFT, salary_is_hidden=True)
+
+    @staticmethod
+    def render(data):
+        return json.loads(JSONRenderer().render(data))
+
+    def test_fast_path_matches_serializer(self):
+        queryset = Vacancy.objects.all()
+        for time_zone in ('UTC', 'Europe/Moscow'):
+            with self.subTest(time_zone=time_zone), override_settings(TIME_ZONE=time_zone):
+                self.assertEqual(
+                    self.render(encode_vacancies(vacancy_rows(queryset))),
+                    self.render(VacancySerializer(queryset, many=True).data),
+                )
+
+    def test_list_endpoint_matches_serializer(self):
+        client = APIClient()
+        client.force_authenticate(self.hr)
+
+        response = client.get('/api/auth/vacancies/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.render(response.data['results']),
+            self.render(VacancySerializer(Vacancy.objects.all(), many=True).data),
+        )
@@ -1,9 +1,10 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import VacancyViewSet
+from .views import TaxonomyViewSet, VacancyViewSet
 
 router = DefaultRouter()
 router.register(r'vacancies', VacancyViewSet, basename='vacancy')
+router.register(r'taxonomy', TaxonomyViewSet, basename='taxonomy')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,8 +1,20 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from .filters import VacancyFilter
+from .importer import (
+    DEFAULT_ENCODING, FORMATS, VacancyImporter, check_encoding, detect_format, read_rows,
+)
+from .listing import encode_vacancies, vacancy_rows
 from .models import Vacancy
+from .pagination import VacancyCursorPagination
+from .search import search_vacancies
 from .serializers import VacancySerializer
+from .taxonomy import get_taxonomy_cache
 from rest_framework import permissions
 
 
@@ -22,6 +34,47 @@ class VacancyViewSet(viewsets.ModelViewSet):
     queryset = Vacancy.objects.all()
     serializer_class = VacancySerializer
     permission_classes = [IsHROrReadOnly]
+    pagination_class = VacancyCursorPagination
+
+
+    @extend_schema(
+        summary="Список вакансий с фильтрами",
+        description="Фильтры: category, specialization, skills (id через запятую), "
+                    "employment_type, work_format, experience_level (значения через запятую), "
+                    "salary_min, salary_max, salary_currency. С facets=true в ответе есть "
+                    "facets — сколько вакансий даст каждое значение каждого фасета.",
+        parameters=[
+            OpenApiParameter('category', str),
+            OpenApiParameter('specialization', str),
+            OpenApiParameter('skills', str),
+            OpenApiParameter('employment_type', str),
+            OpenApiParameter('work_format', str),
+            OpenApiParameter('experience_level', str),
+            OpenApiParameter('salary_min', int),
+            OpenApiParameter('salary_max', int),
+            OpenApiParameter('salary_currency', str),
+            OpenApiParameter('facets', bool, description='Добавить счётчики по фасетам'),
+        ],
+    )
+    def list(self, request, *args, **kwargs):
+        # Быстрый путь чтения: values() и encode_vacancies вместо VacancySerializer
+        page = self.paginate_queryset(vacancy_rows(self.filter_queryset(self.get_queryset())))
+        response = self.get_paginated_response(encode_vacancies(page))
+        if request.query_params.get('facets') in ('1', 'true'):
+            response.data['facets'] = self.vacancy_filter.facet_counts(self.get_queryset())
+        return response
+
+    @property
+    def vacancy_filter(self):
+        if not hasattr(self, '_vacancy_filter'):
+            self._vacancy_filter = VacancyFilter(self.request.query_params)
+        return self._vacancy_filter
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ('list', 'search'):
+            queryset = self.vacancy_filter.filter(queryset)
+        return queryset
 
 
     def perform_create(self, serializer):
@@ -29,6 +82,52 @@ class VacancyViewSet(viewsets.ModelViewSet):
         serializer.save(hr=self.request.user, status=Vacancy.Status.DRAFT)
 
 
+    @extend_schema(
+        request={'multipart/form-data': {
+            'type': 'object',
+            'properties': {
+                'file': {'type': 'string', 'format': 'binary'},
+                'file_format': {'type': 'string', 'enum': ['csv', 'jsonl']},
+                'encoding': {'type': 'string', 'default': 'utf-8-sig'},
+                'publish': {'type': 'boolean'},
+            },
+        }},
+        summary="Массовый импорт вакансий из CSV или JSONL",
+        description="Поля строк — как у создания вакансии; в CSV skills_names через запятую. "
+                    "Формат определяется по расширению файла или полю file_format. "
+                    "Кодировка — utf-8 по умолчанию или поле encoding (например, cp1251 для Excel). "
+                    "Вакансии создаются черновиками, с publish=true — сразу опубликованными. "
+                    "В ответе — число созданных и ошибки по номерам строк; если файл перестал "
+                    "читаться, aborted_at — строка, на которой импорт остановлен (ответ 400)."
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_vacancies(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Загрузите файл'})
+
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in FORMATS:
+            raise ValidationError({'file_format': 'Поддерживаются csv и jsonl'})
+
+        try:
+            encoding = check_encoding(request.data.get('encoding') or DEFAULT_ENCODING)
+        except ValueError as exc:
+            raise ValidationError({'encoding': str(exc)})
+
+        importer = VacancyImporter(
+            request.user,
+            publish=request.data.get('publish') in ('1', 'true', 'True'),
+        )
+        report = importer.run(read_rows(upload, file_format, encoding))
+        ok = report.created and report.aborted_at is None
+        return Response(
+            {'created': report.created, 'failed': report.failed, 'errors': report.errors,
+             'aborted_at': report.aborted_at},
+            status=status.HTTP_201_CREATED if ok else status.HTTP_400_BAD_REQUEST,
+        )
+
+
     @action(detail=True, methods=['post'])
     def publish(self, request, pk=None):
         vacancy = self.get_object()
@@ -44,8 +143,32 @@ class VacancyViewSet(viewsets.ModelViewSet):
         return Response({'message': 'Вакансия опубликована'})
 
 
+    @extend_schema(
+        summary="Полнотекстовый поиск вакансий",
+        description="Ищет по названию, навыкам, требованиям, обязанностям и описанию "
+                    "с учётом словоформ (русский и английский). Результаты — по "
+                    "убыванию релевантности, среди вакансий, доступных пользователю.",
+        parameters=[OpenApiParameter('q', str, description='Поисковый запрос', required=True)],
+    )
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Введите поисковый запрос'})
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ranked_ids = search_vacancies(query, queryset)
+
+        # Выдача упорядочена по релевантности, а не по (created_at, id),
+        # поэтому здесь обычные номера страниц
+        paginator = PageNumberPagination()
+        ids = paginator.paginate_queryset(ranked_ids, request, view=self)
+        rows = {row['id']: row for row in vacancy_rows(queryset.filter(pk__in=ids))}
+        return paginator.get_paginated_response(encode_vacancies(rows[pk] for pk in ids if pk in rows))
+
+
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('category', 'specialization').prefetch_related('skills')
         user = self.request.user
 
         if user.role == 'admin':
@@ -55,3 +178,41 @@ class VacancyViewSet(viewsets.ModelViewSet):
             return queryset.filter(hr=user)
 
         return queryset.filter(status=Vacancy.Status.PUBLISHED)
+
+
+class TaxonomyViewSet(viewsets.ViewSet):
+    """
+    Справочники для форм и фильтров. Отдаются из кеша справочников без
+    запросов к БД; ETag — хеш содержимого справочников, повторный запрос с If-None-Match
+    получает 304.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def _respond(self, request, snapshot, data):
+        etag = f'"{snapshot.etag}"'
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
+
+    @extend_schema(
+        summary="Категории со специализациями",
+        description="Активные категории по алфавиту, у каждой — список специализаций.",
+    )
+    @action(detail=False, methods=['get'])
+    def categories(self, request):
+        snapshot = get_taxonomy_cache().get()
+        return self._respond(request, snapshot, snapshot.categories)
+
+    @extend_schema(
+        summary="Навыки",
+        description="Все навыки по алфавиту; с q — только содержащие подстроку (для автодополнения).",
+        parameters=[OpenApiParameter('q', str, description='Подстрока названия')],
+    )
+    @action(detail=False, methods=['get'])
+    def skills(self, request):
+        snapshot = get_taxonomy_cache().get()
+        query = request.query_params.get('q', '').strip().lower()
+        skills = snapshot.skills
+        if query:
+            skills = [skill for skill in skills if query in skill['name'].lower()]
+        return self._respond(request, snapshot, skills)
@@ -13,6 +13,102 @@ DEBUG = env.bool('DEBUG', default=False)
 
 GIGACHAT_CLIENT_ID = os.getenv("GIGACHAT_CLIENT_ID")
 GIGACHAT_SECRET = os.getenv("GIGACHAT_SECRET")
+# За сколько секунд до истечения OAuth токен GigaChat считается устаревшим
+GIGACHAT_TOKEN_REFRESH_MARGIN = env.int('GIGACHAT_TOKEN_REFRESH_MARGIN', default=60)
+# Переопределение адресов GigaChat (например, для локальной заглушки)
+GIGACHAT_AUTH_URL = env('GIGACHAT_AUTH_URL', default=None)
+GIGACHAT_CHAT_URL = env('GIGACHAT_CHAT_URL', default=None)
+# Пул HTTP соединений и таймауты (секунды)
+GIGACHAT_POOL_CONNECTIONS = env.int('GIGACHAT_POOL_CONNECTIONS', default=2)
+GIGACHAT_POOL_MAXSIZE = env.int('GIGACHAT_POOL_MAXSIZE', default=10)
+GIGACHAT_CONNECT_TIMEOUT = env.float('GIGACHAT_CONNECT_TIMEOUT', default=5.0)
+GIGACHAT_READ_TIMEOUT = env.float('GIGACHAT_READ_TIMEOUT', default=60.0)
+# Максимум одновременных запросов асинхронного клиента на процесс
+GIGACHAT_MAX_CONCURRENCY = env.int('GIGACHAT_MAX_CONCURRENCY', default=50)
+
+# --- AI Analysis Settings ---
+# Пакетный анализ кандидатов: размер пула потоков, лимит запросов в секунду
+# на процесс и число повторов для одного кандидата
+AI_BATCH_MAX_WORKERS = env.int('AI_BATCH_MAX_WORKERS', default=8)
+AI_BATCH_RATE_LIMIT = env.float('AI_BATCH_RATE_LIMIT', default=5.0)
+AI_BATCH_RATE_BURST = env.int('AI_BATCH_RATE_BURST', default=5)
+AI_BATCH_MAX_RETRIES = env.int('AI_BATCH_MAX_RETRIES', default=3)
+# Задача очереди, упавшая из-за недоступности GigaChat (размыкатель,
+# дедлайн, 5xx), возвращается в очередь, пока попыток меньше этого числа
+AI_JOB_MAX_ATTEMPTS = env.int('AI_JOB_MAX_ATTEMPTS', default=5)
+# finished_at ставится до коммита, поэтому инкрементальная выгрузка
+# перечитывает задачи, завершённые за столько секунд до водяного знака
+AI_EXPORT_OVERLAP = env.int('AI_EXPORT_OVERLAP', default=300)
+# Лимиты вызовов GigaChat через кеш (общие для всех воркеров): на одного HR
+# и на всех вместе, запросов в секунду и всплеск. Пакетный анализ ждёт
+# очереди, интерактивные запросы ждут не дольше AI_QUOTA_MAX_WAIT секунд.
+# AI_HR_MAX_PENDING_JOBS — сколько незавершённых задач может быть у HR
+AI_HR_RATE_LIMIT = env.float('AI_HR_RATE_LIMIT', default=2.0)
+AI_HR_RATE_BURST = env.int('AI_HR_RATE_BURST', default=10)
+AI_GLOBAL_RATE_LIMIT = env.float('AI_GLOBAL_RATE_LIMIT', default=10.0)
+AI_GLOBAL_RATE_BURST = env.int('AI_GLOBAL_RATE_BURST', default=20)
+AI_QUOTA_MAX_WAIT = env.float('AI_QUOTA_MAX_WAIT', default=5.0)
+AI_HR_MAX_PENDING_JOBS = env.int('AI_HR_MAX_PENDING_JOBS', default=1000)
+# Локальный предскоринг: кандидаты с оценкой ниже min_ai_score - MARGIN
+# не отправляются в GigaChat; считаются пачками по CHUNK_SIZE
+AI_PRESCORE_MARGIN = env.float('AI_PRESCORE_MARGIN', default=10.0)
+AI_PRESCORE_CHUNK_SIZE = env.int('AI_PRESCORE_CHUNK_SIZE', default=500)
+# Бюджет промпта анализа кандидата в токенах; длинные поля обрезаются
+AI_PROMPT_TOKEN_BUDGET = env.int('AI_PROMPT_TOKEN_BUDGET', default=3000)
+# Пакетный промпт: сколько кандидатов упаковывать в один запрос (1 — по
+# одному на запрос) и бюджет такого промпта в токенах
+AI_PACK_SIZE = env.int('AI_PACK_SIZE', default=1)
+AI_BATCH_PROMPT_TOKEN_BUDGET = env.int('AI_BATCH_PROMPT_TOKEN_BUDGET', default=12000)
+# Один вызов анализа: число попыток, общий дедлайн и задержки между
+# попытками (секунды); размыкатель цепи после серии аварийных ошибок
+AI_CALL_MAX_ATTEMPTS = env.int('AI_CALL_MAX_ATTEMPTS', default=3)
+AI_CALL_DEADLINE = env.float('AI_CALL_DEADLINE', default=90.0)
+AI_RETRY_BASE_DELAY = env.float('AI_RETRY_BASE_DELAY', default=0.5)
+AI_RETRY_MAX_DELAY = env.float('AI_RETRY_MAX_DELAY', default=8.0)
+AI_BREAKER_FAILURE_THRESHOLD = env.int('AI_BREAKER_FAILURE_THRESHOLD', default=5)
+AI_BREAKER_RESET_TIMEOUT = env.float('AI_BREAKER_RESET_TIMEOUT', default=30.0)
+# Склейка одинаковых одновременных запросов к GigaChat: сколько живёт
+# блокировка лидера, сколько хранится общий результат и как часто его опрашивать
+AI_SINGLEFLIGHT_LOCK_TTL = env.float('AI_SINGLEFLIGHT_LOCK_TTL', default=90.0)
+AI_SINGLEFLIGHT_RESULT_TTL = env.int('AI_SINGLEFLIGHT_RESULT_TTL', default=30)
+AI_SINGLEFLIGHT_POLL_INTERVAL = env.float('AI_SINGLEFLIGHT_POLL_INTERVAL', default=0.2)
+# Учёт расхода GigaChat: цена 1000 токенов в рублях, по скольким последним
+# вызовам считаются перцентили задержки и как часто (секунды) накопленный
+# расход по вакансиям сбрасывается в БД
+AI_COST_PER_1K_TOKENS = env.float('AI_COST_PER_1K_TOKENS', default=0.2)
+AI_METRICS_WINDOW = env.int('AI_METRICS_WINDOW', default=1000)
+AI_USAGE_FLUSH_INTERVAL = env.float('AI_USAGE_FLUSH_INTERVAL', default=10.0)
+# Офлайн поиск похожих вакансий: каталог memmap индекса и длина
+# хешированного вектора (100k вакансий × 512 × float32 ≈ 200 МБ, поиск
+# top-k около 15-20 мс на одном ядре)
+AI_SIMILARITY_INDEX_DIR = env('AI_SIMILARITY_INDEX_DIR', default=str(BASE_DIR / '.cache' / 'vacancy_index'))
+AI_SIMILARITY_DIMS = env.int('AI_SIMILARITY_DIMS', default=512)
+
+# --- Vacancy Settings ---
+# Сколько секунд живут закешированные счётчики фасетов списка вакансий
+VACANCY_FACETS_CACHE_TTL = env.int('VACANCY_FACETS_CACHE_TTL', default=60)
+# Кеш категорий, специализаций и навыков (имя -> id) в памяти процесса и в
+# кеше default. Сбрасывается сигналами; TTL ограничивает отставание процессов,
+# если кеш default локальный
+VACANCY_TAXONOMY_CACHE = env.bool('VACANCY_TAXONOMY_CACHE', default=True)
+VACANCY_TAXONOMY_CACHE_TTL = env.int('VACANCY_TAXONOMY_CACHE_TTL', default=300)
+
+# --- Cache ---
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Результаты AI анализа переживают рестарт: TTL и ограничение по размеру
+    'ai_results': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env('AI_RESULT_CACHE_DIR', default=str(BASE_DIR / '.cache' / 'ai_results')),
+        'TIMEOUT': env.int('AI_RESULT_CACHE_TTL', default=7 * 24 * 60 * 60),
+        'OPTIONS': {
+            'MAX_ENTRIES': env.int('AI_RESULT_CACHE_MAX_ENTRIES', default=50000),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
 
 ALLOWED_HOSTS = ['*']
 
@@ -33,6 +129,7 @@ INSTALLED_APPS = [
 
     'apps.accounts',
     'apps.vacancy',
+    'apps.ai',
 
 ]
 
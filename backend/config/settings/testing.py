@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 from .base import *
 
 DEBUG = False
@@ -12,5 +15,13 @@ DATABASES = {
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
-    }
+    },
+    'ai_results': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
 }
+
+# Постоянный путь во временном каталоге: mkdtemp при каждом импорте настроек
+# оставлял бы по каталогу на запуск. Тесты, которым важно содержимое
+# индекса, создают свой VacancyIndex во временном каталоге и удаляют его
+AI_SIMILARITY_INDEX_DIR = os.path.join(tempfile.gettempdir(), 'smarthr_tests', 'vacancy_index')
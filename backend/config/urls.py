@@ -9,6 +9,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/auth/", include("apps.accounts.urls")),
     path("api/auth/", include("apps.vacancy.urls")),
+    path("api/ai/", include("apps.ai.urls")),
 ]
 
 urlpatterns += [